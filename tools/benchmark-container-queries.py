@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Time the hot queries on the container table with and without indexes.
+
+Usage: benchmark-container-queries.py [--connection URL] [--rows N]
+                                      [--repeat N]
+
+The container table is created in an empty database, filled with --rows
+synthetic containers and the queries are timed before and after the
+indexes of the container table are created. The best time out of --repeat
+runs is printed. The default database is a temporary SQLite file.
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import random
+import tempfile
+import timeit
+
+import sqlalchemy as sa
+
+from zun.common import consts
+from zun.db.sqlalchemy import models
+
+HOSTS = 500
+PROJECTS = 2000
+MEMORY_SIZES = ['128', '256', '512', '1024', '2048', '4096']
+INDEXES = ['container_host_container_type_idx',
+           'container_project_id_container_type_idx',
+           'container_status_task_state_auto_remove_idx']
+
+
+def fill_table(engine, rows, seed=0):
+    rand = random.Random(seed)
+    table = models.Container.__table__
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            memory = rand.choice(MEMORY_SIZES)
+            deleted = rand.random() < 0.01
+            batch.append({
+                'uuid': '%036d' % i,
+                'name': 'Container-%d' % i,
+                'project_id': 'project-%d' % rand.randrange(PROJECTS),
+                'host': 'host-%d' % rand.randrange(HOSTS),
+                'memory': memory,
+                'memory_mb': int(memory),
+                'status': consts.DELETED if deleted else consts.RUNNING,
+                'task_state': None,
+                'auto_remove': deleted,
+                'container_type': consts.TYPE_CONTAINER})
+            if len(batch) == 10000:
+                conn.execute(table.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(table.insert(), batch)
+
+
+def get_queries():
+    c = models.Container
+    return [
+        ('list by host',
+         sa.select([c.id]).where(c.host == 'host-7').where(
+             c.container_type == consts.TYPE_CONTAINER)),
+        ('count by project',
+         sa.select([sa.func.count(c.id)]).where(
+             c.project_id == 'project-7').where(
+                 c.container_type == consts.TYPE_CONTAINER)),
+        ('sum memory by project',
+         sa.select([sa.func.sum(c.memory)]).where(
+             c.project_id == 'project-7').where(
+                 c.container_type == consts.TYPE_CONTAINER)),
+        ('sum memory_mb by project',
+         sa.select([sa.func.sum(c.memory_mb)]).where(
+             c.project_id == 'project-7').where(
+                 c.container_type == consts.TYPE_CONTAINER)),
+        ('unused containers',
+         sa.select([c.id]).where(c.status == consts.DELETED).where(
+             c.task_state.is_(None)).where(c.auto_remove.is_(True))),
+        ('lower(name)',
+         sa.select([sa.func.count(c.id)]).where(
+             sa.func.lower(c.name) == 'container-4242')),
+    ]
+
+
+def time_queries(engine, queries, repeat):
+    timings = []
+    with engine.connect() as conn:
+        for title, query in queries:
+            timings.append(min(timeit.repeat(
+                lambda: conn.execute(query).fetchall(),
+                number=1, repeat=repeat)))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connection')
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    path = None
+    connection = args.connection
+    if not connection:
+        fd, path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        connection = 'sqlite:///%s' % path
+    engine = sa.create_engine(connection)
+    table = models.Container.__table__
+    tables = [models.Registry.__table__, table]
+    try:
+        models.Base.metadata.create_all(engine, tables=tables)
+        indexes = [index for index in table.indexes
+                   if index.name in INDEXES]
+        # The index on the names is created by the model for the dialect
+        if engine.dialect.name == 'mysql':
+            indexes.append(sa.Index('container_name_idx', table.c.name))
+        else:
+            indexes.append(sa.Index('container_lower_name_idx',
+                                    sa.func.lower(table.c.name)))
+        for index in indexes:
+            index.drop(engine)
+        fill_table(engine, args.rows)
+
+        queries = get_queries()
+        before = time_queries(engine, queries, args.repeat)
+        for index in indexes:
+            index.create(engine)
+        after = time_queries(engine, queries, args.repeat)
+
+        print('%d rows, %s' % (args.rows, engine.dialect.name))
+        print('%26s %18s %18s' % ('query', 'no index (ms)', 'index (ms)'))
+        for (title, query), t1, t2 in zip(queries, before, after):
+            print('%26s %18.3f %18.3f' % (title, t1 * 1000, t2 * 1000))
+    finally:
+        models.Base.metadata.drop_all(engine, tables=tables)
+        if path:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Time the serialization of a list of containers by the container view.
+
+Usage: benchmark-container-view.py [--repeat N] [CONTAINER_COUNT ...]
+
+For each number of containers, the list is serialized with the policy of
+every key checked for every container, as the view used to do, and with
+the keys allowed by policy computed once per request. The default policy
+is used with a non-admin context and the best time out of --repeat runs
+is printed.
+"""
+
+from __future__ import print_function
+
+import argparse
+import timeit
+
+from oslo_utils import uuidutils
+
+from zun.api.controllers.v1.views import containers_view as view
+from zun.common import context
+from zun.common.policies import container as policies
+from zun.common import policy
+import zun.conf
+from zun import objects
+
+URL = 'http://127.0.0.1:9517'
+
+
+def make_context():
+    return context.RequestContext(user_id='fake_user',
+                                  project_id='fake_project',
+                                  roles=['member'])
+
+
+def make_containers(count):
+    ctxt = make_context()
+    containers = []
+    for i in range(count):
+        containers.append(objects.Container(
+            ctxt, id=i, uuid=uuidutils.generate_uuid(),
+            name='container-%d' % i, project_id='fake_project',
+            user_id='fake_user', image='cirros', command=['sleep', '1000'],
+            status='Running', status_reason=None, task_state=None,
+            cpu=1.0, memory='512', environment={'KEY': 'value'},
+            workdir='/', ports=[80], hostname='container-%d' % i,
+            labels={}, addresses={}, image_pull_policy='ifnotpresent',
+            host='host-%d' % (i % 100),
+            restart_policy={'Name': 'no', 'MaximumRetryCount': '0'},
+            status_detail=None, interactive=False, tty=False,
+            image_driver='docker', security_groups=['default'],
+            auto_remove=False, runtime='runc', disk=0, auto_heal=False,
+            privileged=False, healthcheck={}, cpu_policy='shared',
+            registry_id=None))
+    return containers
+
+
+def _uncached_keys(ctxt):
+    return frozenset(
+        key for key in view._basic_keys
+        if ctxt.can(policies.CONTAINER % ('get_one:%s' % key), fatal=False,
+                    might_not_exist=True))
+
+
+def format_uncached(containers):
+    ctxt = make_context()
+    return [view.format_container(ctxt, URL, c,
+                                  allowed_keys=_uncached_keys(ctxt))
+            for c in containers]
+
+
+def format_cached(containers):
+    ctxt = make_context()
+    allowed_keys = view.get_allowed_keys(ctxt)
+    return [view.format_container(ctxt, URL, c, allowed_keys=allowed_keys)
+            for c in containers]
+
+
+def best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('counts', metavar='CONTAINER_COUNT', type=int,
+                        nargs='*', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    zun.conf.CONF([], project='zun')
+    policy.init()
+
+    print('%10s %24s %18s' % ('containers', 'check per container (ms)',
+                              'cached (ms)'))
+    for count in args.counts:
+        containers = make_containers(count)
+        uncached = best_time(lambda: format_uncached(containers), args.repeat)
+        cached = best_time(lambda: format_cached(containers), args.repeat)
+        print('%10d %24.3f %18.3f' % (count, uncached * 1000, cached * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Time the PCI device pools of SR-IOV hosts with many virtual functions.
+
+Usage: benchmark-pci-stats.py [--repeat N] [--hosts N] [VF_COUNT ...]
+
+For each number of virtual functions per host, the time to add all the
+devices to the pools, to check a request against the pools of --hosts hosts
+as the scheduler does and to consume a request on the compute host is
+printed. The best time out of --repeat runs is kept.
+"""
+
+from __future__ import print_function
+
+import argparse
+import timeit
+
+from oslo_serialization import jsonutils
+from oslo_utils import uuidutils
+
+from zun.common import context
+from zun import objects
+from zun.objects import fields
+from zun.pci import stats
+from zun.pci import whitelist
+
+# A physical function has up to 256 virtual functions
+MAX_VFS_PER_PF = 256
+WHITELIST = [jsonutils.dumps({'vendor_id': '8086', 'product_id': '1528'}),
+             jsonutils.dumps({'vendor_id': '8086', 'product_id': '1515',
+                              'physical_network': 'physnet1'})]
+
+
+def make_devices(vf_count):
+    ctxt = context.get_admin_context()
+    compute_node_uuid = uuidutils.generate_uuid()
+    pf_count = max(4, -(-vf_count // MAX_VFS_PER_PF))
+    pfs = []
+    vfs = []
+    for i in range(pf_count):
+        pf = objects.PciDevice.create(ctxt, {
+            'compute_node_uuid': compute_node_uuid,
+            'address': '0000:%02x:00.0' % (0x81 + i),
+            'vendor_id': '8086',
+            'product_id': '1528',
+            'status': fields.PciDeviceStatus.AVAILABLE,
+            'request_id': None,
+            'dev_type': fields.PciDeviceType.SRIOV_PF,
+            'parent_addr': None,
+            'numa_node': i % 2})
+        pf.child_devices = []
+        pfs.append(pf)
+    for i in range(vf_count):
+        pf = pfs[i % pf_count]
+        vf_num = i // pf_count
+        vf = objects.PciDevice.create(ctxt, {
+            'compute_node_uuid': compute_node_uuid,
+            'address': '0000:%02x:%02x.%d' % (0x81 + i % pf_count,
+                                              vf_num // 8, vf_num % 8),
+            'vendor_id': '8086',
+            'product_id': '1515',
+            'status': fields.PciDeviceStatus.AVAILABLE,
+            'request_id': None,
+            'dev_type': fields.PciDeviceType.SRIOV_VF,
+            'parent_addr': pf.address,
+            'numa_node': pf.numa_node})
+        vf.parent_device = pf
+        pf.child_devices.append(vf)
+        vfs.append(vf)
+    return pfs + vfs
+
+
+def make_stats(devices, dev_filter):
+    pci_stats = stats.PciDeviceStats(dev_filter=dev_filter)
+    for dev in devices:
+        pci_stats.add_device(dev)
+    return pci_stats
+
+
+def make_requests(count):
+    return [objects.ContainerPCIRequest(
+        count=count, request_id=None, alias_name=None,
+        spec=[{'vendor_id': '8086', 'product_id': '1515',
+               'physical_network': 'physnet1'}])]
+
+
+def best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('vf_counts', metavar='VF_COUNT', type=int,
+                        nargs='*', default=[128, 1024, 4096])
+    parser.add_argument('--hosts', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    dev_filter = whitelist.Whitelist(WHITELIST)
+    requests = make_requests(8)
+
+    print('%8s %14s %22s %14s' % ('VFs', 'add (ms)',
+                                  'support x %d hosts (ms)' % args.hosts,
+                                  'consume (ms)'))
+    for vf_count in args.vf_counts:
+        devices = make_devices(vf_count)
+        add_time = best_time(lambda: make_stats(devices, dev_filter),
+                             args.repeat)
+
+        pools = make_stats(devices, dev_filter).to_device_pools_obj()
+
+        def support():
+            for i in range(args.hosts):
+                host_stats = stats.PciDeviceStats(pools,
+                                                  dev_filter=dev_filter)
+                host_stats.support_requests(requests)
+        support_time = best_time(support, args.repeat)
+
+        consume_times = []
+        for i in range(args.repeat):
+            host_stats = make_stats(devices, dev_filter)
+            consume_times.append(timeit.timeit(
+                lambda: host_stats.consume_requests(requests), number=1))
+
+        print('%8d %14.3f %22.3f %14.3f' % (vf_count, add_time * 1000,
+                                            support_time * 1000,
+                                            min(consume_times) * 1000))
+
+
+if __name__ == '__main__':
+    main()
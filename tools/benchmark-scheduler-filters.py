@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare the host by host and the vectorized filtering of the scheduler.
+
+Usage: benchmark-scheduler-filters.py [--repeat N] [HOST_COUNT ...]
+
+The filters are run on synthetic host states and the best time out of
+--repeat runs is printed for each number of hosts.
+"""
+
+from __future__ import print_function
+
+import argparse
+import random
+import timeit
+
+from oslo_utils import uuidutils
+
+from zun.common import context
+from zun import objects
+from zun.scheduler import filters
+from zun.scheduler.filters import cpu_filter
+from zun.scheduler.filters import disk_filter
+from zun.scheduler.filters import ram_filter
+from zun.scheduler.filters import runtime_filter
+from zun.scheduler import host_state
+
+
+def make_hosts(count, seed=0):
+    rand = random.Random(seed)
+    hosts = []
+    for i in range(count):
+        host = host_state.HostState('host%d' % i)
+        host.uuid = 'rp-%d' % i
+        host.mem_total = 256 * 1024
+        host.mem_used = rand.randint(0, host.mem_total)
+        host.cpus = 64
+        host.cpu_used = float(rand.randint(0, host.cpus))
+        host.disk_total = 2000
+        host.disk_used = rand.randint(0, host.disk_total)
+        host.disk_quota_supported = rand.random() < 0.9
+        host.runtimes = ['runc'] if rand.random() < 0.2 else ['runc', 'kata']
+        hosts.append(host)
+    return hosts
+
+
+def make_container():
+    container = objects.Container(context.get_admin_context())
+    container.uuid = uuidutils.generate_uuid()
+    container.memory = '4096'
+    container.cpu = 4.0
+    container.disk = 100
+    container.runtime = 'kata'
+    return container
+
+
+def time_filtering(handler, filter_list, hosts, container, repeat):
+    """Return the best filtering time and the number of hosts passed."""
+    def run():
+        return handler.get_filtered_objects(filter_list, hosts, container, {})
+
+    passed = len(run())
+    return min(timeit.repeat(run, number=1, repeat=repeat)), passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('host_counts', metavar='HOST_COUNT', type=int,
+                        nargs='*', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    numeric_filters = [ram_filter.RamFilter(), cpu_filter.CPUFilter(),
+                       disk_filter.DiskFilter()]
+    filter_sets = [('RamFilter, CPUFilter, DiskFilter', numeric_filters),
+                   ('RamFilter, CPUFilter, DiskFilter, RuntimeFilter',
+                    numeric_filters + [runtime_filter.RuntimeFilter()])]
+    container = make_container()
+    handlers = [filters.HostFilterHandler(),
+                filters.VectorizedHostFilterHandler()]
+
+    for title, filter_list in filter_sets:
+        print(title)
+        print('%8s %18s %16s %8s %8s' % ('hosts', 'host by host (ms)',
+                                         'vectorized (ms)', 'speedup',
+                                         'passed'))
+        for count in args.host_counts:
+            hosts = make_hosts(count)
+            timings = []
+            for handler in handlers:
+                timing, passed = time_filtering(handler, filter_list, hosts,
+                                                container, args.repeat)
+                timings.append(timing)
+            print('%8d %18.3f %16.3f %7.1fx %8d' % (
+                count, timings[0] * 1000, timings[1] * 1000,
+                timings[0] / timings[1], passed))
+        print()
+
+
+if __name__ == '__main__':
+    main()
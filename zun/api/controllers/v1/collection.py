@@ -26,8 +26,12 @@ class Collection(base.APIBase):
         """Return whether collection has more items."""
         return len(self.collection) and len(self.collection) == limit
 
-    def get_next(self, limit, url=None, **kwargs):
-        """Return a link to the next subset of the collection."""
+    def get_next(self, limit, url=None, marker=None, **kwargs):
+        """Return a link to the next subset of the collection.
+
+        :param marker: the marker of the next subset, the UUID of the last
+                       item if None.
+        """
         if not self.has_next(limit):
             return None
 
@@ -35,7 +39,7 @@ class Collection(base.APIBase):
         q_args = ''.join(['%s=%s&' % (key, kwargs[key]) for key in kwargs])
         next_args = '?%(args)slimit=%(limit)d&marker=%(marker)s' % {
             'args': q_args, 'limit': limit,
-            'marker': self.collection[-1]['uuid']}
+            'marker': marker or self.collection[-1]['uuid']}
 
         return link.make_link('next', pecan.request.host_url,
                               resource_url, next_args)['href']
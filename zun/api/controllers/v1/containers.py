@@ -13,10 +13,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
+import copy
 import shlex
 
 from neutronclient.common import exceptions as n_exc
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
+from oslo_utils import excutils
 from oslo_utils import strutils
 from oslo_utils import uuidutils
 import pecan
@@ -40,6 +44,7 @@ from zun.common import policy
 from zun.common import quota
 from zun.common import utils
 import zun.conf
+from zun.container.docker import utils as docker_utils
 from zun.network import model as network_model
 from zun.network import neutron
 from zun import objects
@@ -72,13 +77,25 @@ class ContainerCollection(collection.Collection):
 
     @staticmethod
     def convert_with_links(rpc_containers, limit, url=None,
-                           expand=False, **kwargs):
+                           expand=False, fields=None, marker_keys=None,
+                           **kwargs):
         context = pecan.request.context
         collection = ContainerCollection()
+        allowed_keys = view.get_allowed_keys(context)
         collection.containers = \
-            [view.format_container(context, url, p)
+            [view.format_container(context, url, p, fields=fields,
+                                   allowed_keys=allowed_keys)
              for p in rpc_containers]
-        collection.next = collection.get_next(limit, url=url, **kwargs)
+        marker = None
+        if marker_keys and rpc_containers:
+            last = rpc_containers[-1]
+            marker = api_utils.encode_marker(
+                [kwargs['sort_key']] + [getattr(last, key)
+                                        for key in marker_keys])
+        if fields is not None:
+            kwargs['fields'] = ','.join(sorted(fields))
+        collection.next = collection.get_next(limit, url=url, marker=marker,
+                                              **kwargs)
         return collection
 
 
@@ -149,6 +166,8 @@ class ContainersController(base.Controller):
         'top': ['GET'],
         'get_archive': ['GET'],
         'put_archive': ['POST'],
+        'get_archive_stream': ['GET'],
+        'put_archive_stream': ['POST'],
         'stats': ['GET'],
         'commit': ['POST'],
         'add_security_group': ['POST'],
@@ -194,28 +213,76 @@ class ContainersController(base.Controller):
                 context.can(policy_action, might_not_exist=True)
                 filter_value = kwargs.pop(filter_key)
                 filters[filter_key] = filter_value
+        fields = kwargs.pop('fields', None)
+        if fields is not None:
+            api_utils.version_check('fields', '1.42')
+            fields = view.get_fields(fields)
+        # Since 1.42 the next links hold the values of the sort keys of
+        # the last container instead of its UUID
+        marker_keys = None
+        if (api_utils.is_version_at_least('1.42') and
+                sort_key in objects.Container.fields):
+            marker_keys = self._get_marker_keys(sort_key)
         marker_obj = None
         marker = kwargs.pop('marker', None)
         if marker:
-            marker_obj = objects.Container.get_by_uuid(context,
-                                                       marker)
+            marker_obj = self._get_marker(context, marker, sort_key)
         if kwargs:
             unknown_params = [str(k) for k in kwargs]
             msg = _("Unknown parameters: %s") % ", ".join(unknown_params)
             raise exception.InvalidValue(msg)
 
+        load_fields = None
+        if fields is not None:
+            load_fields = set(fields)
+            load_fields.update(marker_keys or [])
+        # The view shows the uuid of the registries instead of their id
+        expected_attrs = None
+        if fields is None or 'registry_id' in fields:
+            expected_attrs = ['registry']
         containers = objects.Container.list(context,
                                             limit,
                                             marker_obj,
                                             sort_key,
                                             sort_dir,
-                                            filters=filters)
+                                            filters=filters,
+                                            fields=load_fields,
+                                            expected_attrs=expected_attrs)
         return ContainerCollection.convert_with_links(containers, limit,
                                                       url=resource_url,
                                                       expand=expand,
+                                                      fields=fields,
+                                                      marker_keys=marker_keys,
                                                       sort_key=sort_key,
                                                       sort_dir=sort_dir)
 
+    @staticmethod
+    def _get_marker_keys(sort_key):
+        if sort_key == 'id':
+            return ['id']
+        return [sort_key, 'id']
+
+    def _get_marker(self, context, marker, sort_key):
+        """Return the container to list the containers after.
+
+        The marker is either the UUID of the container or an opaque marker
+        of a next link, which holds the values of the sort keys of the
+        container, so that it does not need to be looked up.
+        """
+        if uuidutils.is_uuid_like(marker):
+            return objects.Container.get_by_uuid(context, marker)
+
+        values = api_utils.decode_marker(marker)
+        keys = self._get_marker_keys(sort_key)
+        if (sort_key not in objects.Container.fields or
+                values[:1] != [sort_key] or len(values) != len(keys) + 1):
+            raise exception.InvalidValue(
+                _("The marker does not match the sort_key %s") % sort_key)
+        try:
+            return objects.Container(context, **dict(zip(keys, values[1:])))
+        except (TypeError, ValueError):
+            raise exception.InvalidValue(_("Invalid marker: %s") % marker)
+
     @pecan.expose('json')
     @exception.wrap_pecan_controller_exception
     def get_one(self, container_ident, **kwargs):
@@ -314,8 +381,16 @@ class ContainersController(base.Controller):
             raise exception.InvalidValue(_('Valid run or interactive '
                                            'values are: %s') % bools)
 
-        # Check container quotas
-        self._check_container_quotas(context, container_dict)
+        count = container_dict.pop('count', None)
+        if count is not None:
+            api_utils.version_check('count', '1.41')
+            count = int(count)
+            # NOTE: the schema can't check the range of a string count
+            if not 1 <= count <= CONF.maximum_container_count:
+                raise exception.InvalidValue(_(
+                    'The count must be between 1 and %d.') %
+                    CONF.maximum_container_count)
+            self._check_container_count(container_dict)
 
         auto_remove = container_dict.pop('auto_remove', None)
         if auto_remove is not None:
@@ -409,17 +484,38 @@ class ContainersController(base.Controller):
         extra_spec['pci_requests'] = pci_req
         extra_spec['availability_zone'] = container_dict.get(
             'availability_zone')
-        new_container = objects.Container(context, **container_dict)
-        new_container.create(context)
-
         kwargs = {}
         kwargs['extra_spec'] = extra_spec
         kwargs['requested_networks'] = requested_networks
-        kwargs['requested_volumes'] = (
-            self._build_requested_volumes(context, new_container, mounts))
         if pci_req.requests:
             kwargs['pci_requests'] = pci_req
         kwargs['run'] = run
+
+        # Check container quotas
+        deltas = self._check_container_quotas(context, container_dict,
+                                              count=count or 1)
+        try:
+            new_containers = self._create_containers(context, container_dict,
+                                                     count)
+        finally:
+            QUOTAS.release(context, context.project_id, **deltas)
+
+        if count is not None:
+            kwargs['requested_volumes'] = {}
+            for new_container in new_containers:
+                kwargs['requested_volumes'].update(
+                    self._build_requested_volumes(
+                        context, new_container, copy.deepcopy(mounts)))
+            compute_api.container_create_batch(context, new_containers,
+                                               **kwargs)
+            pecan.response.status = 202
+            return {'containers': [
+                view.format_container(context, pecan.request.host_url, c)
+                for c in new_containers]}
+
+        new_container = new_containers[0]
+        kwargs['requested_volumes'] = (
+            self._build_requested_volumes(context, new_container, mounts))
         compute_api.container_create(context, new_container, **kwargs)
         # Set the HTTP Location Header
         pecan.response.location = link.build_url('containers',
@@ -428,46 +524,64 @@ class ContainersController(base.Controller):
         return view.format_container(context, pecan.request.host_url,
                                      new_container)
 
+    def _create_containers(self, context, container_dict, count):
+        """Create the records of the containers of a create request."""
+        if count is None:
+            new_container = objects.Container(context, **container_dict)
+            new_container.create(context)
+            return [new_container]
+
+        new_containers = []
+        try:
+            for index in range(count):
+                new_container_dict = copy.deepcopy(container_dict)
+                new_container_dict['name'] = '%s-%d' % (
+                    container_dict['name'], index + 1)
+                new_container = objects.Container(context,
+                                                  **new_container_dict)
+                new_container.create(context)
+                new_containers.append(new_container)
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                # e.g. one of the names is taken, none of the containers is
+                # created then
+                for new_container in new_containers:
+                    new_container.destroy(context)
+        return new_containers
+
+    def _check_container_count(self, container_dict):
+        """Check that several containers can be created out of a spec."""
+        for net in container_dict.get('nets') or []:
+            if net.get('port') or net.get('v4-fixed-ip') or \
+                    net.get('v6-fixed-ip'):
+                raise exception.InvalidValue(_(
+                    'A port or a fixed IP can not be requested when '
+                    'creating several containers at once.'))
+        for mount in container_dict.get('mounts') or []:
+            if mount.get('type', 'volume') == 'volume' and \
+                    mount.get('source'):
+                raise exception.InvalidValue(_(
+                    'An existing volume can not be mounted when creating '
+                    'several containers at once.'))
+
     def _check_container_quotas(self, context, container_delta_dict,
-                                update_container=False):
+                                update_container=False, count=1):
+        """Reserve the resources of containers within the project quotas.
+
+        The deltas are checked against the usage counters of the project
+        and reserved in the same transaction, so that concurrent requests
+        can not both pass the check. The returned deltas must be released
+        with QUOTAS.release() once the containers were created or updated,
+        their usage is counted instead then.
+        """
         deltas = {
-            'containers': 0 if update_container else 1,
-            'cpu': container_delta_dict.get('cpu', 0),
-            'memory': container_delta_dict.get('memory', 0),
-            'disk': container_delta_dict.get('disk', 0)
+            'containers': 0 if update_container else count,
+            'cpu': float(container_delta_dict.get('cpu') or 0) * count,
+            'memory': int(container_delta_dict.get('memory') or 0) * count,
+            'disk': int(container_delta_dict.get('disk') or 0) * count
         }
-
-        def _check_deltas(context, deltas):
-            """Check usage deltas against quota limits.
-
-            This does QUOTAS.count() followed by a QUOTAS.limit_check()
-            using the provided deltas.
-
-            :param context: The request context, for access check.
-            :param deltas: A dict of {resource_name: delta, ...} to check
-                           against the quota limits.
-            """
-            check_kwargs = {}
-            count_as_dict = {}
-            project_id = context.project_id
-            for res_name, res_delta in deltas.items():
-                # TODO(kiennt): Apply count_as_dict method, query count usage
-                #               once rather than count each resource.
-                count_as_dict[res_name] = QUOTAS.count(context, res_name,
-                                                       project_id)
-                total = None
-                try:
-                    if isinstance(count_as_dict[res_name], six.integer_types):
-                        total = count_as_dict[res_name] + int(res_delta)
-                    else:
-                        total = float(count_as_dict[res_name]) + \
-                            float(res_delta)
-                except TypeError as e:
-                    raise e
-                check_kwargs[res_name] = total
-            QUOTAS.limit_check(context, project_id, **check_kwargs)
-
-        _check_deltas(context, deltas)
+        QUOTAS.reserve(context, context.project_id, **deltas)
+        return deltas
 
     def _set_default_resource_limit(self, container_dict):
         # NOTE(kiennt): Default disk size will be set later.
@@ -692,10 +806,14 @@ class ContainersController(base.Controller):
             container.save(context)
         else:
             # Check container quotas
-            self._check_container_quotas(context, container_deltas,
-                                         update_container=True)
+            deltas = self._check_container_quotas(context, container_deltas,
+                                                  update_container=True)
             compute_api = pecan.request.compute_api
-            container = compute_api.container_update(context, container, patch)
+            try:
+                container = compute_api.container_update(context, container,
+                                                         patch)
+            finally:
+                QUOTAS.release(context, context.project_id, **deltas)
         return view.format_container(context, pecan.request.host_url,
                                      container)
 
@@ -1146,6 +1264,59 @@ class ContainersController(base.Controller):
             context, container, kwargs['path'], kwargs['data'],
             kwargs['decode_data'])
 
+    @base.Controller.api_version("1.40")
+    @pecan.expose('json')
+    @exception.wrap_pecan_controller_exception
+    def get_archive_stream(self, container_ident, path):
+        """Stream a file/folder out of a container
+
+        Retrieve a file or folder from a container in the form of a raw
+        tar archive. The archive is streamed from the docker daemon of the
+        compute host, the stat of the path is returned base64 encoded in the
+        X-Zun-Container-Path-Stat header.
+        :param container_ident: UUID or Name of a container.
+        :param path: The path of the file or folder to retrieve.
+        """
+        container = utils.get_container(container_ident)
+        check_policy_on_container(container.as_dict(), "container:get_archive")
+        utils.validate_container_state(container, 'get_archive')
+        LOG.debug('Streaming archive from %(uuid)s path %(path)s',
+                  {'uuid': container.uuid, 'path': path})
+        context = pecan.request.context
+        compute_api = pecan.request.compute_api
+        url = compute_api.container_archive_url(context, container)
+        chunks, stat = docker_utils.get_archive_stream(
+            url, container.container_id, path)
+        response = pecan.response
+        response.content_type = 'application/x-tar'
+        response.headers['X-Zun-Container-Path-Stat'] = base64.b64encode(
+            jsonutils.dump_as_bytes(stat)).decode('utf-8')
+        response.app_iter = chunks
+        return response
+
+    @base.Controller.api_version("1.40")
+    @pecan.expose('json')
+    @exception.wrap_pecan_controller_exception
+    def put_archive_stream(self, container_ident, path):
+        """Stream a file/folder into a container
+
+        Extract the raw tar archive of the request body to a path of an
+        existing container. The archive is streamed to the docker daemon of
+        the compute host as it is received.
+        :param container_ident: UUID or Name of a container.
+        :param path: The path to extract the archive to.
+        """
+        container = utils.get_container(container_ident)
+        check_policy_on_container(container.as_dict(), "container:put_archive")
+        utils.validate_container_state(container, 'put_archive')
+        LOG.debug('Streaming archive to %(uuid)s path %(path)s',
+                  {'uuid': container.uuid, 'path': path})
+        context = pecan.request.context
+        compute_api = pecan.request.compute_api
+        url = compute_api.container_archive_url(context, container)
+        docker_utils.put_archive_stream(
+            url, container.container_id, path, pecan.request.body_file)
+
     @pecan.expose('json')
     @exception.wrap_pecan_controller_exception
     def stats(self, container_ident):
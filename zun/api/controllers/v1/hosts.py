@@ -61,6 +61,10 @@ class HostCollection(collection.Collection):
 class HostController(base.Controller):
     """Host info controller"""
 
+    _custom_actions = {
+        'stats': ['GET'],
+    }
+
     @pecan.expose('json')
     @base.Controller.api_version("1.4")
     @exception.wrap_pecan_controller_exception
@@ -107,3 +111,22 @@ class HostController(base.Controller):
         policy.enforce(context, "host:get", action="host:get")
         host = _get_host(host_ident)
         return view.format_host(pecan.request.host_url, host)
+
+    @pecan.expose('json')
+    @base.Controller.api_version("1.39")
+    @exception.wrap_pecan_controller_exception
+    def stats(self, host_ident, project_id=None):
+        """Display stats snapshot of the containers of the given host.
+
+        :param host_ident: UUID or name of a host.
+        :param project_id: Only display the stats of the containers of
+                           this project.
+        """
+        context = pecan.request.context
+        policy.enforce(context, "host:stats", action="host:stats")
+        host = _get_host(host_ident)
+        context.all_projects = True
+        compute_api = pecan.request.compute_api
+        containers = compute_api.host_container_stats(
+            context, host.hostname, project_id=project_id)
+        return {'host': host.hostname, 'containers': containers}
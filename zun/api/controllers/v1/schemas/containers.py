@@ -54,6 +54,7 @@ legacy_container_create = {
 
 _container_properties = copy.deepcopy(_legacy_container_properties)
 _container_properties['command'] = parameter_types.command_list
+_container_properties['count'] = parameter_types.container_count
 
 container_create = {
     'type': 'object',
@@ -118,6 +118,13 @@ disk = {
     'pattern': '^[0-9]+$'
 }
 
+container_count = {
+    'type': ['integer', 'string'],
+    'pattern': '^[0-9]+$',
+    'minimum': 1,
+    'maximum': CONF.maximum_container_count
+}
+
 workdir = {
     'type': ['string', 'null']
 }
@@ -14,6 +14,8 @@
 import itertools
 
 from zun.api.controllers import link
+from zun.common import exception
+from zun.common.i18n import _
 from zun.common.policies import container as policies
 
 _basic_keys = (
@@ -54,13 +56,47 @@ _basic_keys = (
 )
 
 
-def format_container(context, url, container):
+def get_fields(fields):
+    """Parse the keys of a sparse fieldset of containers.
+
+    :param fields: a comma-separated list of keys of the container view.
+    :returns: the set of keys, the links come along with the uuid.
+    """
+    keys = set(key.strip() for key in fields.split(',') if key.strip())
+    if not keys:
+        raise exception.InvalidValue(_('No fields are given'))
+    unknown = keys - set(_basic_keys)
+    if unknown:
+        raise exception.InvalidValue(_('Unknown fields: %s') %
+                                     ', '.join(sorted(unknown)))
+    if 'links' in keys:
+        keys.discard('links')
+        keys.add('uuid')
+    return keys
+
+
+def get_allowed_keys(context):
+    """Return the keys of the container view allowed by policy.
+
+    The policy checks only depend on the context, so the keys are computed
+    once and applied to every container of a response.
+    """
+    return frozenset(
+        key for key in _basic_keys
+        if context.cached_can(policies.CONTAINER % ('get_one:%s' % key),
+                              might_not_exist=True))
+
+
+def format_container(context, url, container, fields=None,
+                     allowed_keys=None):
+    if allowed_keys is None:
+        allowed_keys = get_allowed_keys(context)
+    if fields is not None:
+        allowed_keys = allowed_keys & fields
+
     def transform(key, value):
-        if key not in _basic_keys:
-            return
         # strip the key if it is not allowed by policy
-        policy_action = policies.CONTAINER % ('get_one:%s' % key)
-        if not context.can(policy_action, fatal=False, might_not_exist=True):
+        if key not in allowed_keys:
             return
         if key == 'uuid':
             yield ('uuid', value)
@@ -71,10 +71,14 @@ REST_API_VERSION_HISTORY = """REST API Version History:
     * 1.36 - Add 'tty' to container
     * 1.37 - Add 'tty' and 'stdin' to capsule
     * 1.38 - Add 'annotations' to capsule
+    * 1.39 - Add stats of all the containers of a host
+    * 1.40 - Stream archives of containers
+    * 1.41 - Create several containers of the same spec at once
+    * 1.42 - Add sparse fieldsets and keyset markers to the container list
 """
 
 BASE_VER = '1.1'
-CURRENT_MAX_VER = '1.38'
+CURRENT_MAX_VER = '1.42'
 
 
 class Version(object):
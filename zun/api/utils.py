@@ -13,7 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
 import functools
+
+from oslo_serialization import jsonutils
 from oslo_utils import uuidutils
 import pecan
 
@@ -57,6 +60,29 @@ def validate_sort_dir(sort_dir):
     return sort_dir
 
 
+def encode_marker(values):
+    """Encode the sort key values of the last item of a page as a marker.
+
+    The marker is opaque to the clients. Unlike the UUID of the last item,
+    the next page can be fetched with it without looking the item up.
+    """
+    marker = base64.urlsafe_b64encode(jsonutils.dump_as_bytes(values))
+    return marker.rstrip(b'=').decode('ascii')
+
+
+def decode_marker(marker):
+    """Decode a marker of encode_marker() back to the sort key values."""
+    try:
+        padded = marker + '=' * (-len(marker) % 4)
+        values = jsonutils.loads(base64.urlsafe_b64decode(
+            padded.encode('ascii')))
+    except (TypeError, ValueError):
+        values = None
+    if not isinstance(values, list):
+        raise exception.InvalidValue(_("Invalid marker: %s") % marker)
+    return values
+
+
 def get_resource(resource, resource_ident):
     """Get the resource from the uuid or logical name.
 
@@ -107,6 +133,14 @@ def enforce_content_types(valid_content_types):
     return content_types_decorator
 
 
+def is_version_at_least(version):
+    """Return whether the version of the request is at least the given one.
+
+    :param version: The version to compare with.
+    """
+    return pecan.request.version >= versions.Version('', '', '', version)
+
+
 def version_check(action, version):
     """Check whether the current version supports the operation.
 
@@ -15,6 +15,8 @@
 
 from oslo_config import cfg
 
+from zun.common import context
+from zun.db import api as dbapi
 from zun.db import migration
 
 
@@ -38,6 +40,16 @@ def do_revision():
                        autogenerate=CONF.command.autogenerate)
 
 
+def do_quota_usage_sync():
+    synced = dbapi.quota_usage_sync(context.get_admin_context(),
+                                    CONF.command.project_id)
+    for project_id, usages in sorted(synced.items()):
+        for resource, usage in sorted(usages.items()):
+            print('%(project_id)s %(resource)s: in_use %(previous_in_use)s '
+                  '-> %(in_use)s' %
+                  dict(usage, project_id=project_id, resource=resource))
+
+
 def add_command_parsers(subparsers):
     parser = subparsers.add_parser('version')
     parser.set_defaults(func=do_version)
@@ -55,6 +67,10 @@ def add_command_parsers(subparsers):
     parser.add_argument('--autogenerate', action='store_true')
     parser.set_defaults(func=do_revision)
 
+    parser = subparsers.add_parser('quota_usage_sync')
+    parser.add_argument('--project-id')
+    parser.set_defaults(func=do_quota_usage_sync)
+
 
 def main():
     command_opt = cfg.SubCommandOpt('command',
@@ -31,14 +31,14 @@ TASK_STATES = (
     CONTAINER_STOPPING, CONTAINER_REBOOTING, CONTAINER_PAUSING,
     CONTAINER_UNPAUSING, CONTAINER_KILLING, SG_ADDING,
     SG_REMOVING, NETWORK_ATTACHING, NETWORK_DETACHING,
-    CONTAINER_REBUILDING,
+    CONTAINER_REBUILDING, CONTAINER_QUEUED,
 ) = (
     'image_pulling', 'container_creating',
     'container_starting', 'container_deleting',
     'container_stopping', 'container_rebooting', 'container_pausing',
     'container_unpausing', 'container_killing', 'sg_adding',
     'sg_removing', 'network_attaching', 'network_detaching',
-    'container_rebuilding',
+    'container_rebuilding', 'container_queued',
 )
 
 RESOURCE_CLASSES = (
@@ -72,6 +72,7 @@ class RequestContext(context.RequestContext):
         if isinstance(timestamp, six.string_types):
             timestamp = timeutils.parse_strtime(timestamp)
         self.timestamp = timestamp
+        self._policy_cache = {}
 
     def to_dict(self):
         value = super(RequestContext, self).to_dict()
@@ -114,6 +115,7 @@ class RequestContext(context.RequestContext):
         # without changes
         context.roles = copy.deepcopy(self.roles)
         context.is_admin = True
+        context._policy_cache = {}
 
         if 'admin' not in context.roles:
             context.roles.append('admin')
@@ -153,6 +155,21 @@ class RequestContext(context.RequestContext):
                 raise
             return False
 
+    def cached_can(self, action, might_not_exist=False):
+        """Like can() on the default target, the result is memoized.
+
+        The default target only depends on the context, so the result of
+        the check is kept for the lifetime of the context. This is meant
+        for the checks that are repeated for every item of a response.
+
+        :return: True if authorized, False otherwise.
+        """
+        key = (action, might_not_exist)
+        if key not in self._policy_cache:
+            self._policy_cache[key] = bool(self.can(
+                action, fatal=False, might_not_exist=might_not_exist))
+        return self._policy_cache[key]
+
 
 def make_context(*args, **kwargs):
     return RequestContext(*args, **kwargs)
@@ -536,6 +536,11 @@ class NoValidHost(ZunException):
     message = _("No valid host was found. %(reason)s")
 
 
+class AllocationClaimFailed(NoValidHost):
+    message = _("No valid host was found. Unable to successfully claim "
+                "against any host.")
+
+
 class NoInteractiveFlag(Invalid):
     message = _("%(msg)s")
 
@@ -0,0 +1,121 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Best-fit placement of containers with dedicated CPUs on NUMA nodes.
+
+Both the scheduler and the compute claim pick the NUMA node of a container
+with these helpers, so that they agree on the node. The node that is left
+with the fewest free CPUs, then the least free memory, is picked, which
+keeps the larger NUMA nodes free for the larger containers.
+"""
+
+
+def _free_cpu_count(numa_node):
+    return len(numa_node.cpuset) - len(numa_node.pinned_cpus)
+
+
+def _siblings(numa_node):
+    if numa_node.obj_attr_is_set('siblings'):
+        return numa_node.siblings
+    return []
+
+
+def fit_container(numa_topology, cpu, memory):
+    """Return the NUMA node that fits the container the most tightly.
+
+    :param numa_topology: the NUMATopology of the host.
+    :param cpu: the number of dedicated CPUs of the container.
+    :param memory: the memory of the container in MiB.
+    :returns: a NUMANode, or None if the container fits in none of them.
+    """
+    best = None
+    best_key = None
+    for numa_node in numa_topology.nodes:
+        free_cpu = _free_cpu_count(numa_node)
+        if free_cpu < cpu or numa_node.mem_available < memory:
+            continue
+        key = (free_cpu - cpu, numa_node.mem_available - memory, numa_node.id)
+        if best_key is None or key < best_key:
+            best, best_key = numa_node, key
+    return best
+
+
+def get_cpuset_limits(numa_node):
+    """Return the cpuset limits of a container placed on a NUMA node."""
+    return {
+        'node': numa_node.id,
+        'cpuset_cpu': numa_node.cpuset,
+        'cpuset_cpu_pinned': numa_node.pinned_cpus,
+        'cpuset_cpu_siblings': _siblings(numa_node),
+        'cpuset_mem': numa_node.mem_available
+    }
+
+
+def pick_cpus(free_cpus, siblings, count):
+    """Pick the CPUs to pin a container to out of the free ones.
+
+    The free CPUs are grouped by the physical core they belong to. The
+    smallest group that holds the remaining CPUs is taken, so that the
+    threads of a container share cores and that partially used cores are
+    filled before whole free cores are broken up. If no group is big
+    enough, the biggest group is taken and the rest is picked the same way.
+
+    :param free_cpus: the set of CPUs that are not pinned.
+    :param siblings: a list of sets of CPUs that are threads of the same
+                     core, the CPUs in none of the sets are cores on their
+                     own.
+    :param count: the number of CPUs to pick.
+    :returns: the set of picked CPUs.
+    """
+    free_cpus = set(free_cpus)
+    groups = []
+    for core in siblings:
+        group = set(core) & free_cpus
+        if group:
+            groups.append(group)
+            free_cpus -= group
+    groups.extend(set([cpu]) for cpu in free_cpus)
+
+    picked = set()
+    remaining = count
+    while remaining > 0 and groups:
+        fitting = [group for group in groups if len(group) >= remaining]
+        if fitting:
+            group = min(fitting, key=lambda g: (len(g), min(g)))
+            picked |= set(sorted(group)[:remaining])
+            break
+        group = max(groups, key=lambda g: (len(g), -min(g)))
+        groups.remove(group)
+        picked |= group
+        remaining -= len(group)
+    return picked
+
+
+def fragmentation(numa_topology, numa_node=None, cpu=0):
+    """Return how scattered the free dedicated CPUs of a host are.
+
+    The score is the share of the free CPUs that are not on the NUMA node
+    with the most free CPUs, from 0 when they are all on one node up to
+    nearly 1 when they are spread evenly over many nodes. If ``numa_node``
+    is given, the score is computed as if ``cpu`` more CPUs were pinned on
+    it.
+    """
+    free = []
+    for node in numa_topology.nodes:
+        free_cpu = _free_cpu_count(node)
+        if numa_node is not None and node.id == numa_node.id:
+            free_cpu -= cpu
+        free.append(max(free_cpu, 0))
+    total = sum(free)
+    if not total:
+        return 0.0
+    return 1.0 - float(max(free)) / total
@@ -38,6 +38,17 @@ rules = [
                 'method': 'GET'
             }
         ]
+    ),
+    policy.DocumentedRuleDefault(
+        name=HOST % 'stats',
+        check_str=base.RULE_ADMIN_API,
+        description='Display the stats of the containers of a compute host.',
+        operations=[
+            {
+                'path': '/v1/hosts/{host_ident}/stats',
+                'method': 'GET'
+            }
+        ]
     )
 ]
 
@@ -126,9 +126,12 @@ class DbQuotaDriver(object):
                                                                  project_id)
         project_usages = {}
         if usages:
-            for resource in resources.values():
-                project_usages[resource.name] = resource.count(context,
-                                                               project_id)
+            # The usages are counters kept up to date as the containers
+            # are created, deleted and resized
+            for name, usage in objects.Quota.get_usages(
+                    context, project_id).items():
+                if name in resources:
+                    project_usages[name] = usage['in_use']
         return self._process_quotas(context, resources, project_id,
                                     project_quotas, quota_class,
                                     defaults=defaults, usages=project_usages)
@@ -217,6 +220,64 @@ class DbQuotaDriver(object):
             raise exception.OverQuota(overs=sorted(overs), quotas=quotas,
                                       usages={}, headroom=headroom)
 
+    def reserve(self, context, resources, deltas, project_id=None):
+        """Reserve resources within the quota limits.
+
+        The usage and the reservations of each resource, plus its delta,
+        are checked against its quota, and the deltas are reserved in the
+        same transaction. If any of the resources would be over quota, an
+        OverQuota exception will be raised and nothing is reserved. The
+        reservation must be released with release() once the resources
+        were created, their usage is then counted instead.
+
+        :param context: The request context, for access checks.
+        :param resources: A dictionary of the registered resources.
+        :param deltas: A dictionary of the amount of each resource to
+                       reserve, the negative amounts are ignored.
+        :param project_id: Specify the project_id if current context
+                           is admin and admin wants to impact on
+                           common user's project.
+        """
+        _valid_method_call_check_resources(deltas, 'reserve', resources)
+
+        # If project_id is None, then we use the project_id in context
+        if project_id is None:
+            project_id = context.project_id
+
+        quotas = self._get_quotas(context, resources, deltas.keys(),
+                                  project_id=project_id)
+        objects.Quota.reserve(context, project_id, deltas, quotas)
+
+    def release(self, context, resources, deltas, project_id=None):
+        """Release resources reserved by reserve().
+
+        :param context: The request context, for access checks.
+        :param resources: A dictionary of the registered resources.
+        :param deltas: The dictionary that was passed to reserve().
+        :param project_id: Specify the project_id if current context
+                           is admin and admin wants to impact on
+                           common user's project.
+        """
+        _valid_method_call_check_resources(deltas, 'release', resources)
+
+        # If project_id is None, then we use the project_id in context
+        if project_id is None:
+            project_id = context.project_id
+
+        objects.Quota.release(context, project_id, deltas)
+
+    def sync_usages(self, context, project_id=None):
+        """Count the usages again from the containers.
+
+        The reservations are dropped as well, e.g. the ones left behind by
+        an API server that died before releasing them.
+
+        :param context: The request context, for access checks.
+        :param project_id: The ID of the project, all the projects if None.
+        :returns: A dict of the corrected usages by project ID and resource.
+        """
+        return objects.Quota.sync_usages(context, project_id)
+
     def destroy_all_by_project(self, context, project_id):
         """Destroy all quotas associated with a project.
 
@@ -317,6 +378,39 @@ class NoopQuotaDriver(object):
         """
         pass
 
+    def reserve(self, context, resources, deltas, project_id=None):
+        """Reserve resources within the quota limits.
+
+        :param context: The request context, for access checks.
+        :param resources: A dictionary of the registered resources.
+        :param deltas: A dictionary of the amount of each resource to
+                       reserve.
+        :param project_id: Specify the project_id if current context is
+                           admin and the admin wants to impact on
+                           common user's project.
+        """
+        pass
+
+    def release(self, context, resources, deltas, project_id=None):
+        """Release resources reserved by reserve().
+
+        :param context: The request context, for access checks.
+        :param resources: A dictionary of the registered resources.
+        :param deltas: The dictionary that was passed to reserve().
+        :param project_id: Specify the project_id if current context is
+                           admin and the admin wants to impact on
+                           common user's project.
+        """
+        pass
+
+    def sync_usages(self, context, project_id=None):
+        """Count the usages again from the containers.
+
+        :param context: The request context, for access checks.
+        :param project_id: The ID of the project, all the projects if None.
+        """
+        return {}
+
     def destroy_all_by_project(self, context, project_id):
         """Destroy all quotas associated with a project.
 
@@ -549,6 +643,50 @@ class QuotaEngine(object):
         return self._driver.limit_check(context, self._resources, values,
                                         project_id=project_id)
 
+    def reserve(self, context, project_id=None, **deltas):
+        """Reserve resources within the quota limits.
+
+        The amounts to reserve are given as keyword arguments, where the
+        key identifies the resource. The usage of each resource, plus the
+        reservations and the amount, is checked against its quota in a
+        single transaction.
+
+        If any of the resources would be over quota, an OverQuota exception
+        will be raised with the sorted list of the resources which are too
+        high and nothing is reserved. Otherwise, the reservation must be
+        released with release() once the resources were created.
+
+        :param context: The request context, for access checks.
+        :param project_id: Specify the project_id if current context
+                           is admin and admin wants to impact on
+                           common user's project.
+        """
+
+        self._driver.reserve(context, self._resources, deltas,
+                             project_id=project_id)
+
+    def release(self, context, project_id=None, **deltas):
+        """Release resources reserved by reserve().
+
+        :param context: The request context, for access checks.
+        :param project_id: Specify the project_id if current context
+                           is admin and admin wants to impact on
+                           common user's project.
+        """
+
+        self._driver.release(context, self._resources, deltas,
+                             project_id=project_id)
+
+    def sync_usages(self, context, project_id=None):
+        """Count the usages again from the containers.
+
+        :param context: The request context, for access checks.
+        :param project_id: The ID of the project, all the projects if None.
+        :returns: A dict of the corrected usages by project ID and resource.
+        """
+
+        return self._driver.sync_usages(context, project_id=project_id)
+
     def destroy_all_by_project(self, context, project_id):
         """Destroy all quotas, usages associated with a project.
 
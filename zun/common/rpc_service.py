@@ -64,6 +64,9 @@ class Service(service.Service):
             if hasattr(endpoint, 'init_containers'):
                 endpoint.init_containers(
                     context.get_admin_context(all_projects=True))
+            if hasattr(endpoint, 'watch_container_events'):
+                endpoint.watch_container_events(
+                    context.get_admin_context(all_projects=True))
             self.tg.add_dynamic_timer(
                 endpoint.run_periodic_tasks,
                 periodic_interval_max=CONF.periodic_interval_max,
@@ -83,17 +86,33 @@ class Service(service.Service):
         return service_obj
 
 
+_CLIENTS = {}
+
+
+def _get_client(topic, server, timeout):
+    """Return a RPC client shared by all the APIs of a process.
+
+    RPC clients are not bound to a context so a client is built once per
+    target and reused by all the APIs, e.g. across the requests of zun-api.
+    """
+    key = (rpc.TRANSPORT, topic, server, timeout)
+    client = _CLIENTS.get(key)
+    if client is None:
+        target = messaging.Target(topic=topic, server=server)
+        client = rpc.get_client(target,
+                                serializer=_init_serializer(),
+                                timeout=timeout)
+        _CLIENTS[key] = client
+    return client
+
+
 class API(object):
     def __init__(self, context=None, topic=None, server=None,
                  timeout=None):
-        serializer = _init_serializer()
         self._context = context
         if topic is None:
             topic = ''
-        target = messaging.Target(topic=topic, server=server)
-        self._client = rpc.get_client(target,
-                                      serializer=serializer,
-                                      timeout=timeout)
+        self._client = _get_client(topic, server, timeout)
 
     def _call(self, server, method, *args, **kwargs):
         cctxt = self._client.prepare(server=server)
@@ -29,6 +29,18 @@ from zun.scheduler.client import query as scheduler_client
 CONF = zun.conf.CONF
 LOG = logging.getLogger(__name__)
 
+_SCHEDULER_CLIENT = None
+
+
+def _get_scheduler_client():
+    # NOTE: the scheduler client loads the scheduler driver and its filters
+    # and opens sessions to placement. It holds no per-request state, so it
+    # is built once per process and shared by all the requests.
+    global _SCHEDULER_CLIENT
+    if _SCHEDULER_CLIENT is None:
+        _SCHEDULER_CLIENT = scheduler_client.SchedulerClient()
+    return _SCHEDULER_CLIENT
+
 
 @profiler.trace_cls("rpc")
 class API(object):
@@ -36,7 +48,7 @@ class API(object):
 
     def __init__(self, context):
         self.rpcapi = rpcapi.API(context=context)
-        self.scheduler_client = scheduler_client.SchedulerClient()
+        self.scheduler_client = _get_scheduler_client()
         super(API, self).__init__()
 
     def _record_action_start(self, context, container, action):
@@ -50,17 +62,62 @@ class API(object):
             host_state = self._schedule_container(context, new_container,
                                                   extra_spec)
         except exception.NoValidHost:
-            new_container.status = consts.ERROR
-            new_container.status_reason = _(
-                "There are not enough hosts available.")
-            new_container.save(context)
+            self._set_containers_error(
+                context, [new_container],
+                _("There are not enough hosts available."))
+            return
+        except Exception:
+            self._set_containers_error(context, [new_container],
+                                       _("Unexpected exception occurred."))
+            raise
+
+        self._validate_image(context, new_container, host_state['host'])
+        self._create_on_host(context, new_container, host_state,
+                             requested_networks, requested_volumes, run,
+                             pci_requests)
+
+    def container_create_batch(self, context, new_containers, extra_spec,
+                               requested_networks, requested_volumes, run,
+                               pci_requests=None):
+        """Create several containers of the same spec.
+
+        The containers are scheduled together so that the resources of all
+        of them are looked up and claimed at once.
+
+        :param requested_volumes: the requested volumes of the containers,
+                                  keyed by the uuid of the container.
+        """
+        try:
+            host_states = self.scheduler_client.select_destinations(
+                context, new_containers, extra_spec)
+        except exception.NoValidHost:
+            self._set_containers_error(
+                context, new_containers,
+                _("There are not enough hosts available."))
             return
         except Exception:
-            new_container.status = consts.ERROR
-            new_container.status_reason = _("Unexpected exception occurred.")
-            new_container.save(context)
+            self._set_containers_error(context, new_containers,
+                                       _("Unexpected exception occurred."))
             raise
 
+        # NOTE: the containers share the same image, it is validated once
+        # per host the containers are created on.
+        for host in set(host_state['host'] for host_state in host_states):
+            self._validate_image(context, new_containers[0], host)
+        for new_container, host_state in zip(new_containers, host_states):
+            container_volumes = {
+                new_container.uuid: requested_volumes[new_container.uuid]}
+            self._create_on_host(context, new_container, host_state,
+                                 requested_networks, container_volumes, run,
+                                 pci_requests)
+
+    def _set_containers_error(self, context, containers, reason):
+        for container in containers:
+            container.status = consts.ERROR
+            container.status_reason = reason
+            container.save(context)
+
+    def _validate_image(self, context, new_container, host):
         # NOTE(mkrai): Intent here is to check the existence of image
         # before proceeding to create container. If image is not found,
         # container create will fail with 400 status.
@@ -69,7 +126,7 @@ class API(object):
                 images = self.rpcapi.image_search(
                     context, new_container.image,
                     new_container.image_driver, True, new_container.registry,
-                    host_state['host'])
+                    host)
                 if not images:
                     raise exception.ImageNotFound(image=new_container.image)
                 if len(images) > 1:
@@ -89,6 +146,9 @@ class API(object):
                 LOG.warning("Skip validation since image search failed with "
                             "unexpected exception: %s", str(e))
 
+    def _create_on_host(self, context, new_container, host_state,
+                        requested_networks, requested_volumes, run,
+                        pci_requests):
         self._record_action_start(context, new_container,
                                   container_actions.CREATE)
         self.rpcapi.container_create(context, host_state['host'],
@@ -189,9 +249,16 @@ class API(object):
     def container_put_archive(self, context, container, *args):
         return self.rpcapi.container_put_archive(context, container, *args)
 
+    def container_archive_url(self, context, container):
+        return self.rpcapi.container_archive_url(context, container)
+
     def container_stats(self, context, container):
         return self.rpcapi.container_stats(context, container)
 
+    def host_container_stats(self, context, host, project_id=None):
+        return self.rpcapi.host_container_stats(context, host,
+                                                project_id=project_id)
+
     def container_commit(self, context, container, *args):
         self._record_action_start(context, container, container_actions.COMMIT)
         return self.rpcapi.container_commit(context, container, *args)
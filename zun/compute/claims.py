@@ -18,10 +18,10 @@ Claim objects for use with resource tracking.
 """
 
 from oslo_log import log as logging
-import random
 
 from zun.common import exception
 from zun.common.i18n import _
+from zun.common import numa
 from zun import objects
 
 
@@ -109,10 +109,11 @@ class Claim(NopClaim):
         self.tracker.abort_container_claim(self.context, self.container)
 
     def claim_cpuset_cpu_for_container(self, container, limits):
-        available_cpu = list(set(limits['cpuset']['cpuset_cpu']) -
-                             set(limits['cpuset']['cpuset_cpu_pinned']))
-        cpuset_cpu_usage = random.sample(available_cpu, int(self.cpu))
-        container.cpuset.cpuset_cpus = set(cpuset_cpu_usage)
+        available_cpu = (set(limits['cpuset']['cpuset_cpu']) -
+                         set(limits['cpuset']['cpuset_cpu_pinned']))
+        siblings = limits['cpuset'].get('cpuset_cpu_siblings', [])
+        container.cpuset.cpuset_cpus = numa.pick_cpus(
+            available_cpu, siblings, int(self.cpu))
 
     def claim_cpuset_mem_for_container(self, container, limits):
         container.cpuset.cpuset_mems = set(limits['cpuset']['node'])
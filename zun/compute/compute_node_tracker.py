@@ -17,6 +17,7 @@ import copy
 import socket
 
 from oslo_log import log as logging
+from oslo_utils import timeutils
 import retrying
 
 from zun.common import consts
@@ -33,6 +34,10 @@ from zun.scheduler.client import query as scheduler_client
 CONF = zun.conf.CONF
 LOG = logging.getLogger(__name__)
 COMPUTE_RESOURCE_SEMAPHORE = "compute_resources"
+# The compute node fields that are computed from the containers on the host
+# rather than copied from the resources reported by the container driver.
+USAGE_FIELDS = ('numa_topology', 'mem_free', 'mem_used', 'cpu_used',
+                'running_containers', 'disk_used')
 
 
 class ComputeNodeTracker(object):
@@ -47,6 +52,7 @@ class ComputeNodeTracker(object):
         self.pci_tracker = None
         self.reportclient = reportclient
         self.rp_uuid = None
+        self._last_audit = None
 
     def _setup_pci_tracker(self, context, compute_node):
         if not self.pci_tracker:
@@ -75,16 +81,13 @@ class ComputeNodeTracker(object):
             self._copy_resources(node, resources)
             node.create(context)
             LOG.info('Node created for :%(host)s', {'host': self.host})
-        else:
-            self._copy_resources(node, resources)
         node.rp_uuid = self._get_node_rp_uuid(context, node)
         self._setup_pci_tracker(context, node)
-        self.compute_node = node
-        self._update_available_resource(context)
+        self._update_available_resource(context, node, resources)
         # NOTE(sbiswas7): Consider removing the return statement if not needed
-        return node
+        return self.compute_node
 
-    def _copy_resources(self, node, resources):
+    def _copy_resources(self, node, resources, exclude=()):
         keys = ["numa_topology", "mem_total", "mem_free", "mem_available",
                 "mem_used", "total_containers", "running_containers",
                 "paused_containers", "stopped_containers", "cpus",
@@ -92,7 +95,7 @@ class ComputeNodeTracker(object):
                 "labels", "disk_total", "disk_quota_supported", "runtimes",
                 "enable_cpu_pinning"]
         for key in keys:
-            if key in resources:
+            if key in resources and key not in exclude:
                 setattr(node, key, resources[key])
 
     def _get_compute_node(self, context):
@@ -433,20 +436,34 @@ class ComputeNodeTracker(object):
             LOG.error('Unable to find services table record for zun-compute '
                       'host %s', self.host)
 
+    def _audit_due(self):
+        if self._last_audit is None:
+            return True
+        return (timeutils.delta_seconds(self._last_audit, timeutils.utcnow())
+                >= CONF.compute.resource_audit_interval)
+
     @utils.synchronized(COMPUTE_RESOURCE_SEMAPHORE)
-    def _update_available_resource(self, context):
+    def _update_available_resource(self, context, node, resources):
+        audit = self._audit_due()
+        if audit:
+            tracked_usage = None
+            if self.compute_node is not None:
+                tracked_usage = self._get_node_usage(self.compute_node)
+            self._copy_resources(node, resources)
+            self.compute_node = node
+        else:
+            # NOTE: the usage of the node is kept up to date by the claims,
+            # only the resources reported by the driver are refreshed.
+            self._copy_resources(self.compute_node, resources,
+                                 exclude=USAGE_FIELDS)
 
         # if we could not init the compute node the tracker will be
         # disabled and we should quit now
         if self.disabled(self.host):
             return
 
-        # Grab all containers assigned to this node:
-        containers = objects.Container.list_by_host(context, self.host)
-        capsules = objects.Capsule.list_by_host(context, self.host)
-
-        # Now calculate usage based on container utilization:
-        self._update_usage_from_containers(context, containers + capsules)
+        if audit:
+            self._audit_usage(context, tracked_usage)
 
         # No migration for docker, is there will be orphan container? Nova has.
 
@@ -457,6 +474,44 @@ class ComputeNodeTracker(object):
         LOG.debug('Compute_service record updated for %(host)s',
                   {'host': self.host})
 
+    def _audit_usage(self, context, tracked_usage):
+        """Recompute the usage of the node from the containers on the host.
+
+        :param tracked_usage: the usage kept by the claims since the previous
+                              audit, a warning is logged if it drifted from
+                              the recomputed usage.
+        """
+        # Grab all containers assigned to this node:
+        containers = objects.Container.list_by_host(context, self.host)
+        capsules = objects.Capsule.list_by_host(context, self.host)
+
+        # Now calculate usage based on container utilization:
+        self._update_usage_from_containers(context, containers + capsules)
+        self._last_audit = timeutils.utcnow()
+
+        if tracked_usage is None:
+            return
+        usage = self._get_node_usage(self.compute_node)
+        drift = {key: {'tracked': tracked_usage.get(key), 'actual': value}
+                 for key, value in usage.items()
+                 if tracked_usage.get(key) != value}
+        if drift:
+            LOG.warning('The resource usage tracked for %(host)s drifted '
+                        'from the containers on the host: %(drift)s',
+                        {'host': self.host, 'drift': drift})
+
+    @staticmethod
+    def _get_node_usage(compute_node):
+        usage = {'cpu_used': round(compute_node.cpu_used or 0, 3),
+                 'mem_used': compute_node.mem_used or 0,
+                 'disk_used': compute_node.disk_used or 0,
+                 'running_containers': compute_node.running_containers or 0}
+        if compute_node.numa_topology:
+            usage['pinned_cpus'] = {
+                numa_node.id: sorted(numa_node.pinned_cpus)
+                for numa_node in compute_node.numa_topology.nodes}
+        return usage
+
     def _get_usage_dict(self, container, **updates):
         """Make a usage dict _update methods expect.
 
@@ -0,0 +1,131 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Bounded executor for the background tasks of zun-compute."""
+
+import collections
+import time
+
+from oslo_context import context as common_context
+from oslo_utils import excutils
+
+from zun.common import exception
+from zun.common.i18n import _
+from zun.common import utils
+import zun.conf
+
+CONF = zun.conf.CONF
+
+TASK_CLASSES = (
+    IMAGE_PULL, CREATE, DELETE, COMMIT, ACTION
+) = (
+    'image_pull', 'create', 'delete', 'commit', 'action'
+)
+
+
+def get_task_limits():
+    return {IMAGE_PULL: CONF.compute.max_concurrent_image_pulls,
+            CREATE: CONF.compute.max_concurrent_creates,
+            DELETE: CONF.compute.max_concurrent_deletes,
+            COMMIT: CONF.compute.max_concurrent_commits,
+            ACTION: CONF.compute.max_concurrent_actions}
+
+
+class _TaskQueue(object):
+    """A FIFO queue of tasks processed by a bounded number of workers.
+
+    Workers are greenthreads that are spawned on demand and exit once the
+    queue is drained.
+    """
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.running = 0
+        self.submitted = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self._tasks = collections.deque()
+
+    def is_full(self):
+        return self.running >= self.size
+
+    def submit(self, func, *args, **kwargs):
+        _context = common_context.get_current()
+        self._tasks.append((time.time(), _context, func, args, kwargs))
+        self.submitted += 1
+        if not self.is_full():
+            self._start_worker()
+
+    def _start_worker(self):
+        self.running += 1
+        utils.spawn_n(self._work)
+
+    def _work(self):
+        while self._tasks:
+            queued_at, _context, func, args, kwargs = self._tasks.popleft()
+            wait_time = time.time() - queued_at
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+            if _context is not None:
+                _context.update_store()
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                with excutils.save_and_reraise_exception():
+                    # NOTE: this worker dies with the exception, hand the
+                    # remaining tasks over to a new one.
+                    self.running -= 1
+                    if self._tasks:
+                        self._start_worker()
+        self.running -= 1
+
+    def stats(self):
+        processed = self.submitted - len(self._tasks)
+        return {'max_size': self.size,
+                'running': self.running,
+                'queued': len(self._tasks),
+                'submitted': self.submitted,
+                'avg_wait_time': (self.total_wait_time / processed
+                                  if processed else 0.0),
+                'max_wait_time': self.max_wait_time}
+
+
+class TaskExecutor(object):
+    """Run tasks with a concurrency limit per class of tasks.
+
+    Tasks of a class that is at its limit wait in a FIFO queue until one
+    of the running tasks of the same class finishes.
+    """
+
+    def __init__(self, limits=None):
+        if limits is None:
+            limits = get_task_limits()
+        self._queues = {name: _TaskQueue(name, size)
+                        for name, size in limits.items()}
+
+    def _get_queue(self, task_class):
+        try:
+            return self._queues[task_class]
+        except KeyError:
+            raise exception.ZunException(
+                _('Unknown task class: %s') % task_class)
+
+    def is_full(self, task_class):
+        """Whether a new task of this class would have to wait."""
+        return self._get_queue(task_class).is_full()
+
+    def submit(self, task_class, func, *args, **kwargs):
+        self._get_queue(task_class).submit(func, *args, **kwargs)
+
+    def stats(self):
+        return {name: queue.stats() for name, queue in self._queues.items()}
@@ -17,6 +17,7 @@ import itertools
 import math
 import time
 
+import eventlet
 from oslo_log import log as logging
 from oslo_service import periodic_task
 from oslo_utils import excutils
@@ -28,12 +29,14 @@ from zun.common import consts
 from zun.common import context
 from zun.common import exception
 from zun.common.i18n import _
+from zun.common import numa
 from zun.common import utils
 from zun.common.utils import translate_exception
 from zun.common.utils import wrap_container_event
 from zun.common.utils import wrap_exception
 from zun.compute import compute_node_tracker
 from zun.compute import container_actions
+from zun.compute import executor
 import zun.conf
 from zun.container import driver as driver_module
 from zun.image.glance import driver as glance
@@ -55,6 +58,9 @@ class Manager(periodic_task.PeriodicTasks):
         self.host = CONF.host
         self._resource_tracker = None
         self.reportclient = report.SchedulerReportClient()
+        self._executor = executor.TaskExecutor()
+        self._watching_container_events = False
+        self._last_container_state_sync = None
 
     def _get_driver(self, container):
         if (isinstance(container, objects.Capsule) or
@@ -79,18 +85,51 @@ class Manager(periodic_task.PeriodicTasks):
             self.container_start(context, container)
 
     def init_containers(self, context):
+        start_time = time.time()
         containers = objects.Container.list_by_host(context, self.host)
-        # TODO(hongbin): init capsules as well
+        capsules = objects.Capsule.list_by_host(context, self.host)
+        list_db_time = time.time()
         local_containers, _ = self.driver.list(context)
         uuid_to_status_map = {container.uuid: container.status
                               for container in local_containers}
+        list_driver_time = time.time()
+
+        pool = eventlet.GreenPool(CONF.compute.max_concurrent_init_containers)
         for container in containers:
-            current_status = uuid_to_status_map[container.uuid]
+            pool.spawn_n(self._init_and_restore_container, context, container,
+                         uuid_to_status_map.get(container.uuid))
+        for capsule in capsules:
+            pool.spawn_n(self._init_and_restore_container, context, capsule,
+                         None)
+        pool.waitall()
+        end_time = time.time()
+
+        LOG.info('Initialized %(containers)d containers and %(capsules)d '
+                 'capsules in %(total).2fs (listing from database: '
+                 '%(list_db).2fs, listing from driver: %(list_driver).2fs, '
+                 'initializing: %(init).2fs)',
+                 {'containers': len(containers),
+                  'capsules': len(capsules),
+                  'total': end_time - start_time,
+                  'list_db': list_db_time - start_time,
+                  'list_driver': list_driver_time - list_db_time,
+                  'init': end_time - list_driver_time})
+
+    def _init_and_restore_container(self, context, container,
+                                    current_status):
+        try:
             self._init_container(context, container)
-            if CONF.compute.resume_container_state:
-                self.restore_running_container(context,
-                                               container,
-                                               current_status)
+            if not CONF.compute.resume_container_state:
+                return
+            if current_status is None:
+                LOG.debug('Skip restoring container %s because it is not '
+                          'found by the container driver', container.uuid)
+                return
+            self.restore_running_container(context, container,
+                                           current_status)
+        except Exception:
+            LOG.exception('Failed to initialize container %s',
+                          container.uuid)
 
     def _init_container(self, context, container):
         """Initialize this container during zun-compute init."""
@@ -160,6 +199,19 @@ class Manager(periodic_task.PeriodicTasks):
             self.container_kill(context, container)
             return
 
+        if container.task_state == consts.CONTAINER_QUEUED:
+            # NOTE: the queued creations and deletions are handled above
+            # by the status of the container, the other queued actions are
+            # not recorded so they cannot be retried
+            LOG.warning("Container %s had a queued task at start-up, "
+                        "discarding it", container.uuid)
+            container.task_state = None
+            container.status_reason = _(
+                "The queued action of the container was discarded when "
+                "zun-compute restarted, please retry it")
+            container.save()
+            return
+
     def _fail_container(self, context, container, error, unset_host=False):
         try:
             self._detach_volumes(context, container)
@@ -280,7 +332,28 @@ class Manager(periodic_task.PeriodicTasks):
                 if run:
                     self._do_container_start(context, created_container)
 
-        utils.spawn_n(do_container_create)
+        self._submit_task(context, container, executor.CREATE,
+                          do_container_create)
+
+    def _submit_task(self, context, container, task_class, func):
+        """Run a task of the container in the background.
+
+        The number of concurrent tasks is limited per task class. If the
+        task has to wait for a slot, the task state of the container is set
+        to 'container_queued' until the task starts.
+        """
+        if (container.task_state is None and
+                self._executor.is_full(task_class)):
+            container.task_state = consts.CONTAINER_QUEUED
+            container.save(context)
+
+        def run_task():
+            if container.task_state == consts.CONTAINER_QUEUED:
+                container.task_state = None
+                container.save(context)
+            func()
+
+        self._executor.submit(task_class, run_task)
 
     @contextlib.contextmanager
     def _update_task_state(self, context, container, task_state):
@@ -517,7 +590,8 @@ class Manager(periodic_task.PeriodicTasks):
         def do_container_delete():
             self._do_container_delete(context, container, force)
 
-        utils.spawn_n(do_container_delete)
+        self._submit_task(context, container, executor.DELETE,
+                          do_container_delete)
 
     def _do_container_delete(self, context, container, force):
         LOG.debug('Deleting container: %s', container.uuid)
@@ -557,7 +631,8 @@ class Manager(periodic_task.PeriodicTasks):
         def do_add_security_group():
             self._add_security_group(context, container, security_group)
 
-        utils.spawn_n(do_add_security_group)
+        self._submit_task(context, container, executor.ACTION,
+                          do_add_security_group)
 
     @wrap_exception()
     @wrap_container_event(prefix='compute',
@@ -575,7 +650,8 @@ class Manager(periodic_task.PeriodicTasks):
         def do_remove_security_group():
             self._remove_security_group(context, container, security_group)
 
-        utils.spawn_n(do_remove_security_group)
+        self._submit_task(context, container, executor.ACTION,
+                          do_remove_security_group)
 
     @wrap_exception()
     @wrap_container_event(
@@ -624,7 +700,8 @@ class Manager(periodic_task.PeriodicTasks):
         def do_container_reboot():
             self._do_container_reboot(context, container, timeout)
 
-        utils.spawn_n(do_container_reboot)
+        self._submit_task(context, container, executor.ACTION,
+                          do_container_reboot)
 
     @wrap_exception()
     @wrap_container_event(prefix='compute',
@@ -642,7 +719,8 @@ class Manager(periodic_task.PeriodicTasks):
         def do_container_stop():
             self._do_container_stop(context, container, timeout)
 
-        utils.spawn_n(do_container_stop)
+        self._submit_task(context, container, executor.ACTION,
+                          do_container_stop)
 
     def _update_container_state(self, context, container, container_status):
         if container.status != container_status:
@@ -654,7 +732,8 @@ class Manager(periodic_task.PeriodicTasks):
         def do_container_rebuild():
             self._do_container_rebuild(context, container, run)
 
-        utils.spawn_n(do_container_rebuild)
+        self._submit_task(context, container, executor.CREATE,
+                          do_container_rebuild)
 
     @wrap_container_event(prefix='compute',
                           finish_action=container_actions.REBUILD)
@@ -743,7 +822,8 @@ class Manager(periodic_task.PeriodicTasks):
                                     container.uuid):
                 self._do_container_start(context, container)
 
-        utils.spawn_n(do_container_start)
+        self._submit_task(context, container, executor.ACTION,
+                          do_container_start)
 
     @wrap_exception()
     @wrap_container_event(prefix='compute',
@@ -761,7 +841,8 @@ class Manager(periodic_task.PeriodicTasks):
         def do_container_pause():
             self._do_container_pause(context, container)
 
-        utils.spawn_n(do_container_pause)
+        self._submit_task(context, container, executor.ACTION,
+                          do_container_pause)
 
     @wrap_exception()
     @wrap_container_event(prefix='compute',
@@ -779,7 +860,8 @@ class Manager(periodic_task.PeriodicTasks):
         def do_container_unpause():
             self._do_container_unpause(context, container)
 
-        utils.spawn_n(do_container_unpause)
+        self._submit_task(context, container, executor.ACTION,
+                          do_container_unpause)
 
     @translate_exception
     def container_logs(self, context, container, stdout, stderr,
@@ -862,7 +944,8 @@ class Manager(periodic_task.PeriodicTasks):
         def do_container_kill():
             self._do_container_kill(context, container, signal)
 
-        utils.spawn_n(do_container_kill)
+        self._submit_task(context, container, executor.ACTION,
+                          do_container_kill)
 
     @translate_exception
     def container_update(self, context, container, patch):
@@ -978,6 +1061,18 @@ class Manager(periodic_task.PeriodicTasks):
             LOG.exception("Unexpected exception: %s", six.text_type(e))
             raise
 
+    @translate_exception
+    def container_archive_url(self, context, container):
+        LOG.debug('Get archive url from the container: %s', container.uuid)
+        try:
+            # NOTE(hongbin): capsule shouldn't reach here
+            return self.driver.get_archive_url(context, container)
+        except Exception as e:
+            LOG.error("Error occurred while calling "
+                      "get archive url function: %s",
+                      six.text_type(e))
+            raise
+
     @translate_exception
     def container_stats(self, context, container):
         LOG.debug('Displaying stats of the container: %s', container.uuid)
@@ -992,6 +1087,17 @@ class Manager(periodic_task.PeriodicTasks):
             LOG.exception("Unexpected exception: %s", six.text_type(e))
             raise
 
+    @translate_exception
+    def host_container_stats(self, context, project_id=None):
+        LOG.debug('Displaying stats of the containers of the host')
+        filters = {'host': self.host,
+                   'status': utils.VALID_STATES['stats']}
+        if project_id:
+            filters['project_id'] = project_id
+        containers = objects.Container.list(context, filters=filters)
+        containers = [c for c in containers if c.container_id]
+        return self.driver.list_stats(context, containers)
+
     @translate_exception
     def container_commit(self, context, container, repository, tag=None):
         LOG.debug('Committing the container: %s', container.uuid)
@@ -1013,7 +1119,8 @@ class Manager(periodic_task.PeriodicTasks):
             self._do_container_commit(context, snapshot_image, container,
                                       repository, tag)
 
-        utils.spawn_n(do_container_commit)
+        self._submit_task(context, container, executor.COMMIT,
+                          do_container_commit)
         return {"uuid": snapshot_image.id}
 
     def _do_container_image_upload(self, context, snapshot_image,
@@ -1025,6 +1132,9 @@ class Manager(periodic_task.PeriodicTasks):
         except Exception as e:
             LOG.exception("Unexpected exception while uploading image: %s",
                           six.text_type(e))
+            if hasattr(data, 'close'):
+                # Release the docker connection of a partially read image
+                data.close()
             # NOTE(hongbin): capsule shouldn't reach here
             self.driver.delete_committed_image(context, snapshot_image.id,
                                                glance.GlanceDriver())
@@ -1076,7 +1186,8 @@ class Manager(periodic_task.PeriodicTasks):
                                         container_image, tag)
 
     def image_delete(self, context, image):
-        utils.spawn_n(self._do_image_delete, context, image)
+        self._executor.submit(executor.DELETE, self._do_image_delete,
+                              context, image)
 
     def _do_image_delete(self, context, image):
         LOG.debug('Deleting image...')
@@ -1087,7 +1198,8 @@ class Manager(periodic_task.PeriodicTasks):
         image.destroy(context, image.uuid)
 
     def image_pull(self, context, image):
-        utils.spawn_n(self._do_image_pull, context, image)
+        self._executor.submit(executor.IMAGE_PULL, self._do_image_pull,
+                              context, image)
 
     def _do_image_pull(self, context, image):
         LOG.debug('Creating image...')
@@ -1151,20 +1263,16 @@ class Manager(periodic_task.PeriodicTasks):
     def inventory_host(self, context):
         rt = self._get_resource_tracker()
         rt.update_available_resources(context)
+        LOG.debug('Task executor stats: %s', self._executor.stats())
 
     def _get_cpuset_limits(self, compute_node, container):
-        for numa_node in compute_node.numa_topology.nodes:
-            if len(numa_node.cpuset) - len(
-                    numa_node.pinned_cpus) >= container.cpu and \
-                    numa_node.mem_available >= container.memory:
-                return {
-                    'node': numa_node.id,
-                    'cpuset_cpu': numa_node.cpuset,
-                    'cpuset_cpu_pinned': numa_node.pinned_cpus,
-                    'cpuset_mem': numa_node.mem_available
-                }
-        msg = _("There may be not enough numa resources.")
-        raise exception.NoValidHost(reason=msg)
+        numa_node = numa.fit_container(compute_node.numa_topology,
+                                       container.cpu,
+                                       int(container.memory or 0))
+        if numa_node is None:
+            msg = _("There may be not enough numa resources.")
+            raise exception.NoValidHost(reason=msg)
+        return numa.get_cpuset_limits(numa_node)
 
     def _get_resource_tracker(self):
         if not self._resource_tracker:
@@ -1203,15 +1311,59 @@ class Manager(periodic_task.PeriodicTasks):
                 except Exception:
                     return
 
+    def watch_container_events(self, context):
+        if not CONF.compute.watch_container_events:
+            return
+
+        utils.spawn_n(self._watch_container_events, context)
+
+    def _watch_container_events(self, context):
+        while True:
+            LOG.debug('Start watching container events.')
+            self._watching_container_events = True
+            try:
+                self.driver.watch_container_events(context, self)
+                LOG.warning('Container events stream was closed')
+            except NotImplementedError:
+                LOG.info('Container driver does not support watching '
+                         'container events')
+                self._watching_container_events = False
+                return
+            except Exception as e:
+                LOG.exception('Failed to watch container events: %s',
+                              six.text_type(e))
+            # NOTE: events might be lost while the stream is down so force
+            # a full sync of container states.
+            self._watching_container_events = False
+            self._last_container_state_sync = None
+            time.sleep(CONF.default_sleep_time)
+
+    def _should_sync_container_state(self):
+        if not self._watching_container_events:
+            return True
+        if self._last_container_state_sync is None:
+            return True
+        return timeutils.is_older_than(
+            self._last_container_state_sync,
+            CONF.container_state_reconcile_interval)
+
+    @periodic_task.periodic_task(spacing=CONF.container_stats_interval,
+                                 run_immediately=True)
+    def collect_container_stats(self, context):
+        self.driver.collect_stats(context)
+
     @periodic_task.periodic_task(spacing=CONF.sync_container_state_interval,
                                  run_immediately=True)
     @context.set_context
     def sync_container_state(self, ctx):
-        LOG.debug('Start syncing container states.')
+        if not self._should_sync_container_state():
+            return
 
-        containers = objects.Container.list(ctx)
+        LOG.debug('Start syncing container states.')
+        self._last_container_state_sync = timeutils.utcnow()
+        containers = objects.Container.list_by_host(ctx, self.host)
         self.driver.update_containers_states(ctx, containers, self)
-        capsules = objects.Capsule.list(ctx)
+        capsules = objects.Capsule.list_by_host(ctx, self.host)
         # TODO(hongbin): use capsule driver to update capsules status
         self.driver.update_containers_states(ctx, capsules, self)
 
@@ -1220,7 +1372,8 @@ class Manager(periodic_task.PeriodicTasks):
         def do_network_detach():
             self._do_network_detach(context, container, network)
 
-        utils.spawn_n(do_network_detach)
+        self._submit_task(context, container, executor.ACTION,
+                          do_network_detach)
 
     @wrap_exception()
     @wrap_container_event(prefix='compute',
@@ -1238,7 +1391,8 @@ class Manager(periodic_task.PeriodicTasks):
         def do_network_attach():
             self._do_network_attach(context, container, requested_network)
 
-        utils.spawn_n(do_network_attach)
+        self._submit_task(context, container, executor.ACTION,
+                          do_network_attach)
 
     @wrap_exception()
     @wrap_container_event(prefix='compute',
@@ -1264,4 +1418,5 @@ class Manager(periodic_task.PeriodicTasks):
         def do_container_resize():
             self.container_update(context, container, patch)
 
-        utils.spawn_n(do_container_resize)
+        self._submit_task(context, container, executor.ACTION,
+                          do_container_resize)
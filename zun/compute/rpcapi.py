@@ -156,11 +156,20 @@ class API(rpc_service.API):
                           container=container, path=path, data=data,
                           decode_data=decode_data)
 
+    @check_container_host
+    def container_archive_url(self, context, container):
+        return self._call(container.host, 'container_archive_url',
+                          container=container)
+
     @check_container_host
     def container_stats(self, context, container):
         return self._call(container.host, 'container_stats',
                           container=container)
 
+    def host_container_stats(self, context, host, project_id=None):
+        return self._call(host, 'host_container_stats',
+                          project_id=project_id)
+
     @check_container_host
     def container_commit(self, context, container, repository, tag):
         return self._call(container.host, 'container_commit',
@@ -52,6 +52,84 @@ Possible values:
         'host_shared_with_nova',
         default=False,
         help='Whether this compute node is shared with nova'),
+    cfg.BoolOpt(
+        'watch_container_events',
+        default=True,
+        help="""
+Whether zun-compute subscribes to the events stream of the container
+driver and updates container states in the database as they change.
+If disabled, container states are only synced periodically.
+Related options:
+* ``sync_container_state_interval``
+* ``container_state_reconcile_interval``
+"""),
+    cfg.IntOpt(
+        'max_concurrent_init_containers',
+        default=10,
+        min=1,
+        help="""
+Maximum number of containers that zun-compute recovers at the same time
+when it starts. The recovery of a container retries the task that was
+interrupted by the restart (e.g. a delete or a reboot).
+Related options:
+* ``resume_container_state``
+"""),
+    cfg.IntOpt(
+        'max_concurrent_image_pulls',
+        default=4,
+        min=1,
+        help="""
+Maximum number of image pulls that zun-compute runs at the same time.
+Further requests are queued and processed in the order they arrived.
+"""),
+    cfg.IntOpt(
+        'max_concurrent_creates',
+        default=10,
+        min=1,
+        help="""
+Maximum number of container creates and rebuilds that zun-compute runs at
+the same time. Further requests are queued and processed in the order they
+arrived. Containers that wait in the queue have their task state set to
+``container_queued``.
+"""),
+    cfg.IntOpt(
+        'max_concurrent_deletes',
+        default=10,
+        min=1,
+        help="""
+Maximum number of container and image deletes that zun-compute runs at the
+same time. Further requests are queued and processed in the order they
+arrived.
+"""),
+    cfg.IntOpt(
+        'max_concurrent_commits',
+        default=2,
+        min=1,
+        help="""
+Maximum number of container commits (snapshots) that zun-compute runs at
+the same time. Further requests are queued and processed in the order they
+arrived.
+"""),
+    cfg.IntOpt(
+        'max_concurrent_actions',
+        default=20,
+        min=1,
+        help="""
+Maximum number of other container operations (e.g. start, stop, network
+attach) that zun-compute runs at the same time. Further requests are queued
+and processed in the order they arrived.
+"""),
+    cfg.IntOpt(
+        'resource_audit_interval',
+        default=3600,
+        min=0,
+        help="""
+Interval in seconds between two audits of the resource usage of the compute
+node. The usage is kept up to date by the resource claims of the containers,
+an audit recomputes it from all the containers on the host and logs a warning
+if it drifted. The other resources of the host are refreshed by every run of
+the periodic task. Set to 0 to audit the usage at every run.
+"""),
 ]
 
 service_opts = [
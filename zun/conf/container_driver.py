@@ -101,7 +101,12 @@ in Zun is ``runc``."""),
                     '(will be used if user do not specify '
                     'container\'s disk). This value should be '
                     'in range [minimum_disk, maximum_disk]. Default '
-                    'is 10 (GiB).')
+                    'is 10 (GiB).'),
+    cfg.IntOpt('maximum_container_count',
+               default=200,
+               min=1,
+               help='The maximum number of containers that can be created '
+                    'by one create request.'),
 ]
 
 
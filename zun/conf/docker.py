@@ -49,6 +49,38 @@ docker_opts = [
     cfg.StrOpt('docker_remote_api_port',
                default='2375',
                help='Defines the remote api port for the docker daemon.'),
+    cfg.IntOpt('client_pool_size',
+               default=20,
+               min=1,
+               help='Maximum number of docker API clients that a process '
+                    'keeps open to the docker daemon. Clients and their '
+                    'connections are reused across docker calls. If all '
+                    'clients are in use, callers wait for one to be '
+                    'released.'),
+    cfg.IntOpt('inspect_cache_ttl',
+               default=10,
+               min=0,
+               help='Time in seconds for which zun-compute answers container '
+                    'show requests from cached docker inspect results. '
+                    'Cached results are dropped as soon as the docker '
+                    'events stream reports a change of the container, and '
+                    'the cache is only used while the events stream is '
+                    'watched (see [compute]watch_container_events). Set to '
+                    '0 to disable the cache.'),
+    cfg.IntOpt('stats_samples',
+               default=3,
+               min=1,
+               help='Number of resource usage samples kept per container. '
+                    'The CPU usage reported in the stats of a container is '
+                    'computed against these samples, which are collected '
+                    'every ``container_stats_interval`` seconds.'),
+    cfg.IntOpt('archive_chunk_size',
+               default=65536,
+               min=1,
+               help='Size in bytes of the chunks in which tar archives are '
+                    'streamed between zun-api and the docker daemon of a '
+                    'compute host. This bounds the memory used by a '
+                    'streamed archive transfer.'),
     cfg.IntOpt('execute_timeout',
                default=5,
                help='Timeout in seconds for executing a command in a docker '
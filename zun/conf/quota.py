@@ -83,7 +83,9 @@ Possible values:
 
 * zun.common.quota.DbQuotaDriver: Stores quota limit information
   in the database and relies on te quota_* configuration options for default
-  quota limit values. Counts quota usage on-demand.
+  quota limit values. Keeps the quota usage of each project in the database
+  as the containers are created, deleted and resized, ``zun-db-manage
+  quota_usage_sync`` counts it again from the containers.
 * zun.common.quota.NoopQuotaDriver: Ignores quota and treats all resources as
   unlimited.
 """)
@@ -92,6 +92,149 @@ Related options:
 * All of the filters in this option *must* be present in the
   'scheduler_available_filters' option, or a SchedulerHostFilterNotFound
   exception will be raised.
+"""),
+    cfg.BoolOpt("order_filters_by_cost",
+                default=False,
+                help="""
+Run the enabled filters from the cheapest to the most expensive one.
+
+The filters are ordered by their relative cost divided by the share of the
+hosts they recently eliminated, so that the cheap and selective filters (such
+as 'ComputeFilter' or 'RuntimeFilter') run before the expensive ones (such as
+'PciPassthroughFilter' or 'CpuSetFilter') and the latter are run on fewer
+hosts. When disabled, the filters are run in the order of the
+'enabled_filters' option.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect.
+"""),
+    cfg.BoolOpt("vectorized_filtering",
+                default=False,
+                help="""
+Evaluate the filters on a columnar table of the host resources.
+
+When enabled, the filters that support it (such as 'RamFilter', 'CPUFilter'
+and 'DiskFilter') are evaluated on all the hosts at once with NumPy arrays,
+the other filters are run host by host. This lowers the filtering time of
+large deployments. This option requires NumPy, the filters are run host by
+host if it is not installed.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect.
+"""),
+    cfg.ListOpt("weight_classes",
+                default=["zun.scheduler.weights.all_weighers"],
+                help="""
+Weighers that the scheduler will use.
+
+Only hosts which pass the filters are weighed. The weight for any host starts
+at 0, and the weighers order these hosts by adding to or subtracting from the
+weight assigned by the previous weigher. Weights may become negative. A
+container is scheduled to the host with the highest weight.
+
+By default, this is set to all weighers that are included with zun.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect.
+
+Possible values:
+
+* A list of zero or more strings, where each string corresponds to the name of
+  a weigher that will be used for selecting a host
+"""),
+    cfg.FloatOpt("ram_weight_multiplier",
+                 default=1.0,
+                 help="""
+RAM weight multiplier ratio.
+
+This option determines how hosts with more or less available RAM are weighed.
+A positive value will result in the scheduler preferring hosts with more
+available RAM, and a negative number will result in the scheduler preferring
+hosts with less available RAM. Another way to look at it is that positive
+values for this option will tend to spread containers across many hosts,
+while negative values will tend to fill up (stack) hosts as much as possible
+before scheduling to a less-used host. The absolute value, whether positive
+or negative, controls how strong the RAM weigher is relative to other
+weighers.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect. Also note that this setting
+only affects scheduling if the 'RAMWeigher' weigher is enabled.
+"""),
+    cfg.FloatOpt("cpu_weight_multiplier",
+                 default=1.0,
+                 help="""
+CPU weight multiplier ratio.
+
+Multiplier used for weighting free vCPUs. A positive value will result in the
+scheduler preferring hosts with more free vCPUs (spread), and a negative
+number will result in the scheduler preferring hosts with less free vCPUs
+(stack).
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect. Also note that this setting
+only affects scheduling if the 'CPUWeigher' weigher is enabled.
+"""),
+    cfg.FloatOpt("disk_weight_multiplier",
+                 default=1.0,
+                 help="""
+Disk weight multiplier ratio.
+
+Multiplier used for weighing free disk space. A positive value will result in
+the scheduler preferring hosts with more free disk space (spread), and a
+negative number will result in the scheduler preferring hosts with less free
+disk space (stack).
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect. Also note that this setting
+only affects scheduling if the 'DiskWeigher' weigher is enabled.
+"""),
+    cfg.FloatOpt("container_weight_multiplier",
+                 default=0.0,
+                 help="""
+Number of containers weight multiplier ratio.
+
+Multiplier used for weighing the number of containers of the hosts. A
+negative value will result in the scheduler preferring hosts with fewer
+containers (spread), and a positive number will result in the scheduler
+preferring hosts with more containers (stack). The default of 0.0 ignores
+the number of containers.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect. Also note that this setting
+only affects scheduling if the 'NumContainersWeigher' weigher is enabled.
+"""),
+    cfg.FloatOpt("numa_weight_multiplier",
+                 default=1.0,
+                 help="""
+NUMA fit weight multiplier ratio.
+
+Multiplier used for weighing how tightly a container with dedicated CPUs fits
+in a NUMA node of the hosts. A positive value will result in the scheduler
+preferring hosts whose best fitting NUMA node has the fewest free CPUs left
+(pack), and a negative number will result in the scheduler preferring the
+loosest fit (spread). Containers without dedicated CPUs are not affected.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect. Also note that this setting
+only affects scheduling if the 'NUMAWeigher' weigher is enabled.
+"""),
+    cfg.IntOpt("host_subset_size",
+               default=1,
+               min=1,
+               help="""
+Size of subset of best hosts selected by scheduler.
+
+New containers will be scheduled on a host chosen randomly from a subset of
+the N best hosts, where N is the value set by this option. Setting this to a
+value greater than 1 will reduce the chance that multiple scheduler processes
+handling similar requests will select the same host, creating a potential
+race condition. By selecting a host randomly from the N hosts that best fit
+the request, the chance of a conflict is reduced. However, the higher you set
+this value, the less optimal the chosen host may be for a given request.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect.
 """),
     cfg.IntOpt("max_placement_results",
                default=1000,
@@ -111,6 +254,69 @@ etc. of the scheduler.
 
 This option is only used by the FilterScheduler; if you use a different
 scheduler, this option has no effect.
+"""),
+    cfg.IntOpt("claim_race_hosts",
+               default=1,
+               min=1,
+               help="""
+Number of the best weighed hosts against which the resources of a container
+are claimed at once.
+
+These claims only succeed if they create the consumer of the container in
+placement, so only one of them succeeds and the others leave no allocation
+behind. Under contention, a value higher than 1 saves the round-trip
+of trying the next host after a failed claim, at the cost of more requests to
+the placement service. The remaining hosts are tried one by one if all the
+claims fail. With the default of 1, the hosts are tried one by one.
+
+This option is only used by the FilterScheduler; if you use a different
+scheduler, this option has no effect.
+"""),
+    cfg.IntOpt("allocation_candidates_retries",
+               default=1,
+               min=0,
+               help="""
+Number of times the allocation candidates of a container are requested again
+from the placement service when its resources could not be claimed against
+any of the candidates, for instance because other containers were claimed
+against the same hosts in the meantime.
+
+Only the requests for a single container are retried.
+"""),
+    cfg.FloatOpt("host_state_cache_ttl",
+                 default=1.0,
+                 min=0,
+                 help="""
+Number of seconds the cached host states are used without checking the
+database for updates.
+
+The scheduler keeps the state of the compute hosts in memory and only loads
+the compute nodes and services that were created or updated since its last
+refresh. A value of 0 checks for updates on every scheduling request.
+
+This option is only used by the FilterScheduler; if you use a different
+scheduler, this option has no effect.
+
+Related options:
+
+* host_state_cache_full_refresh_interval
+"""),
+    cfg.IntOpt("host_state_cache_full_refresh_interval",
+               default=300,
+               min=0,
+               help="""
+Number of seconds between two reloads of all the host states.
+
+The incremental refreshes of the host state cache can't see the compute nodes
+and services that were deleted, they are dropped from the cache by the full
+reloads. A value of 0 reloads all the host states on every refresh.
+
+This option is only used by the FilterScheduler; if you use a different
+scheduler, this option has no effect.
+
+Related options:
+
+* host_state_cache_ttl
 """),
 ]
 
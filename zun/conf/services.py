@@ -40,6 +40,43 @@ Possible values:
 * Any value < 0: Disables the option.
 * Any positive integer in seconds.
 
+"""),
+    cfg.IntOpt('container_state_reconcile_interval',
+               default=600,
+               help="""
+Interval to fully reconcile container states while the docker events stream
+is being watched.
+
+When zun-compute watches the docker events stream, container state changes
+are applied to the database as they happen and the periodic sync only needs
+to run as a safety net for missed events. This option defines how often
+that full sync runs in this case. If the events stream is not being watched,
+the sync runs every ``sync_container_state_interval`` seconds.
+
+Possible values:
+* Any positive integer in seconds.
+
+Related options:
+* ``sync_container_state_interval``
+* ``[compute] watch_container_events``
+
+"""),
+    cfg.IntOpt('container_stats_interval',
+               default=10,
+               help="""
+Interval to sample the resource usage of the containers on the host.
+
+The stats of a container are computed out of these samples instead of
+asking the container engine, which takes a sampling interval to answer.
+
+Possible values:
+* 0: Will run at the default periodic interval.
+* Any value < 0: Disables the option.
+* Any positive integer in seconds.
+
+Related options:
+* ``[docker] stats_samples``
+
 """),
 ]
 
@@ -34,6 +34,7 @@ from zun.common.utils import check_container_id
 from zun.compute import container_actions
 import zun.conf
 from zun.container.docker import host
+from zun.container.docker import stats as docker_stats
 from zun.container.docker import utils as docker_utils
 from zun.container import driver
 from zun.image import driver as img_driver
@@ -45,6 +46,18 @@ CONF = zun.conf.CONF
 LOG = logging.getLogger(__name__)
 ATTACH_FLAG = "/attach/ws?logs=0&stream=1&stdin=1&stdout=1&stderr=1"
 
+# Map docker container events to the container status they lead to. Events
+# mapped to None don't imply a status by themselves and are handled
+# separately.
+CONTAINER_EVENTS = {
+    'start': consts.RUNNING,
+    'unpause': consts.RUNNING,
+    'pause': consts.PAUSED,
+    'die': consts.STOPPED,
+    'oom': None,
+    'destroy': None,
+}
+
 
 def is_not_found(e):
     return '404' in str(e)
@@ -119,6 +132,13 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
         for driver_name in CONF.image_driver_list:
             driver = img_driver.load_image_driver(driver_name)
             self.image_drivers[driver_name] = driver
+        # Cached docker inspect results, by docker container id. Only used
+        # while the events stream is watched so that entries are dropped
+        # when the container changes.
+        self._inspect_cache = {}
+        self._inspect_cache_generation = 0
+        self._watching_events = False
+        self._stats_collector = docker_stats.CgroupStatsCollector()
 
     def _get_host_storage_info(self):
         host_info = self.get_host_info()
@@ -142,8 +162,7 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
 
     def get_image(self, name):
         LOG.debug('Obtaining image %s', name)
-        with docker_utils.docker_client() as docker:
-            return docker.get_image(name)
+        return docker_utils.get_image_stream(name)
 
     def delete_image(self, context, img_id, image_driver=None):
         image = self.inspect_image(img_id)['RepoTags'][0]
@@ -578,6 +597,9 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
                                for container in containers
                                if container.container_id}
 
+        # Collect all the changes of this pass and write them at once, a
+        # restart of the docker daemon can change hundreds of containers.
+        changed_containers = []
         for cid in (six.viewkeys(id_to_container_map) &
                     six.viewkeys(id_to_local_container_map)):
             container = id_to_container_map[cid]
@@ -586,7 +608,6 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
             if container.status != local_container.status:
                 old_status = container.status
                 container.status = local_container.status
-                container.save(context)
                 LOG.info('Status of container %s changed from %s to %s',
                          container.uuid, old_status, container.status)
             # sync host
@@ -595,9 +616,13 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
             if container.host != cur_host:
                 old_host = container.host
                 container.host = cur_host
-                container.save(context)
                 LOG.info('Host of container %s changed from %s to %s',
                          container.uuid, old_host, container.host)
+            if container.obj_what_changed():
+                changed_containers.append(container)
+        if changed_containers:
+            objects.Container.bulk_save(context, changed_containers)
+
         for container in non_existent_containers:
             if container.host == CONF.host:
                 if container.auto_remove:
@@ -607,24 +632,136 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
                     self.heal_with_rebuilding_container(context, container,
                                                         manager)
 
-    def show(self, context, container):
-        with docker_utils.docker_client() as docker:
-            if container.container_id is None:
-                return container
-
-            response = None
+    def watch_container_events(self, context, manager):
+        """Apply container state changes from the docker events stream.
+
+        This call blocks until the events stream is closed by the docker
+        daemon.
+        """
+        # NOTE: all the container and network events are watched to keep
+        # the inspect cache current, only the ones in CONTAINER_EVENTS
+        # change the container state.
+        filters = {'type': ['container', 'network']}
+        with docker_utils.docker_client(pooled=False) as docker:
+            self._watching_events = True
             try:
-                response = docker.inspect_container(container.container_id)
-            except errors.APIError as api_error:
-                if is_not_found(api_error):
-                    handle_not_found(api_error, context, container,
-                                     do_not_raise=True)
-                    return container
-                raise
+                for event in docker.events(decode=True, filters=filters):
+                    self._invalidate_inspect_cache(event)
+                    if event.get('Type') != 'container':
+                        continue
+                    try:
+                        self._handle_container_event(context, event)
+                    except Exception as e:
+                        LOG.exception("Failed to handle docker event %s: %s",
+                                      event, six.text_type(e))
+            finally:
+                self._watching_events = False
+                self._inspect_cache.clear()
+
+    def _invalidate_inspect_cache(self, event):
+        actor = event.get('Actor') or {}
+        if event.get('Type') == 'network':
+            # Network events are about the network, the affected container
+            # is in the attributes.
+            container_id = (actor.get('Attributes') or {}).get('container')
+        else:
+            container_id = actor.get('ID')
+        self._inspect_cache_generation += 1
+        self._inspect_cache.pop(container_id, None)
+
+    def _get_cached_inspect(self, container_id):
+        ttl = CONF.docker.inspect_cache_ttl
+        if not ttl or not self._watching_events:
+            return None
+        cached = self._inspect_cache.get(container_id)
+        if cached is None:
+            return None
+        cached_at, response = cached
+        if timeutils.is_older_than(cached_at, ttl):
+            self._inspect_cache.pop(container_id, None)
+            return None
+        return response
+
+    def _inspect_container(self, docker, container_id):
+        generation = self._inspect_cache_generation
+        response = docker.inspect_container(container_id)
+        # NOTE: do not cache the response if an event came in while the
+        # container was being inspected, it might be outdated already.
+        if (CONF.docker.inspect_cache_ttl and self._watching_events and
+                generation == self._inspect_cache_generation):
+            self._inspect_cache[container_id] = (timeutils.utcnow(),
+                                                 response)
+        return response
+
+    def _handle_container_event(self, context, event):
+        action = event.get('Action') or event.get('status')
+        if action not in CONTAINER_EVENTS:
+            return
+
+        actor = event.get('Actor') or {}
+        # The name of Docker container in events is of the form 'zun-<uuid>'
+        name = (actor.get('Attributes') or {}).get('name', '')
+        if not name.startswith(consts.NAME_PREFIX):
+            return
+        uuid = name.replace(consts.NAME_PREFIX, '', 1)
+        if not uuidutils.is_uuid_like(uuid):
+            return
+
+        try:
+            container = objects.Container.get_container_any_type(context,
+                                                                 uuid)
+        except exception.ContainerNotFound:
+            return
+        if container.container_id != actor.get('ID'):
+            # The event belongs to a docker container that was replaced,
+            # e.g. by a rebuild.
+            return
+        if container.task_state:
+            # NOTE: another thread is performing task on this container and
+            # it will set the container state by itself.
+            return
+
+        old_status = container.status
+        if action == 'oom':
+            container.status_reason = _("Container ran out of memory")
+        elif action == 'destroy':
+            if container.auto_remove and container.status not in (
+                    consts.DELETING, consts.DELETED):
+                container.status = consts.DELETED
+            # NOTE: other containers that are missing in docker are healed
+            # by the periodic sync.
+        else:
+            container.status = CONTAINER_EVENTS[action]
+            container.status_detail = None
+            if container.status != consts.STOPPED:
+                container.status_reason = None
+
+        if container.obj_what_changed():
+            container.save(context)
+            if container.status != old_status:
+                LOG.info('Status of container %s changed from %s to %s',
+                         container.uuid, old_status, container.status)
 
-            self._populate_container(container, response)
+    def show(self, context, container):
+        if container.container_id is None:
             return container
 
+        response = self._get_cached_inspect(container.container_id)
+        if response is None:
+            with docker_utils.docker_client() as docker:
+                try:
+                    response = self._inspect_container(
+                        docker, container.container_id)
+                except errors.APIError as api_error:
+                    if is_not_found(api_error):
+                        handle_not_found(api_error, context, container,
+                                         do_not_raise=True)
+                        return container
+                    raise
+
+        self._populate_container(container, response)
+        return container
+
     def format_status_detail(self, status_time):
         try:
             st = datetime.datetime.strptime((status_time[:19]),
@@ -976,20 +1113,37 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
                     raise exception.Invalid(_("%s") % str(api_error))
                 raise
 
+    @check_container_id
+    def get_archive_url(self, context, container):
+        return CONF.docker.docker_remote_api_url
+
     @check_container_id
     @wrap_docker_error
     def stats(self, context, container):
+        res = self._stats_collector.get_stats(container.container_id)
+        if res is None:
+            # NOTE: the container was not sampled yet or its cgroup can't be
+            # read, ask docker (which is slower).
+            res = self._get_docker_stats(container)
+
+        mem_usage = res['mem_usage'] / 1024 / 1024
+        mem_limit = res['mem_limit'] / 1024 / 1024
+        mem_percent = float(mem_usage) / float(mem_limit) * 100
+        stats = {"CONTAINER": container.name,
+                 "CPU %": res['cpu_percent'],
+                 "MEM USAGE(MiB)": mem_usage,
+                 "MEM LIMIT(MiB)": mem_limit,
+                 "MEM %": mem_percent,
+                 "BLOCK I/O(B)": (str(res['io_read']) + "/" +
+                                  str(res['io_write'])),
+                 "NET I/O(B)": str(res['net_rx']) + "/" + str(res['net_tx'])}
+        return stats
+
+    def _get_docker_stats(self, container):
         with docker_utils.docker_client() as docker:
             res = docker.stats(container.container_id, decode=False,
                                stream=False)
 
-            cpu_usage = res['cpu_stats']['cpu_usage']['total_usage']
-            system_cpu_usage = res['cpu_stats']['system_cpu_usage']
-            cpu_percent = float(cpu_usage) / float(system_cpu_usage) * 100
-            mem_usage = res['memory_stats']['usage'] / 1024 / 1024
-            mem_limit = res['memory_stats']['limit'] / 1024 / 1024
-            mem_percent = float(mem_usage) / float(mem_limit) * 100
-
             blk_stats = res['blkio_stats']['io_service_bytes_recursive']
             io_read = 0
             io_write = 0
@@ -1006,14 +1160,34 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
                 net_rxb = net_rxb + v['rx_bytes']
                 net_txb = net_txb + v['tx_bytes']
 
-            stats = {"CONTAINER": container.name,
-                     "CPU %": cpu_percent,
-                     "MEM USAGE(MiB)": mem_usage,
-                     "MEM LIMIT(MiB)": mem_limit,
-                     "MEM %": mem_percent,
-                     "BLOCK I/O(B)": str(io_read) + "/" + str(io_write),
-                     "NET I/O(B)": str(net_rxb) + "/" + str(net_txb)}
-            return stats
+            return {'cpu_percent': docker_stats.docker_cpu_percent(res),
+                    'mem_usage': res['memory_stats']['usage'],
+                    'mem_limit': res['memory_stats']['limit'],
+                    'io_read': io_read,
+                    'io_write': io_write,
+                    'net_rx': net_rxb,
+                    'net_tx': net_txb}
+
+    def list_stats(self, context, containers):
+        results = {}
+
+        def get_stats(container):
+            try:
+                results[container.uuid] = self.stats(context, container)
+            except Exception as e:
+                LOG.warning('Failed to get the stats of container %s: %s',
+                            container.uuid, six.text_type(e))
+
+        # NOTE: stats are usually served from the stats collector, the pool
+        # only bounds the number of concurrent docker calls if they are not.
+        pool = eventlet.GreenPool(CONF.docker.client_pool_size)
+        for container in containers:
+            pool.spawn_n(get_stats, container)
+        pool.waitall()
+        return results
+
+    def collect_stats(self, context):
+        self._stats_collector.collect()
 
     @check_container_id
     @wrap_docker_error
@@ -0,0 +1,285 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Collects resource usage of docker containers from the cgroup filesystem.
+
+Asking the docker daemon for the stats of a container blocks for a
+sampling interval because the daemon needs two samples to compute the CPU
+usage. Instead, the accounting files of the containers are sampled
+periodically and CPU usage is computed against the stored samples.
+"""
+
+import collections
+import os
+import time
+
+from oslo_log import log as logging
+
+from zun.common import consts
+import zun.conf
+from zun.container.docker import utils as docker_utils
+
+CONF = zun.conf.CONF
+LOG = logging.getLogger(__name__)
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+PROC_ROOT = '/proc'
+
+# The minimal time in seconds between two samples for the CPU usage to be
+# computed out of them.
+MIN_CPU_WINDOW = 1.0
+
+Sample = collections.namedtuple(
+    'Sample', ['time', 'cpu_usage', 'mem_usage', 'mem_limit', 'io_read',
+               'io_write', 'net_rx', 'net_tx'])
+
+
+def cpu_percent(cpu_delta, elapsed):
+    """Return the CPU usage of a container in percent of one CPU.
+
+    :param cpu_delta: the CPU time used by the container in nanoseconds.
+    :param elapsed: the wall time in seconds the CPU time was used in.
+    :returns: the usage, which exceeds 100 if more than one CPU is used.
+    """
+    if elapsed <= 0:
+        return 0.0
+    return max(float(cpu_delta) / (elapsed * 1e9) * 100, 0.0)
+
+
+def docker_cpu_percent(stats):
+    """Return the CPU usage out of the docker stats of a container.
+
+    The usage is computed between the previous and the current counters
+    of docker, on the same scale as the usage computed from the cgroup
+    samples. The system CPU usage counts the time of every online CPU of
+    the host, so the wall time is that usage over the number of CPUs.
+    """
+    cpu_stats = stats.get('cpu_stats') or {}
+    precpu_stats = stats.get('precpu_stats') or {}
+    if ('system_cpu_usage' not in cpu_stats or
+            'system_cpu_usage' not in precpu_stats):
+        return 0.0
+    cpu_usage = cpu_stats['cpu_usage']
+    online_cpus = (cpu_stats.get('online_cpus') or
+                   len(cpu_usage.get('percpu_usage') or []) or 1)
+    cpu_delta = (cpu_usage['total_usage'] -
+                 precpu_stats['cpu_usage']['total_usage'])
+    system_delta = (cpu_stats['system_cpu_usage'] -
+                    precpu_stats['system_cpu_usage'])
+    return cpu_percent(cpu_delta, float(system_delta) / online_cpus / 1e9)
+
+
+def _read_file(path):
+    with open(path) as f:
+        return f.read().strip()
+
+
+def _read_int(path):
+    return int(_read_file(path))
+
+
+class CgroupStatsCollector(object):
+    """Sample cgroup v1 or v2 accounting files of the zun containers."""
+
+    def __init__(self, cgroup_root=CGROUP_ROOT, proc_root=PROC_ROOT,
+                 max_samples=None):
+        self.cgroup_root = cgroup_root
+        self.proc_root = proc_root
+        self.max_samples = max_samples or CONF.docker.stats_samples
+        # Ring buffers of samples, by docker container id
+        self._samples = {}
+        self._cgroup_v2 = None
+        self._systemd = None
+        self._host_memory = None
+
+    def _init_cgroup_layout(self):
+        if self._cgroup_v2 is not None:
+            return
+        self._cgroup_v2 = os.path.exists(
+            os.path.join(self.cgroup_root, 'cgroup.controllers'))
+        with docker_utils.docker_client() as docker:
+            cgroup_driver = docker.info().get('CgroupDriver', 'cgroupfs')
+        self._systemd = cgroup_driver == 'systemd'
+
+    def _get_cgroup_dir(self, container_id, controller):
+        if self._systemd:
+            path = os.path.join('system.slice',
+                                'docker-%s.scope' % container_id)
+        else:
+            path = os.path.join('docker', container_id)
+        if self._cgroup_v2:
+            return os.path.join(self.cgroup_root, path)
+        return os.path.join(self.cgroup_root, controller, path)
+
+    def _get_host_memory(self):
+        if self._host_memory is None:
+            with open(os.path.join(self.proc_root, 'meminfo')) as fp:
+                m = fp.read().split()
+                self._host_memory = int(m[m.index('MemTotal:') + 1]) * 1024
+        return self._host_memory
+
+    def _read_cpu_usage(self, container_id):
+        """Return the CPU time used by the container in nanoseconds."""
+        if self._cgroup_v2:
+            path = os.path.join(self._get_cgroup_dir(container_id, 'cpu'),
+                                'cpu.stat')
+            for line in _read_file(path).splitlines():
+                key, value = line.split()
+                if key == 'usage_usec':
+                    return int(value) * 1000
+            raise ValueError('usage_usec is missing in %s' % path)
+
+        path = os.path.join(self._get_cgroup_dir(container_id, 'cpuacct'),
+                            'cpuacct.usage')
+        return _read_int(path)
+
+    def _read_memory(self, container_id):
+        cgroup_dir = self._get_cgroup_dir(container_id, 'memory')
+        if self._cgroup_v2:
+            usage = _read_int(os.path.join(cgroup_dir, 'memory.current'))
+            limit = _read_file(os.path.join(cgroup_dir, 'memory.max'))
+            limit = None if limit == 'max' else int(limit)
+        else:
+            usage = _read_int(os.path.join(cgroup_dir,
+                                           'memory.usage_in_bytes'))
+            limit = _read_int(os.path.join(cgroup_dir,
+                                           'memory.limit_in_bytes'))
+        # NOTE: like docker, report the memory of the host if the
+        # container has no (or a higher) memory limit.
+        host_memory = self._get_host_memory()
+        if limit is None or limit > host_memory:
+            limit = host_memory
+        return usage, limit
+
+    def _read_io(self, container_id):
+        io_read = 0
+        io_write = 0
+        if self._cgroup_v2:
+            path = os.path.join(self._get_cgroup_dir(container_id, 'io'),
+                                'io.stat')
+            # Lines are of the form '8:0 rbytes=1 wbytes=2 rios=3 ...'
+            for line in _read_file(path).splitlines():
+                for field in line.split()[1:]:
+                    key, value = field.split('=')
+                    if key == 'rbytes':
+                        io_read += int(value)
+                    elif key == 'wbytes':
+                        io_write += int(value)
+            return io_read, io_write
+
+        path = os.path.join(self._get_cgroup_dir(container_id, 'blkio'),
+                            'blkio.throttle.io_service_bytes')
+        # Lines are of the form '8:0 Read 1', the last one is 'Total 3'
+        for line in _read_file(path).splitlines():
+            fields = line.split()
+            if len(fields) != 3:
+                continue
+            if fields[1] == 'Read':
+                io_read += int(fields[2])
+            elif fields[1] == 'Write':
+                io_write += int(fields[2])
+        return io_read, io_write
+
+    def _read_net(self, container_id):
+        cgroup_dir = self._get_cgroup_dir(container_id, 'cpuacct')
+        pids = _read_file(os.path.join(cgroup_dir, 'cgroup.procs')).split()
+        if not pids:
+            return 0, 0
+
+        net_rx = 0
+        net_tx = 0
+        # The counters of the network namespace of the container, lines
+        # are of the form 'eth0: rx_bytes rx_packets ... tx_bytes ...'
+        path = os.path.join(self.proc_root, pids[0], 'net', 'dev')
+        for line in _read_file(path).splitlines()[2:]:
+            interface, counters = line.split(':', 1)
+            if interface.strip() == 'lo':
+                continue
+            counters = counters.split()
+            net_rx += int(counters[0])
+            net_tx += int(counters[8])
+        return net_rx, net_tx
+
+    def read_sample(self, container_id):
+        """Read the current resource usage of a container.
+
+        :raises: IOError, OSError or ValueError if the accounting files of
+                 the container can't be read.
+        """
+        self._init_cgroup_layout()
+        now = time.time()
+        cpu_usage = self._read_cpu_usage(container_id)
+        mem_usage, mem_limit = self._read_memory(container_id)
+        io_read, io_write = self._read_io(container_id)
+        net_rx, net_tx = self._read_net(container_id)
+        return Sample(now, cpu_usage, mem_usage, mem_limit, io_read,
+                      io_write, net_rx, net_tx)
+
+    def collect(self):
+        """Sample all the running zun containers of the host."""
+        with docker_utils.docker_client() as docker:
+            containers = docker.containers(
+                filters={'name': consts.NAME_PREFIX})
+        container_ids = set(c['Id'] for c in containers)
+
+        for container_id in set(self._samples) - container_ids:
+            del self._samples[container_id]
+
+        for container_id in container_ids:
+            try:
+                sample = self.read_sample(container_id)
+            except (IOError, OSError, ValueError) as e:
+                LOG.debug('Failed to read the stats of container %s: %s',
+                          container_id, e)
+                continue
+            samples = self._samples.setdefault(
+                container_id, collections.deque(maxlen=self.max_samples))
+            samples.append(sample)
+
+    def get_stats(self, container_id):
+        """Return the current resource usage of a container.
+
+        The CPU usage is computed against the samples collected by
+        collect(). None is returned if the stats can't be computed, e.g.
+        if the container was not sampled yet.
+        """
+        samples = self._samples.get(container_id)
+        if not samples:
+            return None
+        try:
+            sample = self.read_sample(container_id)
+        except (IOError, OSError, ValueError) as e:
+            LOG.debug('Failed to read the stats of container %s: %s',
+                      container_id, e)
+            return None
+
+        # Use the latest sample that is old enough for the CPU usage not to
+        # be too noisy, or the oldest one we have.
+        previous = samples[0]
+        for stored in reversed(samples):
+            if sample.time - stored.time >= MIN_CPU_WINDOW:
+                previous = stored
+                break
+        elapsed = sample.time - previous.time
+        if elapsed <= 0:
+            return None
+        cpu_delta = sample.cpu_usage - previous.cpu_usage
+
+        return {'cpu_percent': cpu_percent(cpu_delta, elapsed),
+                'mem_usage': sample.mem_usage,
+                'mem_limit': sample.mem_limit,
+                'io_read': sample.io_read,
+                'io_write': sample.io_write,
+                'net_rx': sample.net_rx,
+                'net_tx': sample.net_tx}
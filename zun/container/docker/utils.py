@@ -17,36 +17,194 @@ import tarfile
 
 import docker
 from docker import errors
+from eventlet import greenthread
+from eventlet import pools
 from oslo_serialization import jsonutils
 from oslo_utils import encodeutils
+import requests
 
 from zun.common import consts
 from zun.common import exception
 from zun.common.i18n import _
+from zun.common import singleton
 import zun.conf
 
 
 CONF = zun.conf.CONF
 
 
-@contextlib.contextmanager
-def docker_client():
+def _create_client(url=None):
     client_kwargs = dict()
     if not CONF.docker.api_insecure:
         client_kwargs['ca_cert'] = CONF.docker.ca_file
         client_kwargs['client_key'] = CONF.docker.key_file
         client_kwargs['client_cert'] = CONF.docker.cert_file
 
+    return DockerHTTPClient(
+        url or CONF.docker.api_url,
+        CONF.docker.docker_remote_api_version,
+        CONF.docker.default_timeout,
+        **client_kwargs
+    )
+
+
+@six.add_metaclass(singleton.Singleton)
+class DockerClientPool(pools.Pool):
+    """A pool of docker API clients shared within a process.
+
+    Clients are kept around between calls so that their keep-alive
+    connections (and TLS sessions) to the docker daemon are reused.
+    """
+
+    def __init__(self):
+        super(DockerClientPool, self).__init__(
+            max_size=CONF.docker.client_pool_size, order_as_stack=True)
+        # Clients borrowed by each greenthread, with the number of nested
+        # borrows of the client.
+        self._borrowed = {}
+
+    def create(self):
+        return _create_client()
+
+    def get(self):
+        """Borrow a client, reusing the one the greenthread already holds.
+
+        A nested borrow must not wait on the pool, otherwise a greenthread
+        holding the last client would deadlock on itself.
+        """
+        current = greenthread.getcurrent()
+        borrowed = self._borrowed.get(current)
+        if borrowed is None:
+            borrowed = [super(DockerClientPool, self).get(), 0]
+            self._borrowed[current] = borrowed
+        borrowed[1] += 1
+        return borrowed[0]
+
+    def put(self, client):
+        current = greenthread.getcurrent()
+        borrowed = self._borrowed.get(current)
+        if borrowed is not None and borrowed[0] is client:
+            borrowed[1] -= 1
+            if borrowed[1] > 0:
+                return
+            del self._borrowed[current]
+        super(DockerClientPool, self).put(client)
+
+    def reset(self, client):
+        """Drop the connections of a client after a connection error."""
+        client.close()
+
+
+@contextlib.contextmanager
+def docker_client(pooled=True):
+    """Yield a docker API client.
+
+    By default, the client is borrowed from the process-wide client pool.
+    Long-running calls that would hold a client for a long time (e.g.
+    streaming events) should pass pooled=False to use a dedicated client.
+    """
+    if pooled:
+        pool = DockerClientPool()
+        client = pool.get()
+    else:
+        client = _create_client()
+
     try:
-        yield DockerHTTPClient(
-            CONF.docker.api_url,
-            CONF.docker.docker_remote_api_version,
-            CONF.docker.default_timeout,
-            **client_kwargs
-        )
+        yield client
     except errors.APIError as e:
         desired_exc = exception.DockerError(error_msg=six.text_type(e))
         six.reraise(type(desired_exc), desired_exc, sys.exc_info()[2])
+    except requests.exceptions.ConnectionError:
+        if pooled:
+            pool.reset(client)
+        raise
+    finally:
+        if pooled:
+            pool.put(client)
+        else:
+            client.close()
+
+
+def _iter_and_close(client, stream):
+    try:
+        for chunk in stream:
+            yield chunk
+    finally:
+        client.close()
+
+
+def _read_chunks(fileobj, chunk_size):
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _raise_archive_error(e):
+    if '404' in str(e):
+        raise exception.Invalid(_("%s") % str(e))
+    raise exception.DockerError(error_msg=six.text_type(e))
+
+
+def get_archive_stream(url, container_id, path):
+    """Stream a path of a container out of a remote docker daemon.
+
+    The tar archive is not buffered: it is returned as an iterator of
+    chunks of at most ``[docker]archive_chunk_size`` bytes, along with the
+    stat of the path. The connection to the daemon is closed once the
+    iterator is exhausted or closed.
+
+    :param url: The remote API endpoint of the docker daemon.
+    """
+    client = _create_client(url)
+    try:
+        stream, stat = client.get_archive(
+            container_id, path, chunk_size=CONF.docker.archive_chunk_size)
+    except errors.APIError as e:
+        client.close()
+        _raise_archive_error(e)
+    except Exception:
+        client.close()
+        raise
+    return _iter_and_close(client, stream), stat
+
+
+def get_image_stream(name):
+    """Stream the tar archive of an image out of the docker daemon.
+
+    A dedicated client is used for the duration of the stream and closed
+    once the returned iterator is exhausted or closed.
+    """
+    client = _create_client()
+    try:
+        stream = client.get_image(name)
+    except errors.APIError as e:
+        client.close()
+        raise exception.DockerError(error_msg=six.text_type(e))
+    except Exception:
+        client.close()
+        raise
+    return _iter_and_close(client, stream)
+
+
+def put_archive_stream(url, container_id, path, fileobj):
+    """Stream a tar archive from a file object into a remote container.
+
+    The archive is read and sent to the docker daemon in chunks of
+    ``[docker]archive_chunk_size`` bytes.
+
+    :param url: The remote API endpoint of the docker daemon.
+    """
+    client = _create_client(url)
+    try:
+        client.put_archive(
+            container_id, path,
+            _read_chunks(fileobj, CONF.docker.archive_chunk_size))
+    except errors.APIError as e:
+        _raise_archive_error(e)
+    finally:
+        client.close()
 
 
 class DockerHTTPClient(docker.APIClient):
@@ -355,6 +355,26 @@ class ContainerDriver(object):
         """Update containers states."""
         raise NotImplementedError()
 
+    def list_stats(self, context, containers):
+        """Display the stats of many containers.
+
+        :returns: a dict of stats by container uuid. Containers whose stats
+                  can't be retrieved are left out.
+        """
+        raise NotImplementedError()
+
+    def collect_stats(self, context):
+        """Sample the resource usage of the containers on the host.
+
+        Drivers that compute the stats of a container out of periodic
+        samples override this.
+        """
+        pass
+
+    def watch_container_events(self, context, manager):
+        """Watch container events and update containers states."""
+        raise NotImplementedError()
+
     def show(self, context, container):
         """Show the details of a container."""
         raise NotImplementedError()
@@ -420,6 +440,10 @@ class ContainerDriver(object):
         """Copy resource to a container."""
         raise NotImplementedError()
 
+    def get_archive_url(self, context, container):
+        """Get the url to stream archives from/to a container."""
+        raise NotImplementedError()
+
     def stats(self, context, container):
         """Display stats of the container."""
         raise NotImplementedError()
@@ -34,11 +34,16 @@ class Host(object):
 
         raise NotImplementedError()
 
+    def get_cpu_siblings(self):
+        """Return a list of the sets of CPUs that share a physical core."""
+        return []
+
     def get_host_numa_topology(self, numa_topo_obj):
         # Replace this call with a more generic call when we obtain other
         # NUMA related data like memory etc.
         cpu_info = self.get_cpu_numa_info()
         mem_info = self.get_mem_numa_info()
+        siblings = self.get_cpu_siblings()
         floating_cpus = utils.get_floating_cpu_set()
         numa_node_obj = []
         for cpu, mem_total in zip(cpu_info.items(), mem_info):
@@ -56,6 +61,10 @@ class Host(object):
             numa_node.pinned_cpus = set([])
             numa_node.mem_total = mem_total
             numa_node.mem_available = mem_total
+            # Only the cores with several threads that can be pinned on
+            # matter when picking the cpus of a container.
+            numa_node.siblings = [core & allowed_cpus for core in siblings
+                                  if len(core & allowed_cpus) > 1]
             numa_node_obj.append(numa_node)
         numa_topo_obj.nodes = numa_node_obj
 
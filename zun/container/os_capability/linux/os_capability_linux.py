@@ -54,6 +54,21 @@ class LinuxHost(host_capability.Host):
                 sock_map[val[0]].append(int(val[1]))
         return sock_map
 
+    def get_cpu_siblings(self):
+        try:
+            output = utils.execute('lscpu', '-p=core,cpu')
+        except exception.CommandError:
+            LOG.info("There was a problem while executing lscpu -p=core,cpu. "
+                     "The cpu siblings are not known.")
+            return []
+
+        core_map = defaultdict(set)
+        for value in re.findall("\d+,\d+", str(output)):
+            core, cpu = value.split(",")
+            core_map[core].add(int(cpu))
+        return sorted((cpus for cpus in core_map.values() if len(cpus) > 1),
+                      key=min)
+
     def get_mem_numa_info(self):
         try:
             output = utils.execute('numactl', '-H')
@@ -37,7 +37,7 @@ def _get_dbdriver_instance():
 
 @profiler.trace("db")
 def list_containers(context, container_type, filters=None, limit=None,
-                    marker=None, sort_key=None, sort_dir=None):
+                    marker=None, sort_key=None, sort_dir=None, columns=None):
     """List matching containers.
 
     Return a list of the specified columns for all containers that match
@@ -52,10 +52,13 @@ def list_containers(context, container_type, filters=None, limit=None,
     :param sort_key: Attribute by which results should be sorted.
     :param sort_dir: Direction in which results should be sorted.
                      (asc, desc)
+    :param columns: The columns to load, all of them if None. The other
+                    columns must not be accessed on the returned rows.
     :returns: A list of tuples of the specified columns.
     """
     return _get_dbdriver_instance().list_containers(
-        context, container_type, filters, limit, marker, sort_key, sort_dir)
+        context, container_type, filters, limit, marker, sort_key, sort_dir,
+        columns=columns)
 
 
 @profiler.trace("db")
@@ -133,6 +136,22 @@ def update_container(context, container_type, container_id, values):
         context, container_type, container_id, values)
 
 
+@profiler.trace("db")
+def bulk_update_containers(context, container_type, values_by_uuid):
+    """Update properties of many containers in a single transaction.
+
+    Containers that do not exist (anymore) are skipped.
+
+    :param context: Request context
+    :param container_type: The container type
+    :param values_by_uuid: A dict mapping the uuid of a container to
+                           the properties to be updated.
+    :returns: The number of updated containers.
+    """
+    return _get_dbdriver_instance().bulk_update_containers(
+        context, container_type, values_by_uuid)
+
+
 @profiler.trace("db")
 def list_volume_mappings(context, filters=None, limit=None, marker=None,
                          sort_key=None, sort_dir=None):
@@ -334,16 +353,18 @@ def list_zun_services(context, filters=None, limit=None,
 
 
 @profiler.trace("db")
-def list_zun_services_by_binary(context, binary):
+def list_zun_services_by_binary(context, binary, filters=None):
     """List matching zun services.
 
     Return a list of the specified binary.
 
     :param context: The security context
     :param binary: The name of the binary.
+    :param filters: Filters to apply. Defaults to None.
     :returns: A list of tuples of the specified binary.
     """
-    return _get_dbdriver_instance().list_zun_services_by_binary(binary)
+    return _get_dbdriver_instance().list_zun_services_by_binary(
+        binary, filters=filters)
 
 
 @profiler.trace("db")
@@ -825,6 +846,13 @@ def get_all_pci_device_by_container_uuid(container_uuid):
         container_uuid)
 
 
+@profiler.trace("db")
+def get_all_pci_device_by_container_uuids(container_uuids):
+    """Get PCI devices allocated to any of the containers."""
+    return _get_dbdriver_instance().get_all_pci_device_by_container_uuids(
+        container_uuids)
+
+
 @profiler.trace("db")
 def get_all_pci_device_by_parent_addr(node_id, parent_addr):
     """Get all PCI devices by parent address."""
@@ -969,6 +997,41 @@ def quota_usage_get_all_by_project(context, project_id):
                                                                    project_id)
 
 
+@profiler.trace("db")
+def quota_usage_reserve(context, project_id, deltas, limits):
+    """Reserve resources of a project or raise OverQuota.
+
+    :param context: The security context
+    :param project_id: The ID of the project.
+    :param deltas: A dict of the resources to reserve, e.g.
+                   {'containers': 1, 'cpu': 0.5}.
+    :param limits: A dict of the quota limits of the resources.
+    """
+    return _get_dbdriver_instance().quota_usage_reserve(context, project_id,
+                                                        deltas, limits)
+
+
+@profiler.trace("db")
+def quota_usage_release(context, project_id, deltas):
+    """Release resources reserved by quota_usage_reserve."""
+    return _get_dbdriver_instance().quota_usage_release(context, project_id,
+                                                        deltas)
+
+
+@profiler.trace("db")
+def quota_usage_sync(context, project_id=None):
+    """Count the quota usages again from the containers.
+
+    The reservations are kept.
+
+    :param context: The security context
+    :param project_id: The ID of the project, all the projects if None.
+    :returns: A dict of the usages that were corrected, by project ID
+              and resource.
+    """
+    return _get_dbdriver_instance().quota_usage_sync(context, project_id)
+
+
 @profiler.trace("db")
 def create_network(context, values):
     """Create a new network.
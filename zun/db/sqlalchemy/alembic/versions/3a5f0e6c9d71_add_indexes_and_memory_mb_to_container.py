@@ -0,0 +1,70 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""add indexes and memory_mb to container
+
+Revision ID: 3a5f0e6c9d71
+Revises: 47d79ffdc582
+Create Date: 2026-10-18 10:12:31.482915
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '3a5f0e6c9d71'
+down_revision = '47d79ffdc582'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+TABLE_MODEL = sa.Table(
+    'container', sa.MetaData(),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('memory', sa.String(length=255)),
+    sa.Column('memory_mb', sa.Integer()))
+
+
+def upgrade():
+    op.add_column('container',
+                  sa.Column('memory_mb', sa.Integer(), nullable=True))
+    # Copy the memory to memory_mb, the containers share a few memory
+    # sizes so there is one UPDATE per size
+    session = sa.orm.Session(bind=op.get_bind())
+    with session.begin(subtransactions=True):
+        memories = session.query(TABLE_MODEL.c.memory).filter(
+            TABLE_MODEL.c.memory.isnot(None)).distinct()
+        for (memory,) in memories.all():
+            try:
+                memory_mb = int(memory)
+            except ValueError:
+                continue
+            session.execute(
+                TABLE_MODEL.update().values(
+                    memory_mb=memory_mb).where(
+                        TABLE_MODEL.c.memory == memory))
+    session.commit()
+
+    op.create_index('container_host_container_type_idx', 'container',
+                    ['host', 'container_type'])
+    op.create_index('container_project_id_container_type_idx', 'container',
+                    ['project_id', 'container_type'])
+    op.create_index('container_status_task_state_auto_remove_idx',
+                    'container', ['status', 'task_state', 'auto_remove'])
+    if op.get_bind().dialect.name == 'mysql':
+        # Only MySQL 8.0.13 and later have functional indexes, the names
+        # are compared case-insensitively by the utf8 collation anyway
+        op.create_index('container_name_idx', 'container', ['name'])
+    else:
+        op.create_index('container_lower_name_idx', 'container',
+                        [sa.text('lower(name)')])
@@ -0,0 +1,36 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""add unique constraint to quota_usages
+
+Revision ID: 5e1d8b7a2c44
+Revises: 3a5f0e6c9d71
+Create Date: 2026-10-18 14:37:02.118304
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '5e1d8b7a2c44'
+down_revision = '3a5f0e6c9d71'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    # The usages are counted again from the containers the first time the
+    # quotas of a project are checked, any leftover rows can be dropped
+    op.execute(sa.table('quota_usages').delete())
+    op.create_unique_constraint('uniq_quota_usages0project_id0resource',
+                                'quota_usages', ['project_id', 'resource'])
@@ -17,6 +17,7 @@
 from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import session as db_session
 from oslo_db.sqlalchemy import utils as db_utils
+from oslo_serialization import jsonutils
 from oslo_utils import importutils
 from oslo_utils import strutils
 from oslo_utils import timeutils
@@ -25,6 +26,7 @@ import sqlalchemy as sa
 from sqlalchemy.orm import contains_eager
 from sqlalchemy.orm.exc import MultipleResultsFound
 from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.orm import load_only
 from sqlalchemy.sql.expression import desc
 from sqlalchemy.sql import func
 
@@ -78,6 +80,39 @@ def model_query(model, *args, **kwargs):
     return query
 
 
+def _set_memory_mb(values):
+    """Set the numeric copy of the memory of a container.
+
+    The memory is a string in the API and the objects, the memory_mb column
+    holds it as an integer so that the database can sum it up.
+    """
+    if 'memory' in values:
+        try:
+            values['memory_mb'] = int(values['memory'])
+        except (TypeError, ValueError):
+            values['memory_mb'] = None
+
+
+# The usages that are kept up to date in the quota_usages table. The columns
+# are integers, so the usage of each resource is stored multiplied by its
+# scale, e.g. the cpu in thousandths of a CPU.
+QUOTA_USAGE_SCALES = {'containers': 1, 'cpu': 1000, 'memory': 1, 'disk': 1}
+
+# The columns of a container that count towards the quota usages
+_QUOTA_COLUMNS = {'cpu': 'cpu', 'memory': 'memory_mb', 'disk': 'disk'}
+
+
+def _to_quota_usage(resource, value):
+    return int(round((value or 0) * QUOTA_USAGE_SCALES[resource]))
+
+
+def _from_quota_usage(resource, value):
+    scale = QUOTA_USAGE_SCALES[resource]
+    if scale == 1:
+        return value
+    return float(value) / scale
+
+
 def add_identity_filter(query, value):
     """Adds an identity filter to a query.
 
@@ -164,8 +199,11 @@ class Connection(object):
         return query
 
     def list_containers(self, context, container_type, filters=None,
-                        limit=None, marker=None, sort_key=None, sort_dir=None):
+                        limit=None, marker=None, sort_key=None, sort_dir=None,
+                        columns=None):
         query = model_query(models.Container)
+        if columns:
+            query = query.options(load_only(*columns))
         query = self._add_project_filters(context, query)
         query = self._add_container_type_filter(container_type, query)
         query = self._add_containers_filters(query, filters)
@@ -176,8 +214,14 @@ class Connection(object):
         if not CONF.compute.unique_container_name_scope:
             return
         lowername = name.lower()
-        base_query = model_query(models.Container).\
-            filter(func.lower(models.Container.name) == lowername)
+        if get_engine().dialect.name == 'mysql':
+            # NOTE: the container names are compared case-insensitively by
+            # the utf8 collation of MySQL, which has no functional index on
+            # lower(name) before 8.0.13, so the index on name is used instead.
+            name_filter = models.Container.name == lowername
+        else:
+            name_filter = func.lower(models.Container.name) == lowername
+        base_query = model_query(models.Container).filter(name_filter)
         if CONF.compute.unique_container_name_scope == 'project':
             container_with_same_name = base_query.\
                 filter_by(project_id=context.project_id).count()
@@ -198,10 +242,14 @@ class Connection(object):
         if values.get('name'):
             self._validate_unique_container_name(context, values['name'])
 
+        _set_memory_mb(values)
         container = models.Container()
         container.update(values)
+        session = get_session()
         try:
-            container.save()
+            with session.begin():
+                container.save(session=session)
+                self._add_quota_usages(session, container)
         except db_exc.DBDuplicateEntry:
             raise exception.ContainerAlreadyExists(field='UUID',
                                                    value=values['uuid'])
@@ -237,9 +285,11 @@ class Connection(object):
             query = model_query(models.Container, session=session)
             query = self._add_container_type_filter(container_type, query)
             query = add_identity_filter(query, container_id)
+            container = query.with_lockmode('update').first()
             count = query.delete()
             if count != 1:
                 raise exception.ContainerNotFound(container=container_id)
+            self._add_quota_usages(session, container, sign=-1)
 
     def update_container(self, context, container_type, container_id, values):
         # NOTE(dtantsur): this can lead to very strange errors
@@ -250,6 +300,7 @@ class Connection(object):
         if 'name' in values:
             self._validate_unique_container_name(context, values['name'])
 
+        _set_memory_mb(values)
         return self._do_update_container(container_type, container_id, values)
 
     def _do_update_container(self, container_type, container_id, values):
@@ -263,9 +314,65 @@ class Connection(object):
             except NoResultFound:
                 raise exception.ContainerNotFound(container=container_id)
 
-            ref.update(values)
+            if set(values) & set(_QUOTA_COLUMNS.values()):
+                self._add_quota_usages(session, ref, sign=-1)
+                ref.update(values)
+                self._add_quota_usages(session, ref)
+            else:
+                ref.update(values)
         return ref
 
+    def _add_quota_usages(self, session, container, sign=1):
+        """Add the resources of a container to the quota usages.
+
+        The usages of the project are only updated if they were set up,
+        otherwise they are counted from the containers when they are first
+        needed.
+        """
+        if container.container_type != consts.TYPE_CONTAINER:
+            return
+        usages = self._lock_quota_usages(session, container.project_id)
+        for resource, usage in usages.items():
+            if resource == 'containers':
+                value = 1
+            else:
+                value = getattr(container, _QUOTA_COLUMNS[resource])
+            usage.in_use += sign * _to_quota_usage(resource, value)
+
+    def bulk_update_containers(self, context, container_type,
+                               values_by_uuid):
+        # Containers that are updated with the same values share a single
+        # UPDATE statement, e.g. all the containers that were found stopped
+        # after a restart of the docker daemon.
+        groups = {}
+        count = 0
+        for uuid, values in values_by_uuid.items():
+            if not values:
+                continue
+            if 'uuid' in values or 'name' in values:
+                msg = _("Cannot bulk update UUID or name of Containers.")
+                raise exception.InvalidParameterValue(err=msg)
+            _set_memory_mb(values)
+            if set(values) & set(_QUOTA_COLUMNS.values()):
+                # The quota usages follow the resources of each container
+                try:
+                    self._do_update_container(container_type, uuid, values)
+                    count += 1
+                except exception.ContainerNotFound:
+                    pass
+                continue
+            key = jsonutils.dumps(values, sort_keys=True)
+            groups.setdefault(key, (values, []))[1].append(uuid)
+
+        session = get_session()
+        with session.begin():
+            for values, uuids in groups.values():
+                query = model_query(models.Container, session=session)
+                query = self._add_container_type_filter(container_type, query)
+                query = query.filter(models.Container.uuid.in_(uuids))
+                count += query.update(values, synchronize_session=False)
+        return count
+
     def _add_volume_mappings_filters(self, query, filters):
         filter_names = ['project_id', 'user_id', 'volume_id',
                         'container_path', 'container_uuid']
@@ -447,8 +554,19 @@ class Connection(object):
                 host=zun_service.host, binary=zun_service.binary)
         return zun_service
 
+    def _add_updated_since_filter(self, query, model, filters):
+        """Only keep the rows created or updated since a point in time"""
+        if not filters or not filters.get('updated_since'):
+            return query
+
+        since = filters['updated_since']
+        return query.filter(sa.or_(model.created_at >= since,
+                                   model.updated_at >= since))
+
     def _add_zun_service_filters(self, query, filters):
         filter_names = ['disabled', 'host', 'binary', 'project_id', 'user_id']
+        query = self._add_updated_since_filter(query, models.ZunService,
+                                               filters)
         return self._add_filters(query, models.ZunService, filters=filters,
                                  filter_names=filter_names)
 
@@ -461,9 +579,11 @@ class Connection(object):
         return _paginate_query(models.ZunService, limit, marker,
                                sort_key, sort_dir, query)
 
-    def list_zun_services_by_binary(self, binary):
+    def list_zun_services_by_binary(self, binary, filters=None):
         query = model_query(models.ZunService)
         query = query.filter_by(binary=binary)
+        if filters:
+            query = self._add_zun_service_filters(query, filters)
         return _paginate_query(models.ZunService, query=query)
 
     def destroy_image(self, context, uuid):
@@ -808,6 +928,8 @@ class Connection(object):
 
     def _add_compute_nodes_filters(self, query, filters):
         filter_names = ['hostname', 'rp_uuid']
+        query = self._add_updated_since_filter(query, models.ComputeNode,
+                                               filters)
         return self._add_filters(query, models.ComputeNode, filters=filters,
                                  filter_names=filter_names)
 
@@ -922,6 +1044,12 @@ class Connection(object):
             filter_by(container_uuid=container_uuid).\
             all()
 
+    def get_all_pci_device_by_container_uuids(self, container_uuids):
+        return model_query(models.PciDevice).\
+            filter_by(status=consts.ALLOCATED).\
+            filter(models.PciDevice.container_uuid.in_(container_uuids)).\
+            all()
+
     def destroy_pci_device(self, node_id, address):
         session = get_session()
         with session.begin():
@@ -1182,16 +1310,152 @@ class Connection(object):
             if not result:
                 raise exception.QuotaClassNotFound(class_name=class_name)
 
-    def quota_usage_get_all_by_project(self, context, project_id):
-        rows = model_query(models.QuotaUsage).\
+    def _lock_quota_usages(self, session, project_id):
+        rows = model_query(models.QuotaUsage, session=session).\
             filter_by(project_id=project_id).\
+            order_by(models.QuotaUsage.resource).\
+            with_lockmode('update').\
             all()
-
+        return {row.resource: row for row in rows
+                if row.resource in QUOTA_USAGE_SCALES}
+
+    def _count_quota_usages(self, session, project_id):
+        """Count the usages of a project from its containers."""
+        query = session.query(
+            func.count(models.Container.id),
+            func.sum(models.Container.cpu),
+            func.sum(models.Container.memory_mb),
+            func.sum(models.Container.disk)).\
+            filter_by(project_id=project_id).\
+            filter_by(container_type=consts.TYPE_CONTAINER)
+        containers, cpu, memory, disk = query.one()
+        return {'containers': containers, 'cpu': cpu, 'memory': memory,
+                'disk': disk}
+
+    def _get_quota_usages(self, session, project_id):
+        """Lock the usages of a project, setting up the missing ones."""
+        usages = self._lock_quota_usages(session, project_id)
+        missing = set(QUOTA_USAGE_SCALES) - set(usages)
+        if missing:
+            counts = self._count_quota_usages(session, project_id)
+            for resource in sorted(missing):
+                usage = models.QuotaUsage()
+                usage.project_id = project_id
+                usage.resource = resource
+                usage.in_use = _to_quota_usage(resource, counts[resource])
+                usage.reserved = 0
+                session.add(usage)
+                usages[resource] = usage
+            session.flush()
+        return usages
+
+    def _with_quota_usages(self, project_id, callback):
+        """Call back with the locked usages of a project in a transaction."""
+        try:
+            session = get_session()
+            with session.begin():
+                return callback(self._get_quota_usages(session, project_id))
+        except (db_exc.DBDuplicateEntry, db_exc.DBDeadlock):
+            # Another request set up the usages of the project meanwhile
+            session = get_session()
+            with session.begin():
+                return callback(self._get_quota_usages(session, project_id))
+
+    @staticmethod
+    def _format_quota_usages(project_id, usages):
         result = {'project_id': project_id}
-        for row in rows:
-            result[row.resource] = dict(in_use=row.in_use,
-                                        reserved=row.reserved)
+        for resource, usage in usages.items():
+            result[resource] = dict(
+                in_use=_from_quota_usage(resource, usage.in_use),
+                reserved=_from_quota_usage(resource, usage.reserved))
+        return result
+
+    def quota_usage_get_all_by_project(self, context, project_id):
+        # NOTE: the usages are only read, neither locked nor set up, the
+        # missing ones are counted from the containers.
+        session = get_session()
+        rows = model_query(models.QuotaUsage, session=session).\
+            filter_by(project_id=project_id).\
+            all()
+        usages = {row.resource: row for row in rows
+                  if row.resource in QUOTA_USAGE_SCALES}
+        result = self._format_quota_usages(project_id, usages)
+        missing = set(QUOTA_USAGE_SCALES) - set(usages)
+        if missing:
+            counts = self._count_quota_usages(session, project_id)
+            for resource in missing:
+                result[resource] = dict(
+                    in_use=_from_quota_usage(
+                        resource, _to_quota_usage(resource, counts[resource])),
+                    reserved=0)
+        return result
 
+    def quota_usage_reserve(self, context, project_id, deltas, limits):
+        def reserve(usages):
+            overs = []
+            for resource, delta in deltas.items():
+                limit = limits.get(resource)
+                if delta <= 0 or limit is None or limit < 0:
+                    continue
+                usage = usages[resource]
+                total = (usage.in_use + usage.reserved +
+                         _to_quota_usage(resource, delta))
+                if total > _to_quota_usage(resource, limit):
+                    overs.append(resource)
+            if overs:
+                result = self._format_quota_usages(project_id, usages)
+                headroom = {}
+                for resource in overs:
+                    headroom[resource] = max(
+                        limits[resource] - result[resource]['in_use'] -
+                        result[resource]['reserved'], 0)
+                result.pop('project_id')
+                raise exception.OverQuota(overs=sorted(overs), quotas=limits,
+                                          usages=result, headroom=headroom)
+
+            for resource, delta in deltas.items():
+                if delta > 0:
+                    usages[resource].reserved += _to_quota_usage(resource,
+                                                                 delta)
+
+        self._with_quota_usages(project_id, reserve)
+
+    def quota_usage_release(self, context, project_id, deltas):
+        session = get_session()
+        with session.begin():
+            usages = self._lock_quota_usages(session, project_id)
+            for resource, delta in deltas.items():
+                if delta > 0 and resource in usages:
+                    usage = usages[resource]
+                    usage.reserved = max(
+                        usage.reserved - _to_quota_usage(resource, delta), 0)
+
+    def quota_usage_sync(self, context, project_id=None):
+        if project_id is None:
+            query = model_query(models.QuotaUsage.project_id).distinct()
+            project_ids = sorted(row[0] for row in query)
+        else:
+            project_ids = [project_id]
+
+        result = {}
+        for project_id in project_ids:
+            session = get_session()
+            with session.begin():
+                usages = self._lock_quota_usages(session, project_id)
+                if not usages:
+                    continue
+                counts = self._count_quota_usages(session, project_id)
+                for resource, usage in usages.items():
+                    # NOTE: the reservations belong to the requests in
+                    # progress, only the usages are counted again.
+                    in_use = _to_quota_usage(resource, counts[resource])
+                    if usage.in_use == in_use:
+                        continue
+                    result.setdefault(project_id, {})[resource] = dict(
+                        in_use=_from_quota_usage(resource, in_use),
+                        previous_in_use=_from_quota_usage(resource,
+                                                          usage.in_use))
+                    usage.in_use = in_use
         return result
 
     def _add_networks_filters(self, query, filters):
@@ -1293,15 +1557,19 @@ class Connection(object):
                 filter_by(project_id=project_id). \
                 filter_by(container_type=container_type)
         elif flag in ['disk', 'cpu', 'memory']:
-            project_query = session.query(
-                func.sum(getattr(models.Container, flag))). \
+            if flag == 'memory':
+                column = models.Container.memory_mb
+            else:
+                column = getattr(models.Container, flag)
+            project_query = session.query(func.sum(column)). \
                 filter_by(project_id=project_id). \
                 filter_by(container_type=container_type)
 
         return project_query.first()
 
     def _add_registries_filters(self, query, filters):
-        filter_names = ['name', 'domain', 'username', 'project_id', 'user_id']
+        filter_names = ['name', 'domain', 'username', 'project_id', 'user_id',
+                        'id']
         return self._add_filters(query, models.Registry, filters=filters,
                                  filter_names=filter_names)
 
@@ -21,7 +21,9 @@ import six.moves.urllib.parse as urlparse
 from sqlalchemy import Boolean
 from sqlalchemy import Column
 from sqlalchemy import DateTime
+from sqlalchemy import DDL
 from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy import event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Float
 from sqlalchemy import ForeignKey
@@ -133,6 +135,12 @@ class Container(Base):
     __tablename__ = 'container'
     __table_args__ = (
         schema.UniqueConstraint('uuid', name='uniq_container0uuid'),
+        Index('container_host_container_type_idx',
+              'host', 'container_type'),
+        Index('container_project_id_container_type_idx',
+              'project_id', 'container_type'),
+        Index('container_status_task_state_auto_remove_idx',
+              'status', 'task_state', 'auto_remove'),
         table_args()
     )
     id = Column(Integer, primary_key=True)
@@ -147,6 +155,7 @@ class Container(Base):
     cpuset = Column(JSONEncodedDict, nullable=True)
     command = Column(JSONEncodedList)
     memory = Column(String(255))
+    memory_mb = Column(Integer)
     status = Column(String(20))
     status_reason = Column(Text, nullable=True)
     task_state = Column(String(20))
@@ -186,6 +195,24 @@ class Container(Base):
     cni_metadata = Column(MediumText())
 
 
+def _is_not_mysql(ddl, target, bind, **kwargs):
+    return bind.dialect.name != 'mysql'
+
+
+# NOTE: the index on the names of the containers is created the same way as
+# by the migration 3a5f0e6c9d71. MySQL only has functional indexes from
+# 8.0.13 on and compares the names case-insensitively anyway, so it gets a
+# plain index on name instead of one on lower(name).
+event.listen(
+    Container.__table__, 'after_create',
+    DDL('CREATE INDEX container_lower_name_idx ON %(table)s '
+        '(lower(name))').execute_if(callable_=_is_not_mysql))
+event.listen(
+    Container.__table__, 'after_create',
+    DDL('CREATE INDEX container_name_idx ON %(table)s '
+        '(name)').execute_if(dialect='mysql'))
+
+
 class VolumeMapping(Base):
     """Represents a volume mapping."""
 
@@ -537,6 +564,11 @@ class QuotaUsage(Base):
     """Respents the current usage for a given resource."""
 
     __tablename__ = 'quota_usages'
+    __table_args__ = (
+        schema.UniqueConstraint('project_id', 'resource',
+                                name='uniq_quota_usages0project_id0resource'),
+        table_args()
+    )
     id = Column(Integer, primary_key=True)
 
     project_id = Column(String(255), index=True)
@@ -17,6 +17,7 @@ import types
 
 from oslo_log import log as logging
 from oslo_utils import fileutils
+from oslo_utils import units
 import six
 
 from zun.common import exception
@@ -151,13 +152,24 @@ class GlanceDriver(driver.ContainerImageDriver):
                 #               returns generator - related bugs [1].
                 #               These lines makes image_data readable.
                 # [1] https://bugs.launchpad.net/zun/+bug/1753080
-                data = six.b('').join(data)
-                data = six.BytesIO(data)
+                # NOTE: the chunks are streamed to glance as they are read
+                # instead of loading the whole image in memory.
+                data = utils.ChunkedReader(data)
 
-            return utils.upload_image_data(context, img_id, data)
+            img = utils.upload_image_data(context, img_id, data)
         except Exception as e:
             raise exception.ZunException(six.text_type(e))
 
+        if isinstance(data, utils.ChunkedReader):
+            elapsed = data.elapsed()
+            LOG.info('Uploaded %(size)d bytes of image %(id)s to glance in '
+                     '%(elapsed).1f seconds (%(rate).1f MB/s)',
+                     {'size': data.bytes_read, 'id': img_id,
+                      'elapsed': elapsed,
+                      'rate': (data.bytes_read / elapsed / units.Mi
+                               if elapsed else 0.0)})
+        return img
+
     def delete_committed_image(self, context, img_id):
         """Delete a committed image."""
         LOG.debug('Delete the committed image %s in glance', img_id)
@@ -13,8 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import time
+
 from glanceclient.common import exceptions as glance_exceptions
 from oslo_utils import uuidutils
+import six
 
 from zun.common import clients
 from zun.common import exception
@@ -88,6 +92,60 @@ def update_image(context, img_id, disk_format,
                                 container_format=container_format, tags=tags)
 
 
+class ChunkedReader(object):
+    """A file-like object reading from an iterator of chunks of bytes.
+
+    Only the chunks that are needed to serve a read() are pulled from the
+    iterator, so the data can be streamed with bounded memory. The number
+    of bytes read and the time spent reading are recorded.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = collections.deque()
+        self._buffered = 0
+        self.bytes_read = 0
+        self.start_time = None
+        self.end_time = None
+
+    def _fill(self, size):
+        while size < 0 or self._buffered < size:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                if self.end_time is None:
+                    self.end_time = time.time()
+                return
+            if chunk:
+                self._buffer.append(chunk)
+                self._buffered += len(chunk)
+
+    def read(self, size=-1):
+        if self.start_time is None:
+            self.start_time = time.time()
+        if size is None:
+            size = -1
+        self._fill(size)
+        data = []
+        remaining = size if size >= 0 else self._buffered
+        while self._buffer and remaining > 0:
+            chunk = self._buffer.popleft()
+            if len(chunk) > remaining:
+                self._buffer.appendleft(chunk[remaining:])
+                chunk = chunk[:remaining]
+            data.append(chunk)
+            remaining -= len(chunk)
+        data = six.b('').join(data)
+        self._buffered -= len(data)
+        self.bytes_read += len(data)
+        return data
+
+    def elapsed(self):
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.time()) - self.start_time
+
+
 def upload_image_data(context, img_id, data):
     """Upload an image."""
     LOG.debug('Upload image %s ', img_id)
@@ -29,6 +29,10 @@ LOG = logging.getLogger(__name__)
 
 CONTAINER_OPTIONAL_ATTRS = ["pci_devices", "exec_instances", "registry"]
 
+# The attributes that are not columns of the container table
+CONTAINER_NON_DB_ATTRS = CONTAINER_OPTIONAL_ATTRS + [
+    "containers", "init_containers"]
+
 
 @base.ZunObjectRegistry.register
 class Cpuset(base.ZunObject):
@@ -113,11 +117,13 @@ class ContainerBase(base.ZunPersistentObject, base.ZunObject):
     container_type = None
 
     @staticmethod
-    def _from_db_object(container, db_container):
-        """Converts a database entity to a formal object."""
-        for field in container.fields:
-            if field in ['pci_devices', 'exec_instances', 'registry',
-                         'containers', 'init_containers']:
+    def _from_db_object(container, db_container, fields=None):
+        """Converts a database entity to a formal object.
+
+        :param fields: the fields to set, all of them if None.
+        """
+        for field in fields or container.fields:
+            if field in CONTAINER_NON_DB_ATTRS:
                 continue
             if field == 'cpuset':
                 container.cpuset = Cpuset._from_dict(
@@ -129,36 +135,90 @@ class ContainerBase(base.ZunPersistentObject, base.ZunObject):
         return container
 
     @staticmethod
-    def _from_db_object_list(db_objects, cls, context):
+    def _from_db_object_list(db_objects, cls, context, fields=None,
+                             expected_attrs=None):
         """Converts a list of database entities to a list of formal objects."""
-        return [cls._from_db_object(cls(context), obj)
-                for obj in db_objects]
+        containers = [cls._from_db_object(cls(context), obj, fields=fields)
+                      for obj in db_objects]
+        if expected_attrs:
+            ContainerBase._load_expected_attrs(context, containers,
+                                               expected_attrs)
+        return containers
+
+    @staticmethod
+    def _load_expected_attrs(context, containers, expected_attrs):
+        """Load optional attributes of containers with a query per attribute.
+
+        Unlike the lazy-loading of obj_load_attr(), which queries the
+        attribute of each container on its own, the attribute is loaded
+        for all the containers at once.
+        """
+        if 'registry' in expected_attrs:
+            registry_ids = set(c.registry_id for c in containers
+                               if c.registry_id)
+            registries = {}
+            if registry_ids:
+                registries = {r.id: r for r in registry.Registry.list(
+                    context, filters={'id': sorted(registry_ids)})}
+            for container in containers:
+                if not container.registry_id:
+                    container.registry = None
+                elif container.registry_id in registries:
+                    container.registry = registries[container.registry_id]
+                else:
+                    # Leave it to obj_load_attr() to raise RegistryNotFound
+                    continue
+                container.obj_reset_changes(['registry'])
+
+        if 'exec_instances' in expected_attrs:
+            by_id = {c.id: [] for c in containers}
+            if by_id:
+                for instance in exec_inst.ExecInstance.list_by_container_ids(
+                        context, sorted(by_id)):
+                    by_id[instance.container_id].append(instance)
+            for container in containers:
+                container.exec_instances = by_id[container.id]
+                container.obj_reset_changes(['exec_instances'])
+
+        if 'pci_devices' in expected_attrs:
+            by_uuid = {c.uuid: [] for c in containers}
+            if by_uuid:
+                for device in pci_device.PciDevice.list_by_container_uuids(
+                        context, sorted(by_uuid)):
+                    by_uuid[device.container_uuid].append(device)
+            for container in containers:
+                container.pci_devices = by_uuid[container.uuid]
+                container.obj_reset_changes(['pci_devices'])
 
     @base.remotable_classmethod
-    def get_by_uuid(cls, context, uuid):
+    def get_by_uuid(cls, context, uuid, expected_attrs=None):
         """Find a container based on uuid and return a :class:`Container` object.
 
         :param uuid: the uuid of a container.
         :param context: Security context
+        :param expected_attrs: the optional attributes to load along, e.g.
+                               'exec_instances'.
         :returns: a :class:`Container` object.
         """
         db_container = dbapi.get_container_by_uuid(context, cls.container_type,
                                                    uuid)
-        container = cls._from_db_object(cls(context), db_container)
-        return container
+        return cls._from_db_object_list([db_container], cls, context,
+                                        expected_attrs=expected_attrs)[0]
 
     @base.remotable_classmethod
-    def get_by_name(cls, context, name):
+    def get_by_name(cls, context, name, expected_attrs=None):
         """Find a container based on name and return a Container object.
 
         :param name: the logical name of a container.
         :param context: Security context
+        :param expected_attrs: the optional attributes to load along, e.g.
+                               'exec_instances'.
         :returns: a :class:`Container` object.
         """
         db_container = dbapi.get_container_by_name(context, cls.container_type,
                                                    name)
-        container = cls._from_db_object(cls(context), db_container)
-        return container
+        return cls._from_db_object_list([db_container], cls, context,
+                                        expected_attrs=expected_attrs)[0]
 
     @staticmethod
     def get_container_any_type(context, uuid):
@@ -188,24 +248,39 @@ class ContainerBase(base.ZunPersistentObject, base.ZunObject):
 
     @base.remotable_classmethod
     def list(cls, context, limit=None, marker=None,
-             sort_key=None, sort_dir=None, filters=None):
+             sort_key=None, sort_dir=None, filters=None, fields=None,
+             expected_attrs=None):
         """Return a list of Container objects.
 
         :param context: Security context.
         :param limit: maximum number of resources to return in a single result.
-        :param marker: pagination marker for large data sets.
+        :param marker: pagination marker for large data sets. Only the
+                       attributes that the results are sorted by need to be
+                       set on it.
         :param sort_key: column to sort results by.
         :param sort_dir: direction to sort. "asc" or "desc".
         :param filters: filters when list containers, the filter name could be
                         'name', 'image', 'project_id', 'user_id', 'memory'.
                         For example, filters={'image': 'nginx'}
+        :param fields: the fields to load, all of them if None. The id and
+                       the uuid are always loaded.
+        :param expected_attrs: the optional attributes to load along, e.g.
+                               'registry', with a query per attribute for
+                               all the containers.
         :returns: a list of :class:`Container` object.
 
         """
+        columns = None
+        if fields:
+            fields = sorted(set(fields) | {'id', 'uuid'})
+            columns = [f for f in fields if f not in CONTAINER_NON_DB_ATTRS]
         db_containers = dbapi.list_containers(
             context, cls.container_type, limit=limit, marker=marker,
-            sort_key=sort_key, sort_dir=sort_dir, filters=filters)
-        return cls._from_db_object_list(db_containers, cls, context)
+            sort_key=sort_key, sort_dir=sort_dir, filters=filters,
+            columns=columns)
+        return cls._from_db_object_list(db_containers, cls, context,
+                                        fields=fields,
+                                        expected_attrs=expected_attrs)
 
     @base.remotable_classmethod
     def list_by_host(cls, context, host):
@@ -276,6 +351,40 @@ class ContainerBase(base.ZunPersistentObject, base.ZunObject):
                         A context should be set when instantiating the
                         object, e.g.: Container(context)
         """
+        updates = self._get_db_updates()
+        dbapi.update_container(context, self.container_type, self.uuid,
+                               updates)
+
+        self.obj_reset_changes()
+
+    @base.remotable_classmethod
+    def bulk_save(cls, context, containers):
+        """Save updates to many containers at once.
+
+        This is meant for periodic tasks that update a few fields (e.g.
+        status or host) of a lot of containers. Unlike save(), containers
+        that were deleted in the meantime are silently skipped.
+
+        :param context: Security context.
+        :param containers: a list of :class:`ContainerBase` objects. They
+                           can be of different container types.
+        """
+        updates_by_type = {}
+        for container in containers:
+            updates = container._get_db_updates()
+            if updates:
+                type_updates = updates_by_type.setdefault(
+                    container.container_type, {})
+                type_updates[container.uuid] = updates
+
+        for container_type, values_by_uuid in updates_by_type.items():
+            dbapi.bulk_update_containers(context, container_type,
+                                         values_by_uuid)
+
+        for container in containers:
+            container.obj_reset_changes()
+
+    def _get_db_updates(self):
         updates = self.obj_get_changes()
         cpuset_obj = updates.pop('cpuset', None)
         if cpuset_obj is not None:
@@ -288,10 +397,7 @@ class ContainerBase(base.ZunPersistentObject, base.ZunObject):
         if cni_metadata is not None:
             updates['cni_metadata'] = self.fields['cni_metadata'].to_primitive(
                 self, 'cni_metadata', self.cni_metadata)
-        dbapi.update_container(context, self.container_type, self.uuid,
-                               updates)
-
-        self.obj_reset_changes()
+        return updates
 
     @base.remotable
     def refresh(self, context=None):
@@ -421,7 +527,12 @@ class Container(ContainerBase):
     # Version 1.41: Add 'annotations' attributes
     # Version 1.42: Remove 'meta' attribute
     # Version 1.43: Add 'cni_metadata' attribute
-    VERSION = '1.43'
+    # Version 1.44: Add 'bulk_save' method
+    # Version 1.45: Add 'container_queued' to TaskStateField
+    # Version 1.46: Add 'fields' to the 'list' method
+    # Version 1.47: Add 'expected_attrs' to the 'get_by_uuid', 'get_by_name'
+    #               and 'list' methods
+    VERSION = '1.47'
 
     container_type = consts.TYPE_CONTAINER
 
@@ -433,7 +544,12 @@ class Capsule(ContainerBase):
     # Version 1.2: Add 'annotations' attributes
     # Version 1.3: Remove 'meta' attribute
     # Version 1.4: Add 'cni_metadata' attribute
-    VERSION = '1.4'
+    # Version 1.5: Add 'bulk_save' method
+    # Version 1.6: Add 'container_queued' to TaskStateField
+    # Version 1.7: Add 'fields' to the 'list' method
+    # Version 1.8: Add 'expected_attrs' to the 'get_by_uuid', 'get_by_name'
+    #              and 'list' methods
+    VERSION = '1.8'
 
     container_type = consts.TYPE_CAPSULE
 
@@ -477,7 +593,12 @@ class CapsuleContainer(ContainerBase):
     # Version 1.2: Add 'annotations' attributes
     # Version 1.3: Remove 'meta' attribute
     # Version 1.4: Add 'cni_metadata' attribute
-    VERSION = '1.4'
+    # Version 1.5: Add 'bulk_save' method
+    # Version 1.6: Add 'container_queued' to TaskStateField
+    # Version 1.7: Add 'fields' to the 'list' method
+    # Version 1.8: Add 'expected_attrs' to the 'get_by_uuid', 'get_by_name'
+    #              and 'list' methods
+    VERSION = '1.8'
 
     container_type = consts.TYPE_CAPSULE_CONTAINER
 
@@ -506,7 +627,12 @@ class CapsuleInitContainer(ContainerBase):
     # Version 1.2: Add 'annotations' attributes
     # Version 1.3: Remove 'meta' attribute
     # Version 1.4: Add 'cni_metadata' attribute
-    VERSION = '1.4'
+    # Version 1.5: Add 'bulk_save' method
+    # Version 1.6: Add 'container_queued' to TaskStateField
+    # Version 1.7: Add 'fields' to the 'list' method
+    # Version 1.8: Add 'expected_attrs' to the 'get_by_uuid', 'get_by_name'
+    #              and 'list' methods
+    VERSION = '1.8'
 
     container_type = consts.TYPE_CAPSULE_INIT_CONTAINER
 
@@ -23,7 +23,8 @@ LOG = logging.getLogger(__name__)
 @base.ZunObjectRegistry.register
 class ExecInstance(base.ZunPersistentObject, base.ZunObject):
     # Version 1.0: Initial version
-    VERSION = '1.0'
+    # Version 1.1: Add list_by_container_ids method
+    VERSION = '1.1'
 
     fields = {
         'id': fields.IntegerField(),
@@ -54,6 +55,12 @@ class ExecInstance(base.ZunPersistentObject, base.ZunObject):
             context, filters={'container_id': container_id})
         return ExecInstance._from_db_object_list(db_objects, cls, context)
 
+    @base.remotable_classmethod
+    def list_by_container_ids(cls, context, container_ids):
+        db_objects = dbapi.list_exec_instances(
+            context, filters={'container_id': list(container_ids)})
+        return ExecInstance._from_db_object_list(db_objects, cls, context)
+
     @base.remotable
     def create(self, context):
         values = self.obj_get_changes()
@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from oslo_utils import versionutils
 from oslo_versionedobjects import fields
 
 from zun.common import exception
@@ -22,7 +23,8 @@ from zun.objects import base
 @base.ZunObjectRegistry.register
 class NUMANode(base.ZunObject):
     # Version 1.0: Initial version
-    VERSION = '1.0'
+    # Version 1.1: Add siblings
+    VERSION = '1.1'
 
     fields = {
         'id': fields.IntegerField(read_only=True),
@@ -30,8 +32,15 @@ class NUMANode(base.ZunObject):
         'pinned_cpus': fields.SetOfIntegersField(),
         'mem_total': fields.IntegerField(nullable=True),
         'mem_available': fields.IntegerField(nullable=True),
+        'siblings': fields.ListOfSetsOfIntegersField(),
         }
 
+    def obj_make_compatible(self, primitive, target_version):
+        super(NUMANode, self).obj_make_compatible(primitive, target_version)
+        target_version = versionutils.convert_version_to_tuple(target_version)
+        if target_version < (1, 1) and 'siblings' in primitive:
+            del primitive['siblings']
+
     @property
     def free_cpus(self):
         return self.cpuset - self.pinned_cpus or set()
@@ -60,13 +69,16 @@ class NUMANode(base.ZunObject):
         self.pinned_cpus -= cpus
 
     def _to_dict(self):
-        return {
+        data_dict = {
             'id': self.id,
             'cpuset': list(self.cpuset),
             'pinned_cpus': list(self.pinned_cpus),
             'mem_total': self.mem_total,
             'mem_available': self.mem_available
             }
+        if self.obj_attr_is_set('siblings'):
+            data_dict['siblings'] = [list(s) for s in self.siblings]
+        return data_dict
 
     @classmethod
     def _from_dict(cls, data_dict):
@@ -75,21 +87,29 @@ class NUMANode(base.ZunObject):
         pinned_cpus = set(data_dict.get('pinned_cpus'))
         mem_total = data_dict.get('mem_total')
         mem_available = data_dict.get('mem_available')
-        return cls(id=node_id, cpuset=cpuset,
-                   pinned_cpus=pinned_cpus,
-                   mem_total=mem_total,
-                   mem_available=mem_available)
+        numa_node = cls(id=node_id, cpuset=cpuset,
+                        pinned_cpus=pinned_cpus,
+                        mem_total=mem_total,
+                        mem_available=mem_available)
+        if 'siblings' in data_dict:
+            numa_node.siblings = [set(s) for s in data_dict['siblings']]
+        return numa_node
 
 
 @base.ZunObjectRegistry.register
 class NUMATopology(base.ZunObject):
     # Version 1.0: Initial version
-    VERSION = '1.0'
+    # Version 1.1: NUMANode version 1.1
+    VERSION = '1.1'
 
     fields = {
         'nodes': fields.ListOfObjectsField('NUMANode'),
         }
 
+    obj_relationships = {
+        'nodes': [('1.0', '1.0'), ('1.1', '1.1')],
+    }
+
     @classmethod
     def _from_dict(cls, data_dict):
         return cls(nodes=[
@@ -84,7 +84,8 @@ class PciDevice(base.ZunPersistentObject, base.ZunObject):
 
     # Version 1.0: Initial version
     # Version 1.1: Change compute_node_uuid to uuid type
-    VERSION = '1.1'
+    # Version 1.2: Add list_by_container_uuids method
+    VERSION = '1.2'
 
     fields = {
         'id': fields.IntegerField(),
@@ -386,6 +387,11 @@ class PciDevice(base.ZunPersistentObject, base.ZunObject):
         db_dev_list = dbapi.get_all_pci_device_by_container_uuid(uuid)
         return PciDevice._from_db_object_list(db_dev_list, cls, context)
 
+    @base.remotable_classmethod
+    def list_by_container_uuids(cls, context, uuids):
+        db_dev_list = dbapi.get_all_pci_device_by_container_uuids(list(uuids))
+        return PciDevice._from_db_object_list(db_dev_list, cls, context)
+
     @base.remotable_classmethod
     def list_by_parent_address(cls, context, node_id, parent_addr):
         db_dev_list = dbapi.get_all_pci_device_by_parent_addr(node_id,
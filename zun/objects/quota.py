@@ -22,7 +22,8 @@ class Quota(base.ZunPersistentObject, base.ZunObject):
     # Version 1.1: Add uuid column
     # Version 1.2: Add destroy_all_by_project method
     # Version 1.3: Remove uuid column
-    VERSION = '1.3'
+    # Version 1.4: Add get_usages, reserve, release and sync_usages methods
+    VERSION = '1.4'
 
     fields = {
         'id': fields.IntegerField(),
@@ -65,6 +66,47 @@ class Quota(base.ZunPersistentObject, base.ZunObject):
         """
         return dbapi.quota_get_all_by_project(context, project_id)
 
+    @base.remotable_classmethod
+    def get_usages(cls, context, project_id):
+        """Find the usages of all the resources of a project
+
+        :param context: security context.
+        :param project_id: the project id.
+        :returns: a dict of the in_use and reserved amounts by resource
+        """
+        return dbapi.quota_usage_get_all_by_project(context, project_id)
+
+    @base.remotable_classmethod
+    def reserve(cls, context, project_id, deltas, limits):
+        """Reserve resources of a project within their quota limits
+
+        :param context: security context.
+        :param project_id: the project id.
+        :param deltas: a dict of the amount to reserve by resource.
+        :param limits: a dict of the quota limit by resource.
+        """
+        dbapi.quota_usage_reserve(context, project_id, deltas, limits)
+
+    @base.remotable_classmethod
+    def release(cls, context, project_id, deltas):
+        """Release resources reserved by reserve()
+
+        :param context: security context.
+        :param project_id: the project id.
+        :param deltas: a dict of the amount to release by resource.
+        """
+        dbapi.quota_usage_release(context, project_id, deltas)
+
+    @base.remotable_classmethod
+    def sync_usages(cls, context, project_id=None):
+        """Count the usages of a project, or of all of them, again
+
+        :param context: security context.
+        :param project_id: the project id.
+        :returns: a dict of the corrected usages by project id
+        """
+        return dbapi.quota_usage_sync(context, project_id)
+
     @base.remotable
     def create(self, context):
         """Create a Quota record in the DB.
@@ -22,7 +22,8 @@ class ZunService(base.ZunPersistentObject, base.ZunObject):
     # Version 1.0: Initial version
     # Version 1.1: Add update method
     # Version 1.2: Add availability_zone field
-    VERSION = '1.2'
+    # Version 1.3: Add filters to list_by_binary
+    VERSION = '1.3'
 
     fields = {
         'id': fields.IntegerField(),
@@ -89,9 +90,16 @@ class ZunService(base.ZunPersistentObject, base.ZunObject):
                                                context)
 
     @base.remotable_classmethod
-    def list_by_binary(cls, context, binary):
+    def list_by_binary(cls, context, binary, filters=None):
+        """Return a list of ZunService objects of a binary.
+
+        :param context: Security context.
+        :param binary: The name of the binary.
+        :param filters: filters when list zun services.
+        :returns: a list of :class:`ZunService` object.
+        """
         db_zun_services = dbapi.list_zun_services_by_binary(
-            context, binary)
+            context, binary, filters=filters)
         return ZunService._from_db_object_list(db_zun_services, cls, context)
 
     @base.remotable
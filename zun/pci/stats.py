@@ -14,8 +14,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import copy
-
 from oslo_config import cfg
 from oslo_log import log as logging
 import six
@@ -30,6 +28,66 @@ from zun.pci import whitelist
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
+# The number of request specs whose matcher is kept around. The matchers are
+# shared by the PciDeviceStats of all the hosts looked at by the scheduler.
+_MATCHER_CACHE_SIZE = 64
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+
+def _pool_key(pool):
+    """Return the hashable key of the properties of a pool.
+
+    'count' and 'devices' are not part of the key, two pools have the same
+    key if they have the same vendor, product, NUMA node, type and tags.
+    """
+    return tuple(sorted((k, _hashable(v)) for k, v in pool.items()
+                        if k not in ('count', 'devices')))
+
+
+class _SpecMatcher(object):
+    """Match pools against the specs of a PCI request.
+
+    The results are remembered by pool key, the pools of different hosts
+    with the same devices are matched once.
+    """
+
+    max_results = 1024
+
+    def __init__(self, specs):
+        self.specs = specs
+        self._results = {}
+
+    def match(self, pool):
+        key = _pool_key(pool)
+        result = self._results.get(key)
+        if result is None:
+            if len(self._results) >= self.max_results:
+                self._results.clear()
+            result = utils.pci_device_prop_match(pool, self.specs)
+            self._results[key] = result
+        return result
+
+
+_matchers = {}
+
+
+def _get_matcher(specs):
+    key = _hashable(specs)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        if len(_matchers) >= _MATCHER_CACHE_SIZE:
+            _matchers.clear()
+        matcher = _SpecMatcher(specs)
+        _matchers[key] = matcher
+    return matcher
+
 
 class PciDeviceStats(object):
 
@@ -63,23 +121,16 @@ class PciDeviceStats(object):
         self.pools = [pci_pool.to_dict()
                       for pci_pool in stats] if stats else []
         self.pools.sort(key=lambda item: len(item))
+        # The pools indexed by the key of their properties
+        self._pools_by_key = {}
+        for pool in self.pools:
+            self._pools_by_key.setdefault(_pool_key(pool), pool)
         self.dev_filter = dev_filter or whitelist.Whitelist(
             CONF.pci.passthrough_whitelist)
 
-    def _equal_properties(self, dev, entry, matching_keys):
-        return all(dev.get(prop) == entry.get(prop)
-                   for prop in matching_keys)
-
     def _find_pool(self, dev_pool):
-        """Return the first pool that matches dev."""
-        for pool in self.pools:
-            pool_keys = pool.copy()
-            del pool_keys['count']
-            del pool_keys['devices']
-            equal = self._equal_properties(dev_pool, pool_keys,
-                                           dev_pool.keys())
-            if (len(pool_keys.keys()) == len(dev_pool.keys()) and equal):
-                return pool
+        """Return the pool that matches dev."""
+        return self._pools_by_key.get(_pool_key(dev_pool))
 
     def _create_pool_keys_from_dev(self, dev):
         """create a stats pool dict that this dev is supposed to be part of
@@ -104,6 +155,7 @@ class PciDeviceStats(object):
         if dev_pool:
             pool = self._find_pool(dev_pool)
             if not pool:
+                self._pools_by_key[_pool_key(dev_pool)] = dev_pool
                 dev_pool['count'] = 0
                 dev_pool['devices'] = []
                 self.pools.append(dev_pool)
@@ -112,8 +164,7 @@ class PciDeviceStats(object):
             pool['count'] += 1
             pool['devices'].append(dev)
 
-    @staticmethod
-    def _decrease_pool_count(pool_list, pool, count=1):
+    def _decrease_pool_count(self, pool_list, pool, count=1):
         """Decrement pool's size by count.
 
         If pool becomes empty, remove pool from pool_list.
@@ -124,8 +175,23 @@ class PciDeviceStats(object):
         else:
             count -= pool['count']
             pool_list.remove(pool)
+            if pool_list is self.pools:
+                key = _pool_key(pool)
+                if self._pools_by_key.get(key) is pool:
+                    del self._pools_by_key[key]
         return count
 
+    @staticmethod
+    def _remove_pool_device(pool, dev):
+        # NOTE: comparing PCI devices compares all their fields, look for
+        # the device object itself before falling back to the comparison.
+        devices = pool['devices']
+        for i, device in enumerate(devices):
+            if device is dev:
+                del devices[i]
+                return
+        devices.remove(dev)
+
     def remove_device(self, dev):
         """Remove one device from the first pool that it matches."""
         dev_pool = self._create_pool_keys_from_dev(dev)
@@ -135,7 +201,7 @@ class PciDeviceStats(object):
                 raise exception.PciDevicePoolEmpty(
                     compute_node_uuid=dev.compute_node_uuid,
                     address=dev.address)
-            pool['devices'].remove(dev)
+            self._remove_pool_device(pool, dev)
             self._decrease_pool_count(self.pools, pool)
 
     def get_free_devs(self):
@@ -201,15 +267,18 @@ class PciDeviceStats(object):
                 parent = pci_dev.parent_device
                 # Make sure not to decrease PF pool count if this parent has
                 # been already removed from pools
-                if parent in self.get_free_devs():
+                parent_pool = self._create_pool_keys_from_dev(parent)
+                if parent_pool:
+                    parent_pool = self._find_pool(parent_pool)
+                if parent_pool and parent in parent_pool['devices']:
                     self.remove_device(parent)
             except exception.PciDeviceNotFound:
                 return
 
     @staticmethod
     def _filter_pools_for_spec(pools, request_specs):
-        return [pool for pool in pools
-                if utils.pci_device_prop_match(pool, request_specs)]
+        matcher = _get_matcher(request_specs)
+        return [pool for pool in pools if matcher.match(pool)]
 
     @staticmethod
     def _filter_pools_for_numa_cells(pools, numa_cells):
@@ -267,7 +336,10 @@ class PciDeviceStats(object):
         """
         # note (yjiang5): this function has high possibility to fail,
         # so no exception should be triggered for performance reason.
-        pools = copy.deepcopy(self.pools)
+        # NOTE: only the counts are changed on the copies of the pools, the
+        # devices are left out of them.
+        pools = [{k: v for k, v in pool.items() if k != 'devices'}
+                 for pool in self.pools]
         return all([self._apply_request(pools, r, numa_cells)
                    for r in requests])
 
@@ -294,6 +366,7 @@ class PciDeviceStats(object):
     def clear(self):
         """Clear all the stats maintained."""
         self.pools = []
+        self._pools_by_key = {}
 
     def __eq__(self, other):
         return self.pools == other.pools
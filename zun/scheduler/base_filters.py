@@ -14,6 +14,8 @@
 Filter support
 """
 
+import time
+
 from oslo_log import log as logging
 
 from zun.scheduler import loadables
@@ -21,8 +23,25 @@ from zun.scheduler import loadables
 LOG = logging.getLogger(__name__)
 
 
+# The share of objects assumed to be eliminated by a filter that was not
+# run yet, when ordering the filters.
+DEFAULT_ELIMINATION_RATE = 0.5
+# The lowest elimination rate used when ordering the filters, so that the
+# filters that never eliminated an object are still ordered by cost.
+MIN_ELIMINATION_RATE = 0.01
+# The weight of the previous runs of a filter in its elimination rate, so
+# that the rate follows the recent requests.
+ELIMINATION_RATE_DECAY = 0.9
+
+
 class BaseFilter(object):
     """Base class for all filter classes."""
+
+    # The relative cost of running the filter on one object. Filters that
+    # only compare a few attributes cost 1, filters that walk through
+    # topologies or device pools cost more.
+    cost = 1
+
     def _filter_one(self, obj, container, extra_spec):
         """Return True if it passes the filter, False otherwise."""
         return True
@@ -55,14 +74,90 @@ class BaseFilter(object):
             return True
 
 
+class FilterStats(object):
+    """Running totals of the runs of a filter."""
+
+    def __init__(self):
+        self.runs = 0
+        self.objects_in = 0
+        self.objects_out = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self._decayed_in = 0.0
+        self._decayed_out = 0.0
+
+    def record(self, start_count, end_count, elapsed):
+        self.runs += 1
+        self.objects_in += start_count
+        self.objects_out += end_count
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self._decayed_in = (self._decayed_in * ELIMINATION_RATE_DECAY +
+                            start_count)
+        self._decayed_out = (self._decayed_out * ELIMINATION_RATE_DECAY +
+                             end_count)
+
+    @property
+    def elimination_rate(self):
+        """The share of the objects that were recently filtered out."""
+        if not self._decayed_in:
+            return DEFAULT_ELIMINATION_RATE
+        return 1.0 - self._decayed_out / self._decayed_in
+
+    def to_dict(self):
+        return {'runs': self.runs,
+                'objects_in': self.objects_in,
+                'eliminated': self.objects_in - self.objects_out,
+                'total_time': self.total_time,
+                'avg_time': (self.total_time / self.runs
+                             if self.runs else 0.0),
+                'max_time': self.max_time,
+                'elimination_rate': self.elimination_rate}
+
+
 class BaseFilterHandler(loadables.BaseLoader):
     """Base class to handle loading filter classes.
 
     This class should be subclassed where one needs to use filters.
     """
 
+    def __init__(self, loadable_cls_type):
+        super(BaseFilterHandler, self).__init__(loadable_cls_type)
+        self._filter_stats = {}
+
+    def _record_filter_run(self, cls_name, start_count, end_count, elapsed):
+        stats = self._filter_stats.get(cls_name)
+        if stats is None:
+            stats = self._filter_stats[cls_name] = FilterStats()
+        stats.record(start_count, end_count, elapsed)
+
+    def filter_stats(self):
+        """Return the statistics of the filters run by this handler."""
+        return {cls_name: stats.to_dict()
+                for cls_name, stats in self._filter_stats.items()}
+
+    def order_filters(self, filters):
+        """Sort the filters by their cost per eliminated object.
+
+        A filter that is cheap and eliminates many objects is run first so
+        that the expensive filters run on fewer objects. The share of the
+        objects eliminated by a filter is learnt from its previous runs.
+        """
+        def _rank(filter_):
+            stats = self._filter_stats.get(filter_.__class__.__name__)
+            rate = (stats.elimination_rate if stats is not None
+                    else DEFAULT_ELIMINATION_RATE)
+            return filter_.cost / max(rate, MIN_ELIMINATION_RATE)
+
+        return sorted(filters, key=_rank)
+
     def get_filtered_objects(self, filters, objs, container, extra_spec,
-                             index=0):
+                             index=0, record_stats=True):
+        """Return the objects that pass all the filters.
+
+        :param record_stats: whether the runs of the filters are recorded in
+                             the statistics used to order the filters.
+        """
         list_objs = list(objs)
         LOG.debug("Starting with %d host(s)", len(list_objs))
         part_filter_results = []
@@ -72,12 +167,17 @@ class BaseFilterHandler(loadables.BaseLoader):
             if filter_.run_filter_for_index(index):
                 cls_name = filter_.__class__.__name__
                 start_count = len(list_objs)
+                start_time = time.time()
                 objs = filter_.filter_all(list_objs, container, extra_spec)
                 if objs is None:
                     LOG.debug("Filter %s says to stop filtering", cls_name)
                     return
                 list_objs = list(objs)
                 end_count = len(list_objs)
+                elapsed = time.time() - start_time
+                if record_stats:
+                    self._record_filter_run(cls_name, start_count, end_count,
+                                            elapsed)
                 part_filter_results.append(log_msg % {"cls_name": cls_name,
                                                       "start": start_count,
                                                       "end": end_count})
@@ -91,8 +191,9 @@ class BaseFilterHandler(loadables.BaseLoader):
                     full_filter_results.append((cls_name, None))
                     break
                 LOG.debug("Filter %(cls_name)s returned "
-                          "%(obj_len)d host(s)",
-                          {'cls_name': cls_name, 'obj_len': len(list_objs)})
+                          "%(obj_len)d host(s) in %(elapsed).6fs",
+                          {'cls_name': cls_name, 'obj_len': len(list_objs),
+                           'elapsed': elapsed})
         if not list_objs:
             cnt_uuid = container.uuid
             msg_dict = {"cnt_uuid": cnt_uuid,
@@ -40,7 +40,8 @@ class SchedulerClient(object):
         self.driver = driver.DriverManager(
             "zun.scheduler.driver",
             scheduler_driver,
-            invoke_on_load=True).driver
+            invoke_on_load=True,
+            invoke_kwds={'placement_client': self.placement_client}).driver
         self.traits_ensured = False
 
     def select_destinations(self, context, containers, extra_specs):
@@ -51,12 +52,31 @@ class SchedulerClient(object):
             self.placement_client._ensure_traits(context, consts.CUSTOM_TRAITS)
             self.traits_ensured = True
 
-        alloc_reqs_by_rp_uuid, provider_summaries, allocation_request_version \
-            = None, None, None
         request_filter.process_reqspec(context, extra_specs)
         resources = utils.resources_from_request_spec(
             context, containers[0], extra_specs)
 
+        # NOTE: once some containers of a request are claimed, the request
+        # can't be scheduled again, so only the single container requests
+        # are retried with new allocation candidates.
+        retries = 0
+        if len(containers) == 1:
+            retries = CONF.scheduler.allocation_candidates_retries
+        for attempt in range(retries + 1):
+            try:
+                return self._select_destinations(context, containers,
+                                                 extra_specs, resources)
+            except exception.AllocationClaimFailed:
+                if attempt == retries:
+                    raise
+                LOG.info("Unable to claim the resources of containers %s, "
+                         "requesting new allocation candidates.",
+                         [c.uuid for c in containers])
+
+    def _select_destinations(self, context, containers, extra_specs,
+                             resources):
+        alloc_reqs_by_rp_uuid, provider_summaries, allocation_request_version \
+            = None, None, None
         try:
             res = self.placement_client.get_allocation_candidates(context,
                                                                   resources)
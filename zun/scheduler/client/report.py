@@ -1577,6 +1577,110 @@ class SchedulerReportClient(object):
                 raise Retry('claim_resources', reason)
         return r.status_code == 204
 
+    @retries
+    def claim_resources_new_consumer(self, context, consumer_uuid,
+                                     alloc_request, project_id, user_id):
+        """Creates the allocation records of a new consumer.
+
+        Unlike claim_resources(), the current allocations of the consumer
+        are not read and merged into the new ones. The allocations are only
+        written if the consumer does not exist yet, so of several concurrent
+        claims for the same consumer only one can succeed.
+
+        :param context: The security context
+        :param consumer_uuid: The container's UUID.
+        :param alloc_request: The JSON body of the request to make to the
+                              placement's PUT /allocations API
+        :param project_id: The project_id associated with the allocations.
+        :param user_id: The user_id associated with the allocations.
+        :returns: True if the allocations were created, False otherwise.
+        :raise AllocationUpdateFailed: If the consumer already exists in
+                                       placement.
+        """
+        payload = {
+            'allocations': copy.deepcopy(alloc_request['allocations']),
+            'project_id': project_id,
+            'user_id': user_id,
+            'consumer_generation': None,
+        }
+        r = self._put_allocations(context, consumer_uuid, payload,
+                                  version=CONSUMER_GENERATION_VERSION)
+        if r.status_code != 204:
+            err = r.json()['errors'][0]
+            if err['code'] == 'placement.concurrent_update':
+                if 'consumer generation conflict' in err['detail']:
+                    raise exception.AllocationUpdateFailed(
+                        consumer_uuid=consumer_uuid, error=err['detail'])
+
+                reason = ('another process changed the resource providers '
+                          'involved in our attempt to put allocations for '
+                          'consumer %s' % consumer_uuid)
+                raise Retry('claim_resources_new_consumer', reason)
+        return r.status_code == 204
+
+    @retries
+    def claim_resources_batch(self, context, claims, project_id, user_id,
+                              allocation_request_version=None):
+        """Creates the allocation records of several new consumers at once.
+
+        The allocations of all the consumers are written by a single
+        POST /allocations call, so either all of them or none of them are
+        created.
+
+        :param context: The security context
+        :param claims: A list of (consumer_uuid, alloc_request) tuples, where
+                       alloc_request is an allocation request returned by
+                       the placement's GET /allocation_candidates API.
+        :param project_id: The project_id associated with the allocations.
+        :param user_id: The user_id associated with the allocations.
+        :param allocation_request_version: The microversion used to request the
+                                           allocations.
+        :returns: True if the allocations were created, False otherwise.
+        :raise AllocationUpdateFailed: If one of the consumers already
+                                       exists in placement.
+        """
+        version = allocation_request_version or CONSUMER_GENERATION_VERSION
+        version_tuple = versionutils.convert_version_to_tuple(version)
+        if version_tuple < versionutils.convert_version_to_tuple(
+                POST_ALLOCATIONS_API_VERSION):
+            LOG.debug('Allocation requests of microversion %s cannot be '
+                      'claimed at once.', version)
+            return False
+
+        payload = {}
+        for consumer_uuid, alloc_request in claims:
+            payload[consumer_uuid] = {
+                'allocations': copy.deepcopy(alloc_request['allocations']),
+                'project_id': project_id,
+                'user_id': user_id,
+            }
+            if version_tuple >= versionutils.convert_version_to_tuple(
+                    CONSUMER_GENERATION_VERSION):
+                payload[consumer_uuid]['consumer_generation'] = None
+
+        consumer_uuids = ', '.join(sorted(payload))
+        r = self.post('/allocations', payload, version=version,
+                      global_request_id=context.global_id)
+        if r.status_code != 204:
+            err = r.json()['errors'][0]
+            if err['code'] == 'placement.concurrent_update':
+                # NOTE: the consumers are expected to be new, a consumer
+                # generation conflict means one of them already exists.
+                if 'consumer generation conflict' in err['detail']:
+                    raise exception.AllocationUpdateFailed(
+                        consumer_uuid=consumer_uuids, error=err['detail'])
+
+                reason = ('another process changed the resource providers '
+                          'involved in our attempt to post allocations for '
+                          'consumers %s' % consumer_uuids)
+                raise Retry('claim_resources_batch', reason)
+            LOG.warning('Unable to post allocations for consumers '
+                        '%(uuids)s (%(code)i %(text)s)',
+                        {'uuids': consumer_uuids,
+                         'code': r.status_code,
+                         'text': r.text})
+        return r.status_code == 204
+
     def remove_resources_from_container_allocation(
             self, context, consumer_uuid, resources):
         """Removes certain resources from the current allocation of the
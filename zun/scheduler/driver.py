@@ -31,8 +31,9 @@ from zun import objects
 class Scheduler(object):
     """The base class that all Scheduler classes should inherit from."""
 
-    def __init__(self):
+    def __init__(self, placement_client=None):
         self.servicegroup_api = servicegroup.ServiceGroup()
+        self.placement_client = placement_client
 
     def hosts_up(self, context):
         """Return the list of hosts that have a running service."""
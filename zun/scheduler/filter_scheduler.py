@@ -13,66 +13,126 @@
 """
 The FilterScheduler is for scheduling container to a host according to
 your filters configured.
-You can customize this scheduler by specifying your own Host Filters.
+You can customize this scheduler by specifying your own Host Filters and
+Weighing Functions.
 """
 
+import random
+import time
+
+import eventlet
 from oslo_log.log import logging
+from oslo_utils import excutils
 
 from zun.common import exception
 from zun.common.i18n import _
 import zun.conf
-from zun import objects
 from zun.scheduler.client import report
 from zun.scheduler import driver
 from zun.scheduler import filters
-from zun.scheduler.host_state import HostState
+from zun.scheduler.host_state import HostStateCache
+from zun.scheduler import host_table
 from zun.scheduler import utils
+from zun.scheduler import weights
 
 
 CONF = zun.conf.CONF
 LOG = logging.getLogger(__name__)
 
 
+class ClaimStats(object):
+    """Running totals of the resource claims made against placement."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed, claimed):
+        self.attempts += 1
+        if claimed:
+            self.successes += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+    def to_dict(self):
+        failures = self.attempts - self.successes
+        return {'attempts': self.attempts,
+                'failures': failures,
+                'failure_rate': (float(failures) / self.attempts
+                                 if self.attempts else 0.0),
+                'avg_time': (self.total_time / self.attempts
+                             if self.attempts else 0.0),
+                'max_time': self.max_time}
+
+
 class FilterScheduler(driver.Scheduler):
     """Scheduler that can be used for filtering zun compute."""
 
-    def __init__(self):
-        super(FilterScheduler, self).__init__()
-        self.filter_handler = filters.HostFilterHandler()
+    def __init__(self, placement_client=None):
+        super(FilterScheduler, self).__init__(placement_client)
+        self.filter_handler = self._get_filter_handler()
         filter_classes = self.filter_handler.get_matching_classes(
             CONF.scheduler.available_filters)
         self.filter_cls_map = {cls.__name__: cls for cls in filter_classes}
         self.filter_obj_map = {}
         self.enabled_filters = self._choose_host_filters(self._load_filters())
-        self.placement_client = report.SchedulerReportClient()
+        self.weight_handler = weights.HostWeightHandler()
+        weigher_classes = self.weight_handler.get_matching_classes(
+            CONF.scheduler.weight_classes)
+        self.weighers = [cls() for cls in weigher_classes]
+        self.host_state_cache = HostStateCache()
+        self._claim_stats = ClaimStats()
+        if self.placement_client is None:
+            self.placement_client = report.SchedulerReportClient()
 
-    def _schedule(self, context, container, extra_specs, alloc_reqs_by_rp_uuid,
-                  provider_summaries, allocation_request_version=None):
-        """Picks a host according to filters."""
-        elevated = context.elevated()
+    @staticmethod
+    def _get_filter_handler():
+        if CONF.scheduler.vectorized_filtering:
+            if host_table.np is not None:
+                return filters.VectorizedHostFilterHandler()
+            LOG.warning("Vectorized filtering requires NumPy, which is not "
+                        "installed. The hosts are filtered one by one.")
+        return filters.HostFilterHandler()
+
+    def _get_host_states(self, context, provider_summaries):
+        """Return copies of the cached host states for one request.
 
+        The filters set the limits of the container on the host states, and
+        the cached host states are shared by the concurrent requests, so
+        each request filters its own copies.
+
+        :returns: the copies and a dict of the cached host states by the id
+                  of their copy.
+        """
         # NOTE(jaypipes): provider_summaries being None is treated differently
         # from an empty dict. provider_summaries is None when we want to grab
         # all compute nodes.
         # The provider_summaries variable will be an empty dict when the
         # Placement API found no providers that match the requested
         # constraints, which in turn makes compute_uuids an empty list and
-        # objects.ComputeNode.list will return an empty list
-        # also, which will eventually result in a NoValidHost error.
+        # no host state will be returned by the host state cache, which
+        # will eventually result in a NoValidHost error.
         compute_uuids = None
         if provider_summaries is not None:
             compute_uuids = list(provider_summaries.keys())
-        if compute_uuids is None:
-            nodes = objects.ComputeNode.list(context)
-        else:
-            nodes = objects.ComputeNode.list(
-                context, filters={'rp_uuid': compute_uuids})
-
-        services = self._get_services_by_host(context)
-        hosts = services.keys()
-        nodes = [node for node in nodes if node.hostname in hosts]
-        host_states = self.get_all_host_state(nodes, services)
-        hosts = self.filter_handler.get_filtered_objects(self.enabled_filters,
+        host_states = []
+        originals = {}
+        for cached in self.host_state_cache.get_host_states(context,
+                                                            compute_uuids):
+            host_state = cached.copy()
+            host_states.append(host_state)
+            originals[id(host_state)] = cached
+        return host_states, originals
+
+    def _schedule(self, context, container, extra_specs, alloc_reqs_by_rp_uuid,
+                  provider_summaries, allocation_request_version=None):
+        """Picks a host according to filters."""
+        elevated = context.elevated()
+        host_states, originals = self._get_host_states(elevated,
+                                                       provider_summaries)
+        hosts = self.filter_handler.get_filtered_objects(self._get_filters(),
                                                          host_states,
                                                          container,
                                                          extra_specs)
@@ -80,67 +140,248 @@ class FilterScheduler(driver.Scheduler):
             msg = _("Is the appropriate service running?")
             raise exception.NoValidHost(reason=msg)
 
-        # Attempt to claim the resources against one or more resource
-        # providers, looping over the sorted list of possible hosts
-        # looking for an allocation_request that contains that host's
-        # resource provider UUID
-        claimed_host = None
-        for host in hosts:
-            cn_uuid = host.uuid
-            if cn_uuid not in alloc_reqs_by_rp_uuid:
-                msg = ("A host state with uuid = '%s' that did not have a "
-                       "matching allocation_request was encountered while "
-                       "scheduling. This host was skipped.")
-                LOG.debug(msg, cn_uuid)
-                continue
-
-            alloc_reqs = alloc_reqs_by_rp_uuid[cn_uuid]
-            # TODO(jaypipes): Loop through all allocation_requests instead
-            # of just trying the first one. For now, since we'll likely
-            # want to order the allocation_requests in the future based on
-            # information in the provider summaries, we'll just try to
-            # claim resources using the first allocation_request
-            alloc_req = alloc_reqs[0]
-            if utils.claim_resources(
-                    elevated, self.placement_client, container, alloc_req,
-                    allocation_request_version=allocation_request_version):
-                claimed_host = host
-                break
+        weighed_hosts = self.weight_handler.get_weighed_objects(
+            self.weighers, hosts, container, extra_specs)
+        LOG.debug("Weighed %(hosts)s", {'hosts': weighed_hosts})
+        hosts = [weighed_host.obj for weighed_host in weighed_hosts
+                 if self._has_allocation_requests(weighed_host.obj,
+                                                  alloc_reqs_by_rp_uuid)]
+        hosts = self._choose_from_best_hosts(hosts)
 
+        claimed_host = self._claim(elevated, container, hosts,
+                                   alloc_reqs_by_rp_uuid,
+                                   allocation_request_version)
         if claimed_host is None:
             # We weren't able to claim resources in the placement API
-            # for any of the sorted hosts identified. So, clean up any
-            # successfully-claimed resources for prior containers in
-            # this request and return an empty list which will cause
-            # select_destinations() to raise NoValidHost
-            msg = _("Unable to successfully claim against any host.")
-            raise exception.NoValidHost(reason=msg)
+            # for any of the sorted hosts identified.
+            raise exception.AllocationClaimFailed()
 
         # Now consume the resources so the filter/weights will change for
         # the next container.
-        self._consume_selected_host(claimed_host, container)
+        self._consume_selected_host(originals[id(claimed_host)], container)
 
         return claimed_host
 
+    @staticmethod
+    def _choose_from_best_hosts(hosts):
+        """Moves a random host among the host_subset_size best to the front.
+
+        :param hosts: the hosts, sorted by weight.
+        :returns: the hosts in the order in which they should be tried.
+        """
+        subset_size = min(CONF.scheduler.host_subset_size, len(hosts))
+        if subset_size <= 1:
+            return hosts
+        chosen_host = random.choice(hosts[:subset_size])
+        return [chosen_host] + [host for host in hosts
+                                if host is not chosen_host]
+
+    @staticmethod
+    def _has_allocation_requests(host, alloc_reqs_by_rp_uuid):
+        if host.uuid in alloc_reqs_by_rp_uuid:
+            return True
+        msg = ("A host state with uuid = '%s' that did not have a "
+               "matching allocation_request was encountered while "
+               "scheduling. This host was skipped.")
+        LOG.debug(msg, host.uuid)
+        return False
+
+    def _claim(self, context, container, hosts, alloc_reqs_by_rp_uuid,
+               allocation_request_version=None):
+        """Claims the resources of a container against one of the hosts.
+
+        The hosts are tried in order. If claim_race_hosts is more than 1,
+        the resources are claimed against that many hosts at once. Each of
+        these claims only succeeds if it creates the consumer in placement,
+        so only one of them can succeed and the others leave no allocation
+        behind. The other hosts are then tried one by one.
+
+        :returns: the host the resources were claimed against, or None.
+        """
+        def _claim_on_host(host, new_consumer=False):
+            # Attempt to claim the resources using each allocation request
+            # of the host, until one of them succeeds.
+            for alloc_req in alloc_reqs_by_rp_uuid[host.uuid]:
+                if self._claim_resources(context, container, alloc_req,
+                                         allocation_request_version,
+                                         new_consumer=new_consumer):
+                    return True
+            return False
+
+        def _race_claim_on_host(host):
+            try:
+                return _claim_on_host(host, new_consumer=True)
+            except exception.AllocationUpdateFailed as e:
+                # NOTE: this is expected if the claim against another host
+                # created the consumer first.
+                return e
+
+        race_size = min(CONF.scheduler.claim_race_hosts, len(hosts))
+        if race_size > 1:
+            pool = eventlet.GreenPool(race_size)
+            results = list(pool.imap(_race_claim_on_host, hosts[:race_size]))
+            for host, result in zip(hosts, results):
+                if result is True:
+                    return host
+            for result in results:
+                if isinstance(result, exception.AllocationUpdateFailed):
+                    raise result
+            hosts = hosts[race_size:]
+
+        for host in hosts:
+            if _claim_on_host(host):
+                return host
+        return None
+
+    def _claim_resources(self, context, container, alloc_req,
+                         allocation_request_version=None,
+                         new_consumer=False):
+        start_time = time.time()
+        claimed = False
+        try:
+            claimed = utils.claim_resources(
+                context, self.placement_client, container, alloc_req,
+                allocation_request_version=allocation_request_version,
+                new_consumer=new_consumer)
+        finally:
+            self._claim_stats.record(time.time() - start_time, claimed)
+        return claimed
+
+    def _claim_resources_batch(self, context, containers, claims,
+                               allocation_request_version=None):
+        start_time = time.time()
+        claimed = False
+        try:
+            claimed = self.placement_client.claim_resources_batch(
+                context, claims, containers[0].project_id,
+                containers[0].user_id,
+                allocation_request_version=allocation_request_version)
+        finally:
+            self._claim_stats.record(time.time() - start_time, claimed)
+        return claimed
+
+    def _schedule_batch(self, context, containers, extra_specs,
+                        alloc_reqs_by_rp_uuid, provider_summaries,
+                        allocation_request_version=None):
+        """Picks hosts for containers of the same spec and claims them at once.
+
+        The hosts are filtered once and then weighed for each container on
+        copies of the host states, in which the resources of a container are
+        consumed before picking the host of the next one. Only the state of
+        the picked host changes between two picks, so it is the only host
+        that is filtered again.
+
+        :returns: copies of the host states picked for the containers, with
+                  the limits of each container, or None if the resources
+                  could not be claimed in one go.
+        """
+        elevated = context.elevated()
+        host_states, originals = self._get_host_states(elevated,
+                                                       provider_summaries)
+        host_states = [host_state for host_state in host_states
+                       if host_state.uuid in alloc_reqs_by_rp_uuid]
+
+        # NOTE: the cached host states are only updated once the resources
+        # are claimed, the picks are made on the copies.
+        host_filters = self._get_filters()
+        hosts = self.filter_handler.get_filtered_objects(
+            host_filters, host_states, containers[0], extra_specs) or []
+
+        picked_hosts = []
+        picks = []
+        for container in containers:
+            if not hosts:
+                msg = _("There are not enough hosts available for all the "
+                        "containers.")
+                raise exception.NoValidHost(reason=msg)
+            weighed_hosts = self.weight_handler.get_weighed_objects(
+                self.weighers, hosts, container, extra_specs)
+            host = self._choose_from_best_hosts(
+                [weighed_host.obj for weighed_host in weighed_hosts])[0]
+            # The limits are the ones of this container, the host is
+            # filtered again for the next one.
+            picks.append(host.copy())
+            host.consume_from_request(container)
+            picked_hosts.append(host)
+            # NOTE: the runs on a single host would skew the elimination
+            # rates the filters are ordered by, they are not recorded.
+            if not self.filter_handler.get_filtered_objects(
+                    host_filters, [host], container, extra_specs,
+                    record_stats=False):
+                hosts.remove(host)
+
+        # NOTE: a failed claim doesn't tell which host could not fit its
+        # containers, so the next allocation request of each host is tried
+        # at once, the hosts that have no other allocation request keep
+        # their last one.
+        num_alloc_reqs = max(len(alloc_reqs_by_rp_uuid[host.uuid])
+                             for host in picked_hosts)
+        for index in range(num_alloc_reqs):
+            claims = []
+            for container, host in zip(containers, picked_hosts):
+                alloc_reqs = alloc_reqs_by_rp_uuid[host.uuid]
+                claims.append((container.uuid,
+                               alloc_reqs[min(index, len(alloc_reqs) - 1)]))
+            if self._claim_resources_batch(elevated, containers, claims,
+                                           allocation_request_version):
+                break
+        else:
+            return None
+
+        for container, host in zip(containers, picked_hosts):
+            self._consume_selected_host(originals[id(host)], container)
+        return picks
+
     def select_destinations(self, context, containers, extra_specs,
                             alloc_reqs_by_rp_uuid, provider_summaries,
                             allocation_request_version=None):
         """Selects destinations by filters."""
-        dests = []
-        for container in containers:
-            host = self._schedule(context, container, extra_specs,
-                                  alloc_reqs_by_rp_uuid, provider_summaries,
-                                  allocation_request_version)
-            host_state = dict(host=host.hostname, nodename=None,
-                              limits=host.limits)
-            dests.append(host_state)
+        hosts = None
+        if len(containers) > 1:
+            hosts = self._schedule_batch(context, containers, extra_specs,
+                                         alloc_reqs_by_rp_uuid,
+                                         provider_summaries,
+                                         allocation_request_version)
+            if hosts is None:
+                LOG.info("Unable to claim the resources of containers %s "
+                         "at once, scheduling them one by one.",
+                         [c.uuid for c in containers])
+        if hosts is None:
+            hosts = []
+            try:
+                for container in containers:
+                    hosts.append(self._schedule(context, container,
+                                                extra_specs,
+                                                alloc_reqs_by_rp_uuid,
+                                                provider_summaries,
+                                                allocation_request_version))
+            except Exception:
+                with excutils.save_and_reraise_exception():
+                    # NOTE: all the containers fail, so the resources of the
+                    # ones that were already claimed are released.
+                    self._release_claims(context, containers[:len(hosts)])
+
+        dests = [dict(host=host.hostname, nodename=None, limits=host.limits)
+                 for host in hosts]
 
         if len(dests) < 1:
             reason = _('There are not enough hosts available.')
             raise exception.NoValidHost(reason=reason)
 
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("Scheduler stats: %s", self.stats())
         return dests
 
+    def _release_claims(self, context, containers):
+        elevated = context.elevated()
+        for container in containers:
+            try:
+                self.placement_client.delete_allocation_for_container(
+                    elevated, container.uuid)
+            except Exception:
+                LOG.exception("Failed to delete the allocations of "
+                              "container %s", container.uuid)
+
     def _choose_host_filters(self, filter_cls_names):
         """Choose good filters
 
@@ -170,21 +411,16 @@ class FilterScheduler(driver.Scheduler):
     def _load_filters(self):
         return CONF.scheduler.enabled_filters
 
-    def _get_services_by_host(self, context):
-        """Get a dict of services indexed by hostname"""
-        return {service.host: service
-                for service in objects.ZunService.list_by_binary(
-                    context,
-                    'zun-compute')}
+    def _get_filters(self):
+        """Return the enabled filters in the order they are run."""
+        if CONF.scheduler.order_filters_by_cost:
+            return self.filter_handler.order_filters(self.enabled_filters)
+        return self.enabled_filters
 
-    def get_all_host_state(self, nodes, services):
-        host_states = []
-        for node in nodes:
-            host_state = HostState(node.hostname)
-            host_state.update(compute_node=node,
-                              service=services.get(node.hostname))
-            host_states.append(host_state)
-        return host_states
+    def stats(self):
+        return {'host_state_cache': self.host_state_cache.stats(),
+                'filters': self.filter_handler.filter_stats(),
+                'claims': self._claim_stats.to_dict()}
 
     @staticmethod
     def _consume_selected_host(selected_host, container):
@@ -13,7 +13,14 @@
 """
 Scheduler host filters
 """
+import time
+
+from oslo_log import log as logging
+
 from zun.scheduler import base_filters
+from zun.scheduler import host_table
+
+LOG = logging.getLogger(__name__)
 
 
 class BaseHostFilter(base_filters.BaseFilter):
@@ -29,12 +36,84 @@ class BaseHostFilter(base_filters.BaseFilter):
         """
         raise NotImplementedError()
 
+    def filter_mask(self, table, filter_properties, extra_spec):
+        """Return the boolean mask of the hosts that pass the filter.
+
+        :param table: a :class:`zun.scheduler.host_table.HostStateTable` of
+                      the hosts to filter.
+        :returns: a NumPy array of booleans, or None if the filter can't be
+                  evaluated on the table, in which case host_passes() is
+                  called for each host.
+
+        Override this in a subclass.
+        """
+        return None
+
 
 class HostFilterHandler(base_filters.BaseFilterHandler):
     def __init__(self):
         super(HostFilterHandler, self).__init__(BaseHostFilter)
 
 
+class VectorizedHostFilterHandler(HostFilterHandler):
+    """Filter the hosts on a columnar table of their resources.
+
+    The filters that implement filter_mask() are evaluated on all the hosts
+    at once, the other filters are run host by host on the hosts that
+    passed the previous filters.
+    """
+
+    def get_filtered_objects(self, filters, objs, container, extra_spec,
+                             index=0, record_stats=True):
+        table = host_table.HostStateTable(list(objs))
+        LOG.debug("Starting with %d host(s)", table.size)
+        mask = table.all()
+        count = table.size
+        filter_results = []
+        for filter_ in filters:
+            if not filter_.run_filter_for_index(index):
+                continue
+            cls_name = filter_.__class__.__name__
+            start_time = time.time()
+            filter_mask = filter_.filter_mask(table, container, extra_spec)
+            if filter_mask is not None:
+                mask = mask & filter_mask
+            else:
+                objs = filter_.filter_all(table.select(mask), container,
+                                          extra_spec)
+                if objs is None:
+                    LOG.debug("Filter %s says to stop filtering", cls_name)
+                    return
+                mask = table.mask_of(mask, list(objs))
+            start_count, count = count, int(mask.sum())
+            elapsed = time.time() - start_time
+            if record_stats:
+                self._record_filter_run(cls_name, start_count, count,
+                                        elapsed)
+            filter_results.append("%(cls_name)s: (start: %(start)s, end: "
+                                  "%(end)s)" % {"cls_name": cls_name,
+                                                "start": start_count,
+                                                "end": count})
+            if not count:
+                LOG.info("Filter %s returned 0 hosts", cls_name)
+                break
+            LOG.debug("Filter %(cls_name)s returned %(obj_len)d host(s) in "
+                      "%(elapsed).6fs",
+                      {'cls_name': cls_name, 'obj_len': count,
+                       'elapsed': elapsed})
+
+        if not count:
+            LOG.info("Filtering removed all hosts for the request with "
+                     "container ID '%(cnt_uuid)s'. Filter results: "
+                     "%(str_results)s",
+                     {"cnt_uuid": container.uuid,
+                      "str_results": str(filter_results)})
+            return []
+        host_states = table.select(mask)
+        table.apply_limits(host_states)
+        return host_states
+
+
 def all_filters():
     """Return a list of filter classes found in this directory.
 
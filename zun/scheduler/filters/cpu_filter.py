@@ -40,3 +40,11 @@ class CPUFilter(filters.BaseHostFilter):
             return False
         host_state.limits['cpu'] = host_state.cpus
         return True
+
+    def filter_mask(self, table, container, extra_spec):
+        if not container.cpu:
+            return table.all()
+
+        cpu_free = table.column('cpus') - table.column('cpu_used')
+        table.set_limit('cpu', 'cpus')
+        return cpu_free >= container.cpu
@@ -16,6 +16,7 @@
 
 from oslo_log import log as logging
 
+from zun.common import numa
 import zun.conf
 from zun.scheduler import filters
 
@@ -28,6 +29,9 @@ class CpuSetFilter(filters.BaseHostFilter):
 
     run_filter_once_per_request = True
 
+    # Walks through the NUMA nodes of the host
+    cost = 3
+
     def host_passes(self, host_state, container, extra_spec):
         if container.cpu_policy is None:
             container.cpu_policy = 'shared'
@@ -37,18 +41,14 @@ class CpuSetFilter(filters.BaseHostFilter):
             container_memory = int(container.memory)
         if container.cpu_policy == 'dedicated':
             if host_state.enable_cpu_pinning:
-                for numa_node in host_state.numa_topology.nodes:
-                    if len(numa_node.cpuset) - len(
-                            numa_node.pinned_cpus) >= container.cpu and \
-                            numa_node.mem_available >= container_memory:
-                        host_state.limits['cpuset'] = {
-                            'node': numa_node.id,
-                            'cpuset_cpu': numa_node.cpuset,
-                            'cpuset_cpu_pinned': numa_node.pinned_cpus,
-                            'cpuset_mem': numa_node.mem_available
-                        }
-                        return True
-                return False
+                numa_node = numa.fit_container(host_state.numa_topology,
+                                               container.cpu,
+                                               container_memory)
+                if numa_node is None:
+                    return False
+                host_state.limits['cpuset'] = numa.get_cpuset_limits(
+                    numa_node)
+                return True
             else:
                 return False
         if container.cpu_policy == 'shared':
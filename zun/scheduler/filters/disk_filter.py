@@ -47,3 +47,12 @@ class DiskFilter(filters.BaseHostFilter):
             return False
         host_state.limits['disk'] = host_state.disk_total
         return True
+
+    def filter_mask(self, table, container, extra_spec):
+        if not hasattr(container, 'disk') or not container.disk:
+            return table.all()
+
+        usable_disk = table.column('disk_total') - table.column('disk_used')
+        table.set_limit('disk', 'disk_total')
+        return (table.column('disk_quota_supported', dtype=bool) &
+                (usable_disk >= container.disk))
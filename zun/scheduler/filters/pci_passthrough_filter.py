@@ -37,6 +37,9 @@ class PciPassthroughFilter(filters.BaseHostFilter):
 
     """
 
+    # Copies and walks through the PCI device pools of the host
+    cost = 5
+
     def host_passes(self, host_state, container, extra_spec):
         """Return true if the host has the required PCI devices."""
         pci_requests = extra_spec['pci_requests']
@@ -41,3 +41,11 @@ class RamFilter(filters.BaseHostFilter):
             return False
         host_state.limits['memory'] = host_state.mem_total
         return True
+
+    def filter_mask(self, table, container, extra_spec):
+        if not container.memory:
+            return table.all()
+
+        usable_ram = table.column('mem_total') - table.column('mem_used')
+        table.set_limit('memory', 'mem_total')
+        return usable_ram >= int(container.memory)
@@ -10,16 +10,26 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+import datetime
 import functools
 
 from oslo_log.log import logging
 from oslo_utils import timeutils
 
 from zun.common import utils
+import zun.conf
+from zun import objects
 from zun.pci import stats as pci_stats
 
+CONF = zun.conf.CONF
 LOG = logging.getLogger(__name__)
 
+# The rows updated in the last seconds before a refresh are loaded again by
+# the next refresh, for the updates written by hosts whose clock is a bit
+# behind the one of the scheduler not to be missed.
+CLOCK_SKEW_MARGIN = 5
+
 
 class HostState(object):
     """Mutable and immutable information tracked for a host.
@@ -48,12 +58,27 @@ class HostState(object):
         self.disk_quota_supported = False
         self.runtimes = []
         self.enable_cpu_pinning = False
+        self.num_containers = 0
 
         # Resource oversubscription values for the compute host:
         self.limits = {}
 
         self.updated = None
 
+    def copy(self):
+        """Return a copy of the host state for one scheduling request.
+
+        The filters set limits that are specific to a container on the
+        host state, and the resources of the containers of a request are
+        consumed from it, so the copy has its own limits, NUMA topology and
+        PCI stats.
+        """
+        host_state = copy.copy(self)
+        host_state.limits = dict(self.limits)
+        host_state.numa_topology = copy.deepcopy(self.numa_topology)
+        host_state.pci_stats = copy.deepcopy(self.pci_stats)
+        return host_state
+
     def update(self, compute_node=None, service=None):
         """Update information about a host"""
         @utils.synchronized((self.hostname, compute_node))
@@ -71,7 +96,7 @@ class HostState(object):
     def _update_from_compute_node(self, compute_node):
         """Update information about a host from a Compute object"""
         if (self.updated and compute_node.updated_at and
-                self.updated > compute_node.updated_at):
+                self.updated >= compute_node.updated_at):
             return
 
         self.uuid = compute_node.rp_uuid
@@ -90,6 +115,7 @@ class HostState(object):
         self.disk_quota_supported = compute_node.disk_quota_supported
         self.runtimes = compute_node.runtimes
         self.enable_cpu_pinning = compute_node.enable_cpu_pinning
+        self.num_containers = compute_node.total_containers
         self.updated = compute_node.updated_at
 
     def consume_from_request(self, container):
@@ -114,6 +140,7 @@ class HostState(object):
         self.disk_used += disk
         self.cpu_used += vcpus
         self.mem_free = self.mem_total - self.mem_used
+        self.num_containers += 1
         # TODO(hongbin): track numa_topology and pci devices
 
     def __repr__(self):
@@ -125,6 +152,112 @@ class HostState(object):
                  'free_cpu': self.cpus - self.cpu_used})
 
 
+class HostStateCache(object):
+    """In-memory cache of the states of the compute hosts.
+
+    The cache is refreshed with the compute nodes and services that were
+    created or updated since the previous refresh. All of them are reloaded
+    every ``host_state_cache_full_refresh_interval`` seconds to drop the
+    deleted ones.
+    """
+
+    def __init__(self):
+        self._host_states = {}
+        self._services = {}
+        self._last_refresh = None
+        self._last_full_refresh = None
+        self._hits = 0
+        self._incremental_refreshes = 0
+        self._full_refreshes = 0
+        self._nodes_refreshed = 0
+        self._last_refresh_duration = 0.0
+
+    def get_host_states(self, context, compute_uuids=None):
+        """Return the states of the hosts that have a compute service.
+
+        :param compute_uuids: if not None, only return the hosts whose
+                              resource provider is in this list.
+        """
+        @utils.synchronized('host-state-cache')
+        def _locked_get_host_states(self, context):
+            now = timeutils.utcnow()
+            if (self._last_refresh is not None and
+                    timeutils.delta_seconds(self._last_refresh, now) <
+                    CONF.scheduler.host_state_cache_ttl):
+                self._hits += 1
+            else:
+                self._refresh(context, now)
+            return [host_state for host_state in self._host_states.values()
+                    if host_state.hostname in self._services]
+
+        host_states = _locked_get_host_states(self, context)
+        if compute_uuids is not None:
+            compute_uuids = set(compute_uuids)
+            host_states = [host_state for host_state in host_states
+                           if host_state.uuid in compute_uuids]
+        return host_states
+
+    def _refresh(self, context, now):
+        full = (self._last_full_refresh is None or
+                timeutils.delta_seconds(self._last_full_refresh, now) >=
+                CONF.scheduler.host_state_cache_full_refresh_interval)
+        filters = None
+        if not full:
+            since = self._last_refresh - datetime.timedelta(
+                seconds=CLOCK_SKEW_MARGIN)
+            filters = {'updated_since': since}
+
+        nodes = objects.ComputeNode.list(context, filters=filters)
+        services = objects.ZunService.list_by_binary(
+            context, 'zun-compute', filters=filters)
+
+        if full:
+            self._services = {}
+            hostnames = set(node.hostname for node in nodes)
+            for hostname in set(self._host_states) - hostnames:
+                del self._host_states[hostname]
+        self._services.update(
+            (service.host, service) for service in services)
+
+        for node in nodes:
+            host_state = self._host_states.get(node.hostname)
+            if host_state is None:
+                host_state = HostState(node.hostname)
+                self._host_states[node.hostname] = host_state
+                host_state.update(
+                    service=self._services.get(node.hostname))
+            host_state.update(compute_node=node)
+        for service in services:
+            host_state = self._host_states.get(service.host)
+            if host_state is not None:
+                host_state.update(service=service)
+
+        if full:
+            self._last_full_refresh = now
+            self._full_refreshes += 1
+        else:
+            self._incremental_refreshes += 1
+        self._last_refresh = now
+        self._nodes_refreshed += len(nodes)
+        self._last_refresh_duration = timeutils.delta_seconds(
+            now, timeutils.utcnow())
+        LOG.debug("%(type)s refresh of the host state cache loaded "
+                  "%(nodes)d compute nodes and %(services)d services in "
+                  "%(duration).3fs, %(hosts)d hosts are cached.",
+                  {'type': 'Full' if full else 'Incremental',
+                   'nodes': len(nodes), 'services': len(services),
+                   'duration': self._last_refresh_duration,
+                   'hosts': len(self._host_states)})
+
+    def stats(self):
+        return {'hosts': len(self._host_states),
+                'hits': self._hits,
+                'incremental_refreshes': self._incremental_refreshes,
+                'full_refreshes': self._full_refreshes,
+                'nodes_refreshed': self._nodes_refreshed,
+                'last_refresh_duration': self._last_refresh_duration}
+
+
 @utils.expects_func_args('self', 'container')
 def set_update_time_on_success(function):
     """Set updated time of HostState when consuming succeed."""
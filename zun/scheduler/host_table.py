@@ -0,0 +1,76 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Columnar view of host states for vectorized filtering.
+"""
+
+from oslo_utils import importutils
+
+np = importutils.try_import('numpy')
+
+
+class HostStateTable(object):
+    """The resources of a list of host states as NumPy arrays.
+
+    The columns are loaded from the host state attributes of the same name
+    the first time they are used. Filters evaluate their conditions on the
+    columns and return boolean masks with one item per host.
+    """
+
+    def __init__(self, host_states):
+        self.host_states = host_states
+        self.size = len(host_states)
+        self._columns = {}
+        self._limits = {}
+
+    def column(self, name, dtype=float):
+        column = self._columns.get(name)
+        if column is None:
+            column = np.fromiter(
+                (getattr(host_state, name) for host_state in self.host_states),
+                dtype=dtype, count=self.size)
+            self._columns[name] = column
+        return column
+
+    def all(self):
+        """Return a mask that selects all the hosts."""
+        return np.ones(self.size, dtype=bool)
+
+    def none(self):
+        """Return a mask that selects no host."""
+        return np.zeros(self.size, dtype=bool)
+
+    def set_limit(self, key, name):
+        """Set a limit on the selected hosts.
+
+        The limit is set to the value of the attribute ``name`` of the hosts,
+        on the hosts that are left once all the filters were evaluated.
+        """
+        self._limits[key] = name
+
+    def select(self, mask):
+        """Return the host states selected by a mask."""
+        return [self.host_states[i] for i in np.flatnonzero(mask)]
+
+    def mask_of(self, mask, host_states):
+        """Return the mask of the hosts of ``mask`` that are in a list."""
+        kept = set(id(host_state) for host_state in host_states)
+        result = self.none()
+        for i in np.flatnonzero(mask):
+            result[i] = id(self.host_states[i]) in kept
+        return result
+
+    def apply_limits(self, host_states):
+        for host_state in host_states:
+            for key, name in self._limits.items():
+                host_state.limits[key] = getattr(host_state, name)
@@ -373,7 +373,7 @@ def resources_from_request_spec(ctxt, container_obj, extra_specs):
 
 
 def claim_resources(ctx, client, container, alloc_req,
-                    allocation_request_version=None):
+                    allocation_request_version=None, new_consumer=False):
     """Given a container and the
     allocation_request JSON object returned from Placement, attempt to claim
     resources for the container in the placement API. Returns True if the claim
@@ -390,6 +390,9 @@ def claim_resources(ctx, client, container, alloc_req,
                       the container
     :param allocation_request_version: The microversion used to request the
                                        allocations.
+    :param new_consumer: if True, the claim fails with AllocationUpdateFailed
+                         if the container already has allocations, instead
+                         of being merged into them.
     """
     LOG.debug("Attempting to claim resources in the placement API for "
               "container %s", container.uuid)
@@ -398,6 +401,10 @@ def claim_resources(ctx, client, container, alloc_req,
     user_id = container.user_id
     container_uuid = container.uuid
 
+    if new_consumer:
+        return client.claim_resources_new_consumer(
+            ctx, container_uuid, alloc_req, project_id, user_id)
+
     # NOTE(gibi): this could raise AllocationUpdateFailed which means there is
     # a serious issue with the container_uuid as a consumer. Every caller of
     # utils.claim_resources() assumes that container_uuid will be a new
@@ -0,0 +1,72 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+NUMA Weigher.  Weigh hosts by how tightly a container with dedicated CPUs
+fits in one of their NUMA nodes.
+
+The default is to prefer the host with the NUMA node that has the fewest
+free CPUs left once the container is pinned to it, which keeps larger NUMA
+nodes free for larger containers. Among the hosts with the same fit, the
+host whose free CPUs are the least scattered over its NUMA nodes once the
+container is placed is preferred. Set the 'numa_weight_multiplier' option
+to a negative number to prefer the loosest fit instead. Containers that
+do not have dedicated CPUs are not weighed.
+"""
+
+from zun.common import numa
+import zun.conf
+from zun.scheduler import weights
+
+CONF = zun.conf.CONF
+
+
+class NUMAWeigher(weights.BaseHostWeigher):
+
+    def weight_multiplier(self):
+        """Override the weight multiplier."""
+        return CONF.scheduler.numa_weight_multiplier
+
+    def _weigh_object(self, host_state, container, extra_spec):
+        """Return the free CPUs left by the tightest fitting NUMA node.
+
+        The fragmentation of the host once the container is placed, which is
+        below 1, is added to break the ties. None is returned if the
+        container fits in none of the NUMA nodes.
+        """
+        if (not host_state.enable_cpu_pinning or
+                host_state.numa_topology is None):
+            return None
+
+        request_cpu = container.cpu or 0
+        request_memory = int(container.memory) if container.memory else 0
+        numa_node = numa.fit_container(host_state.numa_topology, request_cpu,
+                                       request_memory)
+        if numa_node is None:
+            return None
+        leftover = len(numa_node.cpuset) - len(numa_node.pinned_cpus)
+        return (leftover - request_cpu +
+                numa.fragmentation(host_state.numa_topology, numa_node,
+                                   request_cpu))
+
+    def weigh_objects(self, weighed_obj_list, container, extra_spec):
+        """Higher weights win.  We want packing to be the default."""
+        if container.cpu_policy != 'dedicated':
+            return [0] * len(weighed_obj_list)
+
+        leftovers = [self._weigh_object(obj.obj, container, extra_spec)
+                     for obj in weighed_obj_list]
+        # Hosts that don't fit the container rank below all the others
+        fits = [leftover for leftover in leftovers if leftover is not None]
+        worst = max(fits) + 1 if fits else 0
+        return [-worst if leftover is None else -leftover
+                for leftover in leftovers]
@@ -28,7 +28,7 @@ from zun.tests.unit.db import base
 
 
 PATH_PREFIX = '/v1'
-CURRENT_VERSION = "container 1.38"
+CURRENT_VERSION = "container 1.42"
 
 
 class FunctionalTest(base.DbTestCase):
@@ -48,6 +48,9 @@ class FunctionalTest(base.DbTestCase):
         p = mock.patch('zun.scheduler.client.query.SchedulerClient')
         p.start()
         self.addCleanup(p.stop)
+        p = mock.patch('zun.compute.api._SCHEDULER_CLIENT', None)
+        p.start()
+        self.addCleanup(p.stop)
 
         # Determine where we are so we can set up paths in the config
         root_dir = self.get_path()
@@ -10,20 +10,27 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import base64
+
 import mock
 from mock import patch
 from webtest.app import AppError
 
 from neutronclient.common import exceptions as n_exc
+from oslo_serialization import jsonutils
 from oslo_utils import uuidutils
 import six
 
+from zun.api import utils as api_utils
 from zun.common import exception
+import zun.conf
 from zun import objects
 from zun.tests.unit.api import base as api_base
 from zun.tests.unit.db import utils
 from zun.tests.unit.objects import utils as obj_utils
 
+CONF = zun.conf.CONF
+
 
 class TestContainerController(api_base.FunctionalTest):
     @patch('zun.network.neutron.NeutronAPI.get_available_network')
@@ -200,6 +207,115 @@ class TestContainerController(api_base.FunctionalTest):
         self.assertTrue(mock_container_create.call_args[1]['run'] is False)
         mock_neutron_get_network.assert_called_once()
 
+    @patch('zun.network.neutron.NeutronAPI.get_available_network')
+    @patch('zun.compute.api.API.container_create_batch')
+    @patch('zun.compute.api.API.image_search')
+    def test_create_containers_with_count(self, mock_search,
+                                          mock_container_create_batch,
+                                          mock_neutron_get_network):
+        params = ('{"name": "MyDocker", "image": "ubuntu",'
+                  '"command": ["env"], "memory": "512", "count": 3}')
+        response = self.post('/v1/containers/',
+                             params=params,
+                             content_type='application/json')
+
+        self.assertEqual(202, response.status_int)
+        self.assertEqual(['MyDocker-1', 'MyDocker-2', 'MyDocker-3'],
+                         [c['name'] for c in response.json['containers']])
+        self.assertEqual(1, mock_container_create_batch.call_count)
+        containers = mock_container_create_batch.call_args[0][1]
+        self.assertEqual(3, len(containers))
+        self.assertEqual(3, len(set(c.uuid for c in containers)))
+        requested_volumes = \
+            mock_container_create_batch.call_args[1]['requested_volumes']
+        self.assertEqual(set(c.uuid for c in containers),
+                         set(requested_volumes))
+        self.assertEqual(3, len(objects.Container.list(self.context)))
+        usages = objects.Quota.get_usages(self.context,
+                                          self.context.project_id)
+        self.assertEqual({'in_use': 3, 'reserved': 0}, usages['containers'])
+        self.assertEqual({'in_use': 1536, 'reserved': 0}, usages['memory'])
+
+    @patch('zun.network.neutron.NeutronAPI.get_available_network')
+    @patch('zun.compute.api.API.container_create_batch')
+    @patch('zun.compute.api.API.image_search')
+    def test_create_containers_over_quota(self, mock_search,
+                                          mock_container_create_batch,
+                                          mock_neutron_get_network):
+        utils.create_test_quota(context=self.context,
+                                project_id=self.context.project_id,
+                                resource='containers', limit=2)
+        params = ('{"name": "MyDocker", "image": "ubuntu",'
+                  '"command": ["env"], "memory": "512", "count": 3}')
+        with self.assertRaisesRegex(AppError, "403 Forbidden"):
+            self.post('/v1/containers/',
+                      params=params,
+                      content_type='application/json')
+
+        self.assertFalse(mock_container_create_batch.called)
+        usages = objects.Quota.get_usages(self.context,
+                                          self.context.project_id)
+        self.assertEqual({'in_use': 0, 'reserved': 0}, usages['containers'])
+
+    @patch('zun.compute.api.API.container_create_batch')
+    def test_create_containers_with_count_old_version(
+            self, mock_container_create_batch):
+        params = ('{"name": "MyDocker", "image": "ubuntu",'
+                  '"command": ["env"], "memory": "512", "count": 3}')
+        headers = {'OpenStack-API-Version': 'container 1.40'}
+        self.assertRaises(AppError, self.post, '/v1/containers/',
+                          params=params, headers=headers,
+                          content_type='application/json')
+        self.assertFalse(mock_container_create_batch.called)
+
+    @patch('zun.compute.api.API.container_create_batch')
+    def test_create_containers_with_count_and_fixed_ip(
+            self, mock_container_create_batch):
+        params = ('{"name": "MyDocker", "image": "ubuntu",'
+                  '"command": ["env"], "memory": "512", "count": 2,'
+                  '"nets": [{"network": "testpublicnet",'
+                  '"v4-fixed-ip": "172.24.4.11"}]}')
+        self.assertRaises(AppError, self.post, '/v1/containers/',
+                          params=params, content_type='application/json')
+        self.assertFalse(mock_container_create_batch.called)
+
+    @patch('zun.compute.api.API.container_create_batch')
+    def test_create_containers_with_count_and_volume(
+            self, mock_container_create_batch):
+        params = ('{"name": "MyDocker", "image": "ubuntu",'
+                  '"command": ["env"], "memory": "512", "count": 2,'
+                  '"mounts": [{"source": "s", "destination": "d"}]}')
+        self.assertRaises(AppError, self.post, '/v1/containers/',
+                          params=params, content_type='application/json')
+        self.assertFalse(mock_container_create_batch.called)
+
+    def test_create_containers_with_invalid_count(self):
+        for count in (0, 201, '"two"', '"0"', '"201"'):
+            params = ('{"name": "MyDocker", "image": "ubuntu",'
+                      '"command": ["env"], "count": %s}' % count)
+            self.assertRaises(AppError, self.post, '/v1/containers/',
+                              params=params, content_type='application/json')
+        self.assertEqual(0, len(objects.Container.list(self.context)))
+
+    @patch('zun.network.neutron.NeutronAPI.get_available_network')
+    @patch('zun.compute.api.API.container_create_batch')
+    def test_create_containers_with_count_name_taken(
+            self, mock_container_create_batch, mock_neutron_get_network):
+        CONF.set_override('unique_container_name_scope', 'project',
+                          group='compute')
+        utils.create_test_container(context=self.context, name='MyDocker-2')
+        params = ('{"name": "MyDocker", "image": "ubuntu",'
+                  '"command": ["env"], "memory": "512", "count": 3}')
+        with self.assertRaisesRegex(AppError, "409 Conflict"):
+            self.post('/v1/containers/',
+                      params=params,
+                      content_type='application/json')
+
+        self.assertFalse(mock_container_create_batch.called)
+        self.assertEqual(['MyDocker-2'],
+                         [c.name for c in
+                          objects.Container.list(self.context)])
+
     @patch('zun.common.context.RequestContext.can')
     @patch('zun.network.neutron.NeutronAPI.get_available_network')
     @patch('zun.compute.api.API.container_create')
@@ -812,7 +928,9 @@ class TestContainerController(api_base.FunctionalTest):
 
         mock_container_list.assert_called_once_with(mock.ANY,
                                                     1000, None, 'id', 'asc',
-                                                    filters={})
+                                                    filters={}, fields=None,
+                                                    expected_attrs=[
+                                                        'registry'])
         context = mock_container_list.call_args[0][0]
         self.assertIs(False, context.all_projects)
         self.assertEqual(200, response.status_int)
@@ -834,7 +952,9 @@ class TestContainerController(api_base.FunctionalTest):
 
         mock_container_list.assert_called_once_with(mock.ANY,
                                                     1000, None, 'id', 'asc',
-                                                    filters={})
+                                                    filters={}, fields=None,
+                                                    expected_attrs=[
+                                                        'registry'])
         context = mock_container_list.call_args[0][0]
         self.assertIs(False, context.all_projects)
         self.assertEqual(200, response.status_int)
@@ -857,7 +977,9 @@ class TestContainerController(api_base.FunctionalTest):
 
         mock_container_list.assert_called_once_with(mock.ANY,
                                                     1000, None, 'id', 'asc',
-                                                    filters={})
+                                                    filters={}, fields=None,
+                                                    expected_attrs=[
+                                                        'registry'])
         context = mock_container_list.call_args[0][0]
         self.assertIs(True, context.all_projects)
         self.assertEqual(200, response.status_int)
@@ -901,6 +1023,64 @@ class TestContainerController(api_base.FunctionalTest):
         self.assertEqual(container_list[-1].uuid,
                          actual_containers[0].get('uuid'))
 
+    def test_get_all_containers_with_keyset_marker(self):
+        for id_ in range(5):
+            utils.create_test_container(
+                id=id_, uuid=uuidutils.generate_uuid(),
+                name='container%d' % (4 - id_), context=self.context)
+        response = self.get('/v1/containers/?limit=3&sort_key=name')
+        self.assertEqual(['container0', 'container1', 'container2'],
+                         [c['name'] for c in response.json['containers']])
+        next_url = response.json['next']
+        self.assertNotIn(response.json['containers'][-1]['uuid'], next_url)
+
+        with patch('zun.objects.Container.get_by_uuid') as mock_get:
+            response = self.get(next_url)
+        self.assertFalse(mock_get.called)
+        self.assertEqual(['container3', 'container4'],
+                         [c['name'] for c in response.json['containers']])
+
+    def test_get_all_containers_with_uuid_marker_old_version(self):
+        for id_ in range(4):
+            utils.create_test_container(
+                id=id_, uuid=uuidutils.generate_uuid(),
+                name='container%d' % id_, context=self.context)
+        headers = {'OpenStack-API-Version': 'container 1.41'}
+        response = self.get('/v1/containers/?limit=2', headers=headers)
+        last_uuid = response.json['containers'][-1]['uuid']
+        self.assertIn('marker=%s' % last_uuid, response.json['next'])
+
+    def test_get_all_containers_with_invalid_marker(self):
+        utils.create_test_container(context=self.context)
+        self.assertRaises(AppError, self.get,
+                          '/v1/containers/?marker=invalid')
+        marker = api_utils.encode_marker(['name', 'container1', 1])
+        self.assertRaises(AppError, self.get,
+                          '/v1/containers/?sort_key=id&marker=%s' % marker)
+
+    def test_get_all_containers_with_fields(self):
+        utils.create_test_container(context=self.context)
+        response = self.get('/v1/containers/?fields=name,status,image')
+        self.assertEqual(200, response.status_int)
+        self.assertEqual([{'name': 'container1', 'status': 'Running',
+                           'image': 'ubuntu'}],
+                         response.json['containers'])
+
+    @patch('zun.db.api.list_containers')
+    def test_get_all_containers_with_fields_loads_columns(self,
+                                                          mock_list):
+        mock_list.return_value = []
+        self.get('/v1/containers/?fields=uuid,name')
+        self.assertEqual(['id', 'name', 'uuid'],
+                         mock_list.call_args[1]['columns'])
+
+    def test_get_all_containers_with_fields_old_version(self):
+        headers = {'OpenStack-API-Version': 'container 1.41'}
+        self.assertRaises(AppError, self.get,
+                          '/v1/containers/?fields=name', headers=headers)
+        self.assertRaises(AppError, self.get,
+                          '/v1/containers/?fields=name,unknown')
+
     @patch('zun.objects.Container.list')
     def test_get_all_containers_with_filter(self, mock_container_list):
         test_container = utils.get_test_container()
@@ -910,7 +1090,8 @@ class TestContainerController(api_base.FunctionalTest):
         response = self.get('/v1/containers/?name=fake-name')
 
         mock_container_list.assert_called_once_with(
-            mock.ANY, 1000, None, 'id', 'asc', filters={'name': 'fake-name'})
+            mock.ANY, 1000, None, 'id', 'asc', filters={'name': 'fake-name'},
+            fields=None, expected_attrs=['registry'])
         self.assertEqual(200, response.status_int)
         actual_containers = response.json['containers']
         self.assertEqual(1, len(actual_containers))
@@ -933,6 +1114,32 @@ class TestContainerController(api_base.FunctionalTest):
             "Policy doesn't allow %s to be performed." % rule,
             response.json['errors'][0]['detail'])
 
+    @patch('zun.common.context.RequestContext.can')
+    @patch('zun.objects.Container.list')
+    def test_get_all_containers_checks_policy_once(self, mock_container_list,
+                                                   mock_can):
+        containers = []
+        for i in range(3):
+            test_container = utils.get_test_container(
+                id=i, uuid=uuidutils.generate_uuid(), name='container%d' % i)
+            containers.append(objects.Container(self.context,
+                                                **test_container))
+        mock_container_list.return_value = containers
+        mock_can.side_effect = lambda action, *args, **kwargs: (
+            action != 'container:get_one:host')
+
+        response = self.get('/v1/containers/')
+
+        self.assertEqual(200, response.status_int)
+        self.assertEqual(3, len(response.json['containers']))
+        for container in response.json['containers']:
+            self.assertIn('name', container)
+            self.assertNotIn('host', container)
+        actions = [c[0][0] for c in mock_can.call_args_list
+                   if c[0][0].startswith('container:get_one:')]
+        self.assertEqual(len(set(actions)), len(actions))
+        self.assertIn('container:get_one:host', actions)
+
     @patch('zun.objects.Container.list')
     def test_get_all_containers_with_unknown_parameter(
             self, mock_container_list):
@@ -957,7 +1164,9 @@ class TestContainerController(api_base.FunctionalTest):
         response = self.get('/v1/containers/')
         mock_container_list.assert_called_once_with(mock.ANY,
                                                     1000, None, 'id', 'asc',
-                                                    filters={})
+                                                    filters={}, fields=None,
+                                                    expected_attrs=[
+                                                        'registry'])
         self.assertEqual(200, response.status_int)
         actual_containers = response.json['containers']
         self.assertEqual(1, len(actual_containers))
@@ -1760,6 +1969,75 @@ class TestContainerController(api_base.FunctionalTest):
             self.post('/v1/containers/%s/%s/' % (test_object.uuid,
                                                  'put_archive'))
 
+    @patch('zun.container.docker.utils.get_archive_stream')
+    @patch('zun.compute.api.API.container_archive_url')
+    @patch('zun.objects.Container.get_by_uuid')
+    def test_get_archive_stream(self, mock_get_by_uuid,
+                                mock_archive_url, mock_get_archive_stream):
+        test_container = utils.get_test_container(status='Running')
+        test_container_obj = objects.Container(self.context, **test_container)
+        mock_get_by_uuid.return_value = test_container_obj
+        mock_archive_url.return_value = 'tcp://fake-host:2375'
+        mock_get_archive_stream.return_value = (
+            iter([b'chunk1', b'chunk2']), {'name': '1.txt'})
+
+        url = '/v1/containers/%s/get_archive_stream/' % (
+            test_container['uuid'])
+        response = self.get(url, {'path': '/home/1.txt'})
+        self.assertEqual(200, response.status_int)
+        self.assertEqual('application/x-tar', response.content_type)
+        self.assertEqual(b'chunk1chunk2', response.body)
+        stat = base64.b64decode(
+            response.headers['X-Zun-Container-Path-Stat'])
+        self.assertEqual({'name': '1.txt'}, jsonutils.loads(stat))
+        mock_get_archive_stream.assert_called_once_with(
+            'tcp://fake-host:2375', test_container['container_id'],
+            '/home/1.txt')
+
+    def test_get_archive_stream_old_version(self):
+        test_object = utils.create_test_container(context=self.context)
+        response = self.get(
+            '/v1/containers/%s/get_archive_stream/' % test_object.uuid,
+            {'path': '/home/1.txt'},
+            headers={'OpenStack-API-Version': 'container 1.39'},
+            expect_errors=True)
+        self.assertEqual(406, response.status_int)
+
+    @patch('zun.container.docker.utils.put_archive_stream')
+    @patch('zun.compute.api.API.container_archive_url')
+    @patch('zun.objects.Container.get_by_uuid')
+    def test_put_archive_stream(self, mock_get_by_uuid,
+                                mock_archive_url, mock_put_archive_stream):
+        test_container = utils.get_test_container(status='Running')
+        test_container_obj = objects.Container(self.context, **test_container)
+        mock_get_by_uuid.return_value = test_container_obj
+        mock_archive_url.return_value = 'tcp://fake-host:2375'
+        received = []
+        mock_put_archive_stream.side_effect = (
+            lambda url, container_id, path, fileobj:
+                received.append(fileobj.read()))
+
+        url = '/v1/containers/%s/put_archive_stream/?path=/home/' % (
+            test_container['uuid'])
+        response = self.post(url, b'fake-tar-data',
+                             content_type='application/x-tar')
+        self.assertEqual(200, response.status_int)
+        self.assertEqual([b'fake-tar-data'], received)
+        mock_put_archive_stream.assert_called_once_with(
+            'tcp://fake-host:2375', test_container['container_id'],
+            '/home/', mock.ANY)
+
+    def test_put_archive_stream_invalid_state(self):
+        uuid = uuidutils.generate_uuid()
+        test_object = utils.create_test_container(context=self.context,
+                                                  uuid=uuid, status='Error')
+        with self.assertRaisesRegex(
+                AppError,
+                "Cannot put_archive container %s in Error state" % uuid):
+            self.post('/v1/containers/%s/put_archive_stream/?path=/home/' %
+                      test_object.uuid, b'fake-tar-data',
+                      content_type='application/x-tar')
+
     @patch('zun.common.utils.validate_container_state')
     @patch('zun.compute.api.API.container_stats')
     @patch('zun.objects.Container.get_by_uuid')
@@ -85,6 +85,40 @@ class TestHostController(api_base.FunctionalTest):
         self.assertEqual(test_host['uuid'],
                          response.json['uuid'])
 
+    @mock.patch('zun.common.policy.enforce')
+    @mock.patch('zun.compute.api.API.host_container_stats')
+    @patch('zun.objects.ComputeNode.get_by_uuid')
+    def test_get_host_stats(self, mock_get_by_uuid, mock_stats,
+                            mock_policy):
+        mock_policy.return_value = True
+        test_host = utils.get_test_compute_node()
+        numat = numa.NUMATopology._from_dict(test_host['numa_topology'])
+        test_host['numa_topology'] = numat
+        test_host_obj = objects.ComputeNode(self.context, **test_host)
+        mock_get_by_uuid.return_value = test_host_obj
+        container_uuid = uuidutils.generate_uuid()
+        mock_stats.return_value = {container_uuid: {'CPU %': 10.0}}
+
+        response = self.get('/v1/hosts/%s/stats?project_id=fake_project'
+                            % test_host['uuid'])
+
+        self.assertEqual(200, response.status_int)
+        mock_stats.assert_called_once_with(
+            mock.ANY, test_host['hostname'], project_id='fake_project')
+        self.assertEqual(test_host['hostname'], response.json['host'])
+        self.assertEqual({container_uuid: {'CPU %': 10.0}},
+                         response.json['containers'])
+
+    @mock.patch('zun.common.policy.enforce')
+    @patch('zun.objects.ComputeNode.get_by_uuid')
+    def test_get_host_stats_wrong_api_version(self, mock_get_by_uuid,
+                                              mock_policy):
+        mock_policy.return_value = True
+        headers = {"OpenStack-API-Version": "container 1.38"}
+        response = self.get('/v1/hosts/%s/stats' % '12345678',
+                            headers=headers, expect_errors=True)
+        self.assertEqual(406, response.status_int)
+
 
 class TestHostEnforcement(api_base.FunctionalTest):
 
@@ -106,3 +140,8 @@ class TestHostEnforcement(api_base.FunctionalTest):
         self._common_policy_check(
             'host:get', self.get_json, '/hosts/%s' % '12345678',
             expect_errors=True)
+
+    def test_policy_disallow_stats(self):
+        self._common_policy_check(
+            'host:stats', self.get_json, '/hosts/%s/stats' % '12345678',
+            expect_errors=True)
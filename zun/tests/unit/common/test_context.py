@@ -10,6 +10,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+
 from zun.common import context as zun_context
 from zun.tests import base
 
@@ -101,3 +103,18 @@ class ContextTestCase(base.TestCase):
         self.assertIn('admin', admin_ctxt.roles)
         self.assertFalse(ctx.is_admin)
         self.assertNotIn('admin', ctx.roles)
+
+    @mock.patch.object(zun_context.RequestContext, 'can')
+    def test_cached_can(self, mock_can):
+        ctx = self._create_context(is_admin=False)
+        mock_can.return_value = False
+
+        self.assertFalse(ctx.cached_can('fake:action'))
+        self.assertFalse(ctx.cached_can('fake:action'))
+        mock_can.assert_called_once_with('fake:action', fatal=False,
+                                         might_not_exist=False)
+        admin_ctxt = ctx.elevated()
+        mock_can.return_value = True
+        self.assertTrue(admin_ctxt.cached_can('fake:action'))
+        self.assertFalse(ctx.cached_can('fake:action'))
+        self.assertEqual(2, mock_can.call_count)
@@ -0,0 +1,82 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from zun.common import numa
+from zun import objects
+from zun.tests import base
+
+
+def _numa_topology(*nodes):
+    return objects.NUMATopology(nodes=[
+        objects.NUMANode(id=i, cpuset=set(range(i * 8, i * 8 + 8)),
+                         pinned_cpus=set(range(i * 8, i * 8 + 8 - free_cpu)),
+                         mem_total=1024 * 64, mem_available=mem_available)
+        for i, (free_cpu, mem_available) in enumerate(nodes)])
+
+
+class TestFitContainer(base.BaseTestCase):
+
+    def test_fit_container_best_fit(self):
+        numa_topology = _numa_topology((8, 4096), (3, 4096), (4, 4096))
+        numa_node = numa.fit_container(numa_topology, 3, 1024)
+        self.assertEqual(1, numa_node.id)
+
+    def test_fit_container_memory_breaks_ties(self):
+        numa_topology = _numa_topology((4, 4096), (4, 2048), (4, 1024))
+        numa_node = numa.fit_container(numa_topology, 2, 1536)
+        self.assertEqual(1, numa_node.id)
+
+    def test_fit_container_no_fit(self):
+        numa_topology = _numa_topology((8, 512), (2, 4096))
+        self.assertIsNone(numa.fit_container(numa_topology, 4, 1024))
+
+    def test_fit_container_without_siblings(self):
+        numa_topology = _numa_topology((2, 4096))
+        numa_node = numa.fit_container(numa_topology, 2, 1024)
+        self.assertEqual([], numa.get_cpuset_limits(numa_node)[
+            'cpuset_cpu_siblings'])
+
+
+class TestPickCpus(base.BaseTestCase):
+
+    def test_pick_cpus_fills_partial_cores_first(self):
+        siblings = [set([0, 4]), set([1, 5]), set([2, 6])]
+        self.assertEqual(set([4]), numa.pick_cpus(set([1, 2, 4, 5, 6]),
+                                                  siblings, 1))
+
+    def test_pick_cpus_keeps_threads_on_one_core(self):
+        siblings = [set([0, 4]), set([1, 5]), set([2, 6])]
+        self.assertEqual(set([1, 5]), numa.pick_cpus(set([1, 2, 4, 5, 6]),
+                                                     siblings, 2))
+
+    def test_pick_cpus_spans_cores(self):
+        siblings = [set([0, 4]), set([1, 5]), set([2, 6])]
+        self.assertEqual(set([0, 1, 3, 4, 5]),
+                         numa.pick_cpus(set(range(7)), siblings, 5))
+
+    def test_pick_cpus_without_siblings(self):
+        self.assertEqual(set([1, 2]), numa.pick_cpus(set([3, 1, 2]), [], 2))
+
+
+class TestFragmentation(base.BaseTestCase):
+
+    def test_fragmentation(self):
+        self.assertEqual(0.0, numa.fragmentation(_numa_topology((8, 0),
+                                                                (0, 0))))
+        self.assertEqual(0.5, numa.fragmentation(_numa_topology((4, 0),
+                                                                (4, 0))))
+        self.assertEqual(0.0, numa.fragmentation(_numa_topology((0, 0))))
+
+    def test_fragmentation_after_placement(self):
+        numa_topology = _numa_topology((4, 0), (6, 0))
+        self.assertEqual(
+            0.25, numa.fragmentation(numa_topology, numa_topology.nodes[0], 2))
@@ -14,7 +14,10 @@
 
 import mock
 
+from oslo_utils import uuidutils
+
 from zun.common import consts
+from zun.common import context
 from zun.common import exception
 from zun.compute import api
 from zun.compute import container_actions
@@ -34,6 +37,9 @@ class TestAPI(base.TestCase):
         p = mock.patch('zun.scheduler.client.query.SchedulerClient')
         p.start()
         self.addCleanup(p.stop)
+        p = mock.patch('zun.compute.api._SCHEDULER_CLIENT', None)
+        p.start()
+        self.addCleanup(p.stop)
 
         self.compute_api = api.API(self.context)
         self.container = objects.Container(
@@ -100,6 +106,76 @@ class TestAPI(base.TestCase):
         self.assertTrue(mock_save.called)
         self.assertEqual(consts.ERROR, container.status)
 
+    def _get_containers(self, count):
+        containers = []
+        for i in range(count):
+            container = objects.Container(
+                self.context, **utils.get_test_container(
+                    uuid=uuidutils.generate_uuid(), name='test-%d' % i))
+            container.status = consts.CREATING
+            containers.append(container)
+        return containers
+
+    @mock.patch('zun.compute.api.API._record_action_start')
+    @mock.patch('zun.compute.rpcapi.API.container_create')
+    @mock.patch('zun.compute.rpcapi.API.image_search')
+    def test_container_create_batch(self, mock_image_search,
+                                    mock_container_create,
+                                    mock_record_action_start):
+        CONF.set_override('enable_image_validation', True, group="api")
+        containers = self._get_containers(3)
+        select_destinations = \
+            self.compute_api.scheduler_client.select_destinations
+        select_destinations.return_value = [
+            {'host': u'host1', 'nodename': None, 'limits': {}},
+            {'host': u'host2', 'nodename': None, 'limits': {}},
+            {'host': u'host1', 'nodename': None, 'limits': {}}]
+        mock_image_search.return_value = [mock.MagicMock()]
+        requested_volumes = {
+            containers[0].uuid: [mock.sentinel.volmap0],
+            containers[1].uuid: [mock.sentinel.volmap1],
+            containers[2].uuid: [mock.sentinel.volmap2]}
+
+        self.compute_api.container_create_batch(
+            self.context, containers, {}, None, requested_volumes, False)
+
+        select_destinations.assert_called_once_with(
+            self.context, containers, {})
+        # The image is validated once on each host
+        self.assertEqual(2, mock_image_search.call_count)
+        self.assertEqual(
+            set([u'host1', u'host2']),
+            set(call[0][-1] for call in mock_image_search.call_args_list))
+        # Each container is only sent its own volumes
+        mock_container_create.assert_has_calls([
+            mock.call(self.context, u'host1', containers[0], {}, None,
+                      {containers[0].uuid: [mock.sentinel.volmap0]},
+                      False, None),
+            mock.call(self.context, u'host2', containers[1], {}, None,
+                      {containers[1].uuid: [mock.sentinel.volmap1]},
+                      False, None),
+            mock.call(self.context, u'host1', containers[2], {}, None,
+                      {containers[2].uuid: [mock.sentinel.volmap2]},
+                      False, None)])
+
+    @mock.patch('zun.compute.rpcapi.API.container_create')
+    @mock.patch.object(objects.Container, 'save')
+    def test_container_create_batch_no_valid_host(self, mock_save,
+                                                  mock_container_create):
+        containers = self._get_containers(2)
+        select_destinations = \
+            self.compute_api.scheduler_client.select_destinations
+        select_destinations.side_effect = exception.NoValidHost(
+            reason='not enough host')
+
+        self.compute_api.container_create_batch(
+            self.context, containers, {}, None, {}, False)
+
+        self.assertEqual(2, mock_save.call_count)
+        self.assertEqual([consts.ERROR] * 2,
+                         [container.status for container in containers])
+        self.assertFalse(mock_container_create.called)
+
     @mock.patch('zun.compute.rpcapi.API._cast')
     @mock.patch.object(objects.ContainerAction, 'action_start')
     @mock.patch('zun.compute.rpcapi.API.image_search')
@@ -395,6 +471,21 @@ class TestAPI(base.TestCase):
             container.host, "container_get_archive",
             container=container, path="/root", encode_data=True)
 
+    @mock.patch('zun.compute.rpcapi.API._call')
+    @mock.patch('zun.api.servicegroup.ServiceGroup.service_is_up')
+    @mock.patch('zun.objects.ZunService.list_by_binary')
+    def test_container_archive_url(self, mock_srv_list,
+                                   mock_srv_up, mock_call):
+        container = self.container
+        srv = objects.ZunService(
+            self.context,
+            **utils.get_test_zun_service(host=container.host))
+        mock_srv_list.return_value = [srv]
+        mock_srv_up.return_value = True
+        self.compute_api.container_archive_url(self.context, container)
+        mock_call.assert_called_once_with(
+            container.host, "container_archive_url", container=container)
+
     @mock.patch('zun.compute.rpcapi.API._cast')
     @mock.patch.object(objects.ContainerAction, 'action_start')
     def test_add_security_group(self, mock_start, mock_cast):
@@ -513,3 +604,14 @@ class TestAPI(base.TestCase):
         network = self.network
         self.compute_api.network_create(self.context, network)
         self.assertTrue(mock_network_create.called)
+
+    def test_api_shares_clients_across_contexts(self):
+        other_context = context.RequestContext(project_id='other_project',
+                                               user_id='other_user')
+        other_api = api.API(other_context)
+        self.assertIs(self.compute_api.scheduler_client,
+                      other_api.scheduler_client)
+        self.assertIs(self.compute_api.rpcapi._client,
+                      other_api.rpcapi._client)
+        self.assertIs(self.context, self.compute_api.rpcapi._context)
+        self.assertIs(other_context, other_api.rpcapi._context)
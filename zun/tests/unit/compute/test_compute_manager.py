@@ -104,6 +104,62 @@ class TestManager(base.TestCase):
         self.compute_manager = manager.Manager()
         self.compute_manager._resource_tracker = FakeResourceTracker()
 
+    @mock.patch.object(manager.Manager, 'restore_running_container')
+    @mock.patch.object(manager.Manager, '_init_container')
+    @mock.patch.object(fake_driver, 'list')
+    @mock.patch.object(objects.Capsule, 'list_by_host')
+    @mock.patch.object(Container, 'list_by_host')
+    def test_init_containers(self, mock_list_by_host,
+                             mock_capsule_list_by_host, mock_list,
+                             mock_init_container, mock_restore):
+        zun.conf.CONF.set_override('resume_container_state', True,
+                                   group='compute')
+        container = Container(self.context, **utils.get_test_container(
+            uuid=uuidutils.generate_uuid()))
+        missing_container = Container(self.context,
+                                      **utils.get_test_container(
+                                          uuid=uuidutils.generate_uuid()))
+        capsule = objects.Capsule(self.context,
+                                  **utils.get_test_container(
+                                      uuid=uuidutils.generate_uuid()))
+        local_container = Container(self.context, **utils.get_test_container(
+            uuid=container.uuid, status=consts.STOPPED))
+        mock_list_by_host.return_value = [container, missing_container]
+        mock_capsule_list_by_host.return_value = [capsule]
+        mock_list.return_value = ([local_container], [])
+
+        self.compute_manager.init_containers(self.context)
+
+        mock_list_by_host.assert_called_once_with(self.context,
+                                                  self.compute_manager.host)
+        mock_capsule_list_by_host.assert_called_once_with(
+            self.context, self.compute_manager.host)
+        mock_init_container.assert_has_calls([
+            mock.call(self.context, container),
+            mock.call(self.context, missing_container),
+            mock.call(self.context, capsule)], any_order=True)
+        mock_restore.assert_called_once_with(self.context, container,
+                                             consts.STOPPED)
+
+    @mock.patch.object(manager.Manager, '_init_container')
+    @mock.patch.object(fake_driver, 'list')
+    @mock.patch.object(objects.Capsule, 'list_by_host')
+    @mock.patch.object(Container, 'list_by_host')
+    def test_init_containers_failure(self, mock_list_by_host,
+                                     mock_capsule_list_by_host, mock_list,
+                                     mock_init_container):
+        container1 = Container(self.context, **utils.get_test_container(
+            uuid=uuidutils.generate_uuid()))
+        container2 = Container(self.context, **utils.get_test_container(
+            uuid=uuidutils.generate_uuid()))
+        mock_list_by_host.return_value = [container1, container2]
+        mock_capsule_list_by_host.return_value = []
+        mock_list.return_value = ([], [])
+        mock_init_container.side_effect = [exception.ZunException(), None]
+
+        self.compute_manager.init_containers(self.context)
+        self.assertEqual(2, mock_init_container.call_count)
+
     @mock.patch.object(Container, 'save')
     def test_init_container_sets_creating_error(self, mock_save):
         container = Container(self.context, **utils.get_test_container())
@@ -188,6 +244,17 @@ class TestManager(base.TestCase):
         mock_container_delete.assert_called_once_with(self.context, container,
                                                       force=True)
 
+    @mock.patch.object(Container, 'save')
+    def test_init_container_discards_queued_task(self, mock_save):
+        container = Container(self.context, **utils.get_test_container(
+            status=consts.RUNNING, status_reason=None))
+        container.task_state = consts.CONTAINER_QUEUED
+        self.compute_manager._init_container(self.context, container)
+        self.assertIsNone(container.task_state)
+        self.assertEqual(consts.RUNNING, container.status)
+        self.assertIn('discarded', container.status_reason)
+        mock_save.assert_called_once_with()
+
     @mock.patch.object(Container, 'save')
     def test_fail_container(self, mock_save):
         container = Container(self.context, **utils.get_test_container())
@@ -729,6 +796,29 @@ class TestManager(base.TestCase):
         mock_remove_usage.assert_called_once_with(self.context, container,
                                                   True)
 
+    @mock.patch.object(manager.Manager, '_do_container_delete')
+    @mock.patch.object(Container, 'save')
+    def test_container_delete_queued(self, mock_save, mock_delete):
+        container = Container(self.context, **utils.get_test_container(
+            task_state=None))
+        workers = []
+        task_states = []
+        mock_save.side_effect = lambda *args: task_states.append(
+            container.task_state)
+        with mock.patch('zun.common.utils.spawn_n',
+                        side_effect=workers.append):
+            with mock.patch.object(self.compute_manager._executor,
+                                   'is_full', return_value=True):
+                self.compute_manager.container_delete(self.context,
+                                                      container)
+        self.assertEqual(consts.CONTAINER_QUEUED, container.task_state)
+        self.assertFalse(mock_delete.called)
+
+        workers.pop()()
+        mock_delete.assert_called_once_with(self.context, container, False)
+        self.assertIsNone(container.task_state)
+        self.assertEqual([consts.CONTAINER_QUEUED, None], task_states)
+
     @mock.patch.object(FakeResourceTracker,
                        'remove_usage_from_container')
     @mock.patch.object(Container, 'destroy')
@@ -781,6 +871,25 @@ class TestManager(base.TestCase):
         self.compute_manager.container_show(self.context, container)
         mock_show.assert_called_once_with(self.context, container)
 
+    @mock.patch.object(fake_driver, 'list_stats')
+    @mock.patch.object(Container, 'list')
+    def test_host_container_stats(self, mock_list, mock_list_stats):
+        container = Container(self.context, **utils.get_test_container())
+        no_id_container = Container(self.context, **utils.get_test_container(
+            uuid=uuidutils.generate_uuid(), container_id=None))
+        mock_list.return_value = [container, no_id_container]
+        mock_list_stats.return_value = {container.uuid: {'CPU %': 10.0}}
+
+        stats = self.compute_manager.host_container_stats(
+            self.context, project_id='fake_project')
+
+        self.assertEqual({container.uuid: {'CPU %': 10.0}}, stats)
+        mock_list.assert_called_once_with(
+            self.context, filters={'host': self.compute_manager.host,
+                                   'status': [consts.RUNNING],
+                                   'project_id': 'fake_project'})
+        mock_list_stats.assert_called_once_with(self.context, [container])
+
     @mock.patch.object(fake_driver, 'show')
     def test_container_show_failed(self, mock_show):
         container = Container(self.context, **utils.get_test_container())
@@ -1188,6 +1297,23 @@ class TestManager(base.TestCase):
                           self.compute_manager.container_attach,
                           self.context, container)
 
+    @mock.patch.object(fake_driver, 'get_archive_url')
+    def test_container_archive_url(self, mock_get_archive_url):
+        container = Container(self.context, **utils.get_test_container())
+        mock_get_archive_url.return_value = "tcp://test:2375"
+        url = self.compute_manager.container_archive_url(self.context,
+                                                         container)
+        self.assertEqual("tcp://test:2375", url)
+        mock_get_archive_url.assert_called_once_with(self.context, container)
+
+    @mock.patch.object(fake_driver, 'get_archive_url')
+    def test_container_archive_url_failed(self, mock_get_archive_url):
+        container = Container(self.context, **utils.get_test_container())
+        mock_get_archive_url.side_effect = Exception
+        self.assertRaises(exception.ZunException,
+                          self.compute_manager.container_archive_url,
+                          self.context, container)
+
     @mock.patch.object(fake_driver, 'resize')
     def test_container_resize(self, mock_resize):
         container = Container(self.context, **utils.get_test_container())
@@ -1367,6 +1493,24 @@ class TestManager(base.TestCase):
         self.assertIsNotNone(mock_event_finish.call_args[1]['exc_val'])
         self.assertIsNotNone(mock_event_finish.call_args[1]['exc_tb'])
 
+    @mock.patch.object(fake_driver, 'delete_image')
+    @mock.patch.object(fake_driver, 'delete_committed_image')
+    @mock.patch.object(fake_driver, 'upload_image_data')
+    def test_container_image_upload_failed(self, mock_upload_image_data,
+                                           mock_delete_committed_image,
+                                           mock_delete_image):
+        snapshot_image = mock.MagicMock()
+        image_data = mock.MagicMock()
+        mock_upload_image_data.side_effect = exception.ZunException
+        self.assertRaises(exception.ZunException,
+                          self.compute_manager._do_container_image_upload,
+                          self.context, snapshot_image, 'image-id',
+                          image_data, 'tag')
+        image_data.close.assert_called_once_with()
+        self.assertTrue(mock_delete_committed_image.called)
+        mock_delete_image.assert_called_once_with(self.context, 'image-id',
+                                                  'docker')
+
     @mock.patch.object(ContainerActionEvent, 'event_start')
     @mock.patch.object(ContainerActionEvent, 'event_finish')
     @mock.patch.object(Container, 'save')
@@ -1450,3 +1594,58 @@ class TestManager(base.TestCase):
         network = ZunNetwork(self.context, **utils.get_test_network())
         self.compute_manager.network_delete(self.context, network)
         mock_delete.assert_any_call(self.context, network)
+
+    @mock.patch.object(fake_driver, 'update_containers_states')
+    @mock.patch.object(objects.Capsule, 'list_by_host')
+    @mock.patch.object(Container, 'list_by_host')
+    def test_sync_container_state(self, mock_list_by_host,
+                                  mock_capsule_list_by_host, mock_update):
+        container = Container(self.context, **utils.get_test_container())
+        capsule = objects.Capsule(self.context, **utils.get_test_container())
+        mock_list_by_host.return_value = [container]
+        mock_capsule_list_by_host.return_value = [capsule]
+        self.compute_manager.sync_container_state(self.context)
+        mock_list_by_host.assert_called_once_with(
+            self.context, self.compute_manager.host)
+        mock_capsule_list_by_host.assert_called_once_with(
+            self.context, self.compute_manager.host)
+        mock_update.assert_has_calls([
+            mock.call(self.context, [container], self.compute_manager),
+            mock.call(self.context, [capsule], self.compute_manager)])
+
+    @mock.patch.object(fake_driver, 'update_containers_states')
+    @mock.patch.object(objects.Capsule, 'list_by_host')
+    @mock.patch.object(Container, 'list_by_host')
+    def test_sync_container_state_watching_events(
+            self, mock_list_by_host, mock_capsule_list_by_host, mock_update):
+        mock_list_by_host.return_value = []
+        mock_capsule_list_by_host.return_value = []
+        self.compute_manager._watching_container_events = True
+        self.compute_manager.sync_container_state(self.context)
+        self.assertEqual(2, mock_update.call_count)
+        # the full sync is skipped until the reconcile interval has passed
+        self.compute_manager.sync_container_state(self.context)
+        self.assertEqual(2, mock_update.call_count)
+        self.compute_manager._last_container_state_sync = None
+        self.compute_manager.sync_container_state(self.context)
+        self.assertEqual(4, mock_update.call_count)
+
+    @mock.patch('zun.common.utils.spawn_n')
+    def test_watch_container_events(self, mock_spawn_n):
+        self.compute_manager.watch_container_events(self.context)
+        mock_spawn_n.assert_called_once_with(
+            self.compute_manager._watch_container_events, self.context)
+
+    @mock.patch('zun.common.utils.spawn_n')
+    def test_watch_container_events_disabled(self, mock_spawn_n):
+        zun.conf.CONF.set_override('watch_container_events', False,
+                                   group='compute')
+        self.compute_manager.watch_container_events(self.context)
+        mock_spawn_n.assert_not_called()
+
+    @mock.patch.object(fake_driver, 'watch_container_events')
+    def test_watch_container_events_not_supported(self, mock_watch):
+        mock_watch.side_effect = NotImplementedError
+        self.compute_manager._watch_container_events(self.context)
+        mock_watch.assert_called_once_with(self.context, self.compute_manager)
+        self.assertFalse(self.compute_manager._watching_container_events)
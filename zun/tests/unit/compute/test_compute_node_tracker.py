@@ -13,6 +13,7 @@
 #    under the License.
 
 import mock
+from oslo_utils import timeutils
 
 from zun.compute import claims
 from zun.compute import compute_node_tracker
@@ -73,3 +74,70 @@ class TestNodeStracker(base.TestCase):
         self.assertTrue(mock_claim.called)
         self.assertTrue(mock_container_update.called)
         self.assertTrue(mock_update.called)
+
+    def _get_node(self):
+        node = objects.ComputeNode(self.context)
+        node.hostname = 'testhost'
+        node.mem_total = 4096
+        node.mem_used = 0
+        node.mem_free = 4096
+        node.cpu_used = 0.0
+        node.disk_used = 0
+        node.running_containers = 0
+        node.labels = {}
+        node.numa_topology = objects.NUMATopology(nodes=[
+            objects.NUMANode(id=0, cpuset=set([0, 1]), pinned_cpus=set(),
+                             mem_total=4096, mem_available=4096)])
+        return node
+
+    @mock.patch.object(compute_node_tracker.LOG, 'warning')
+    @mock.patch.object(objects.Capsule, 'list_by_host')
+    @mock.patch.object(objects.Container, 'list_by_host')
+    @mock.patch.object(compute_node_tracker.ComputeNodeTracker, 'disabled')
+    @mock.patch.object(compute_node_tracker.ComputeNodeTracker, '_update')
+    def test_update_available_resource(self, mock_update, mock_disabled,
+                                       mock_container_list,
+                                       mock_capsule_list, mock_warning):
+        self.addCleanup(timeutils.clear_time_override)
+        timeutils.set_time_override()
+        self.config(resource_audit_interval=600, group='compute')
+        mock_disabled.return_value = False
+        mock_container_list.return_value = [obj_utils.get_test_container(
+            self.context, cpu=1.0, memory='1024', disk=10,
+            cpuset=objects.container.Cpuset._from_dict(None))]
+        mock_capsule_list.return_value = []
+        tracker = self._resource_tracker
+
+        # the first run audits the usage
+        node = self._get_node()
+        tracker._update_available_resource(
+            self.context, node, {'mem_used': 100, 'labels': {'a': 'b'}})
+        self.assertIs(node, tracker.compute_node)
+        self.assertEqual(1024, node.mem_used)
+        self.assertEqual(1.0, node.cpu_used)
+        self.assertEqual(10, node.disk_used)
+        self.assertEqual({'a': 'b'}, node.labels)
+        self.assertEqual(1, mock_container_list.call_count)
+
+        # the next runs only refresh the resources reported by the driver
+        timeutils.advance_time_seconds(60)
+        tracker._update_available_resource(
+            self.context, self._get_node(),
+            {'mem_used': 200, 'labels': {'c': 'd'}})
+        self.assertIs(node, tracker.compute_node)
+        self.assertEqual(1024, node.mem_used)
+        self.assertEqual({'c': 'd'}, node.labels)
+        self.assertEqual(1, mock_container_list.call_count)
+        self.assertEqual(2, mock_update.call_count)
+
+        # the usage drifted, e.g. a claim was lost
+        node.mem_used = 0
+        timeutils.advance_time_seconds(600)
+        new_node = self._get_node()
+        tracker._update_available_resource(self.context, new_node, {})
+        self.assertIs(new_node, tracker.compute_node)
+        self.assertEqual(1024, new_node.mem_used)
+        self.assertEqual(2, mock_container_list.call_count)
+        self.assertEqual(1, mock_warning.call_count)
+        drift = mock_warning.call_args[0][1]['drift']
+        self.assertEqual({'mem_used': {'tracked': 0, 'actual': 1024}}, drift)
@@ -41,3 +41,10 @@ class TestAPI(base.TestCase):
         self.assertRaises(exception.ContainerHostNotUp,
                           self.compute_rpcapi.container_delete,
                           self.context, test_container_obj, False)
+
+    @mock.patch('zun.common.rpc_service.API._call')
+    def test_host_container_stats(self, mock_rpc_call):
+        self.compute_rpcapi.host_container_stats(
+            self.context, 'fake_host', project_id='fake_project')
+        mock_rpc_call.assert_called_once_with(
+            'fake_host', 'host_container_stats', project_id='fake_project')
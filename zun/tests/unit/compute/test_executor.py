@@ -0,0 +1,87 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from zun.common import exception
+from zun.compute import executor
+from zun.tests import base
+
+
+class TestTaskExecutor(base.TestCase):
+
+    def setUp(self):
+        super(TestTaskExecutor, self).setUp()
+        self.executor = executor.TaskExecutor(
+            limits={executor.CREATE: 2, executor.DELETE: 1})
+        # Collect the spawned workers instead of running them right away
+        # so that the tests control when tasks run.
+        self.workers = []
+        patcher = mock.patch('zun.common.utils.spawn_n',
+                             side_effect=self.workers.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_submit_within_limit(self):
+        func = mock.Mock()
+        self.executor.submit(executor.CREATE, func, 'arg', kwarg='kwarg')
+        self.assertFalse(self.executor.is_full(executor.CREATE))
+        self.assertEqual(1, len(self.workers))
+
+        self.workers.pop()()
+        func.assert_called_once_with('arg', kwarg='kwarg')
+        stats = self.executor.stats()[executor.CREATE]
+        self.assertEqual(0, stats['running'])
+        self.assertEqual(0, stats['queued'])
+        self.assertEqual(1, stats['submitted'])
+
+    def test_submit_queues_tasks_in_order(self):
+        calls = []
+        for i in range(4):
+            self.executor.submit(executor.CREATE, calls.append, i)
+        self.assertTrue(self.executor.is_full(executor.CREATE))
+        self.assertEqual(2, len(self.workers))
+        stats = self.executor.stats()[executor.CREATE]
+        self.assertEqual(2, stats['running'])
+        self.assertEqual(4, stats['queued'])
+
+        # a worker keeps processing queued tasks until the queue is empty
+        self.workers.pop()()
+        self.assertEqual([0, 1, 2, 3], calls)
+        self.workers.pop()()
+        stats = self.executor.stats()[executor.CREATE]
+        self.assertEqual(0, stats['running'])
+        self.assertEqual(0, stats['queued'])
+
+    def test_limits_are_per_task_class(self):
+        self.executor.submit(executor.DELETE, mock.Mock())
+        self.assertTrue(self.executor.is_full(executor.DELETE))
+        self.assertFalse(self.executor.is_full(executor.CREATE))
+        self.executor.submit(executor.CREATE, mock.Mock())
+        self.assertEqual(2, len(self.workers))
+
+    def test_failed_task_hands_over_queue(self):
+        calls = []
+        self.executor.submit(executor.DELETE,
+                             mock.Mock(side_effect=ValueError()))
+        self.executor.submit(executor.DELETE, calls.append, 'next')
+        self.assertEqual(1, len(self.workers))
+
+        self.assertRaises(ValueError, self.workers.pop())
+        self.assertEqual(1, len(self.workers))
+        self.workers.pop()()
+        self.assertEqual(['next'], calls)
+        self.assertEqual(0, self.executor.stats()[executor.DELETE]['running'])
+
+    def test_unknown_task_class(self):
+        self.assertRaises(exception.ZunException,
+                          self.executor.submit, executor.COMMIT, mock.Mock())
@@ -41,7 +41,8 @@ _numa_node = {
     'cpuset': [8],
     'mem_available': 32768,
     'mem_total': 32768,
-    'pinned_cpus': []
+    'pinned_cpus': [],
+    'siblings': []
 }
 
 _numa_topo_spec = [_numa_node]
@@ -69,10 +70,11 @@ class TestDockerDriver(base.DriverTestCase):
         self.driver.inspect_image(mock_image)
         self.mock_docker.inspect_image.assert_called_once_with(mock_image)
 
-    def test_get_image(self):
-        self.mock_docker.get_image = mock.Mock()
-        self.driver.get_image(name='image_name')
-        self.mock_docker.get_image.assert_called_once_with('image_name')
+    @mock.patch.object(docker_utils, 'get_image_stream')
+    def test_get_image(self, mock_get_image_stream):
+        image = self.driver.get_image(name='image_name')
+        mock_get_image_stream.assert_called_once_with('image_name')
+        self.assertEqual(mock_get_image_stream.return_value, image)
 
     @mock.patch('zun.image.glance.driver.GlanceDriver.delete_image_tar')
     def test_delete_image(self, mock_delete_image):
@@ -482,8 +484,8 @@ class TestDockerDriver(base.DriverTestCase):
         self.assertIn(mock_container_2, local_containers)
         self.assertIn(mock_container_3, local_containers)
 
-    @mock.patch('zun.objects.container.Container.save')
-    def test_update_containers_states(self, mock_save):
+    @mock.patch('zun.objects.container.Container.bulk_save')
+    def test_update_containers_states(self, mock_bulk_save):
         mock_container = obj_utils.get_test_container(
             self.context, status='Running', host='host1')
         mock_container_2 = obj_utils.get_test_container(
@@ -497,6 +499,145 @@ class TestDockerDriver(base.DriverTestCase):
                 self.context, [mock_container], mock.Mock())
             self.assertEqual(mock_container.host, 'host2')
             self.assertEqual(mock_container.status, 'Stopped')
+            mock_bulk_save.assert_called_once_with(
+                self.context, [mock_container])
+
+    @mock.patch('zun.objects.container.Container.bulk_save')
+    def test_update_containers_states_unchanged(self, mock_bulk_save):
+        mock_container = obj_utils.get_test_container(
+            self.context, status='Running', host='host1')
+        mock_container.obj_reset_changes()
+        mock_container_2 = obj_utils.get_test_container(
+            self.context, status='Running')
+        conf.CONF.set_override('host', 'host1')
+        with mock.patch.object(self.driver, 'list') as mock_list:
+            mock_list.return_value = ([mock_container_2], [])
+            self.driver.update_containers_states(
+                self.context, [mock_container], mock.Mock())
+            self.assertFalse(mock_bulk_save.called)
+
+    def _get_container_event(self, container, action):
+        return {'Type': 'container',
+                'Action': action,
+                'Actor': {'ID': container.container_id,
+                          'Attributes': {
+                              'name': consts.NAME_PREFIX + container.uuid}}}
+
+    @mock.patch('zun.objects.container.Container.save')
+    @mock.patch('zun.objects.container.Container.get_container_any_type')
+    def test_handle_container_event(self, mock_get, mock_save):
+        container = obj_utils.get_test_container(
+            self.context, status=consts.RUNNING, task_state=None)
+        mock_get.return_value = container
+        self.driver._handle_container_event(
+            self.context, self._get_container_event(container, 'die'))
+        mock_get.assert_called_once_with(self.context, container.uuid)
+        self.assertEqual(consts.STOPPED, container.status)
+        mock_save.assert_called_once_with(self.context)
+
+    @mock.patch('zun.objects.container.Container.save')
+    @mock.patch('zun.objects.container.Container.get_container_any_type')
+    def test_handle_container_event_oom(self, mock_get, mock_save):
+        container = obj_utils.get_test_container(
+            self.context, status=consts.RUNNING, task_state=None)
+        mock_get.return_value = container
+        self.driver._handle_container_event(
+            self.context, self._get_container_event(container, 'oom'))
+        self.driver._handle_container_event(
+            self.context, self._get_container_event(container, 'die'))
+        self.assertEqual(consts.STOPPED, container.status)
+        self.assertEqual('Container ran out of memory',
+                         container.status_reason)
+
+    @mock.patch('zun.objects.container.Container.save')
+    @mock.patch('zun.objects.container.Container.get_container_any_type')
+    def test_handle_container_event_destroy(self, mock_get, mock_save):
+        container = obj_utils.get_test_container(
+            self.context, status=consts.STOPPED, task_state=None,
+            auto_remove=True)
+        mock_get.return_value = container
+        self.driver._handle_container_event(
+            self.context, self._get_container_event(container, 'destroy'))
+        self.assertEqual(consts.DELETED, container.status)
+        mock_save.assert_called_once_with(self.context)
+
+    @mock.patch('zun.objects.container.Container.save')
+    @mock.patch('zun.objects.container.Container.get_container_any_type')
+    def test_handle_container_event_with_task_state(self, mock_get,
+                                                    mock_save):
+        container = obj_utils.get_test_container(
+            self.context, status=consts.RUNNING,
+            task_state=consts.CONTAINER_STOPPING)
+        mock_get.return_value = container
+        self.driver._handle_container_event(
+            self.context, self._get_container_event(container, 'die'))
+        self.assertEqual(consts.RUNNING, container.status)
+        mock_save.assert_not_called()
+
+    @mock.patch('zun.objects.container.Container.get_container_any_type')
+    def test_handle_container_event_not_zun_container(self, mock_get):
+        event = {'Type': 'container',
+                 'Action': 'die',
+                 'Actor': {'ID': 'fake-id',
+                           'Attributes': {'name': 'fake-name'}}}
+        self.driver._handle_container_event(self.context, event)
+        mock_get.assert_not_called()
+
+    @mock.patch.object(DockerDriver, '_handle_container_event')
+    def test_watch_container_events(self, mock_handle):
+        container_event = {'Type': 'container', 'Action': 'start'}
+        network_event = {'Type': 'network', 'Action': 'connect'}
+        self.mock_docker.events.return_value = iter([container_event,
+                                                     network_event])
+        self.driver.watch_container_events(self.context, mock.Mock())
+        self.mock_docker.events.assert_called_once_with(
+            decode=True, filters={'type': ['container', 'network']})
+        mock_handle.assert_called_once_with(self.context, container_event)
+        self.assertFalse(self.driver._watching_events)
+
+    def test_show_cached(self):
+        self.driver._watching_events = True
+        self.mock_docker.inspect_container = mock.Mock(
+            return_value={'State': 'running'})
+        mock_container = mock.MagicMock()
+        self.driver.show(self.context, mock_container)
+        self.driver.show(self.context, mock_container)
+        self.mock_docker.inspect_container.assert_called_once_with(
+            mock_container.container_id)
+
+        # a docker event about the container invalidates the cached result
+        self.driver._invalidate_inspect_cache(
+            {'Type': 'container', 'Action': 'die',
+             'Actor': {'ID': mock_container.container_id}})
+        self.driver.show(self.context, mock_container)
+        self.assertEqual(2, self.mock_docker.inspect_container.call_count)
+
+        # so does a network event that involves the container
+        self.driver._invalidate_inspect_cache(
+            {'Type': 'network', 'Action': 'disconnect',
+             'Actor': {'ID': 'network-id', 'Attributes': {
+                 'container': mock_container.container_id}}})
+        self.driver.show(self.context, mock_container)
+        self.assertEqual(3, self.mock_docker.inspect_container.call_count)
+
+    @mock.patch('oslo_utils.timeutils.is_older_than', return_value=True)
+    def test_show_cache_expired(self, mock_is_older_than):
+        self.driver._watching_events = True
+        self.mock_docker.inspect_container = mock.Mock(
+            return_value={'State': 'running'})
+        mock_container = mock.MagicMock()
+        self.driver.show(self.context, mock_container)
+        self.driver.show(self.context, mock_container)
+        self.assertEqual(2, self.mock_docker.inspect_container.call_count)
+
+    def test_show_not_cached_without_events(self):
+        self.mock_docker.inspect_container = mock.Mock(
+            return_value={'State': 'running'})
+        mock_container = mock.MagicMock()
+        self.driver.show(self.context, mock_container)
+        self.driver.show(self.context, mock_container)
+        self.assertEqual(2, self.mock_docker.inspect_container.call_count)
+        self.assertEqual({}, self.driver._inspect_cache)
 
     def test_heal_with_rebuilding_container(self):
         mock_compute_manager = mock.Mock()
@@ -739,6 +880,14 @@ class TestDockerDriver(base.DriverTestCase):
         self.mock_docker.resize.assert_called_once_with(
             mock_container.container_id, 100, 100)
 
+    def test_get_archive_url(self):
+        self.config(docker_remote_api_url='tcp://fake-host:2375',
+                    group='docker')
+        mock_container = mock.MagicMock()
+        self.assertEqual('tcp://fake-host:2375',
+                         self.driver.get_archive_url(self.context,
+                                                     mock_container))
+
     def test_commit(self):
         self.mock_docker.commit = mock.Mock()
         mock_container = mock.MagicMock()
@@ -786,8 +935,13 @@ class TestDockerDriver(base.DriverTestCase):
         mock_container = mock.MagicMock()
         self.mock_docker.stats.return_value = {
             'cpu_stats': {'cpu_usage': {'usage_in_usermode': 1000000000,
-                                        'total_usage': 1000000000},
-                          'system_cpu_usage': 1000000000000},
+                                        'total_usage': 1500000000},
+                          'system_cpu_usage': 1004000000000,
+                          'online_cpus': 2},
+            'precpu_stats': {'cpu_usage': {'usage_in_usermode': 500000000,
+                                           'total_usage': 500000000},
+                             'system_cpu_usage': 1000000000000,
+                             'online_cpus': 2},
             'blkio_stats': {'io_service_bytes_recursive':
                             [{'major': 253, 'value': 10000000,
                               'minor': 4, 'op': 'Read'},
@@ -806,13 +960,47 @@ class TestDockerDriver(base.DriverTestCase):
                              'tx_errors': 0, 'rx_errors': 0, 'tx_bytes': 200,
                              'rx_dropped': 0, 'tx_packets': 2}}}
         stats_info = self.driver.stats(self.context, mock_container)
-        self.assertEqual(0.1, stats_info['CPU %'])
+        # 1 second of CPU time in 2 seconds
+        self.assertEqual(50.0, stats_info['CPU %'])
         self.assertEqual(100, stats_info['MEM USAGE(MiB)'])
         self.assertEqual(1000, stats_info['MEM LIMIT(MiB)'])
         self.assertEqual(10, stats_info['MEM %'])
         self.assertEqual('10000000/0', stats_info['BLOCK I/O(B)'])
         self.assertEqual('200/200', stats_info['NET I/O(B)'])
 
+    def test_list_stats(self):
+        container1 = obj_utils.get_test_container(
+            self.context, uuid=uuidutils.generate_uuid())
+        container2 = obj_utils.get_test_container(
+            self.context, uuid=uuidutils.generate_uuid())
+        with mock.patch.object(self.driver, 'stats') as mock_stats:
+            mock_stats.side_effect = [{'CPU %': 10.0},
+                                      exception.DockerError()]
+            stats = self.driver.list_stats(self.context,
+                                           [container1, container2])
+        self.assertEqual({container1.uuid: {'CPU %': 10.0}}, stats)
+        self.assertEqual(2, mock_stats.call_count)
+
+    def test_stats_from_collector(self):
+        self.mock_docker.stats = mock.Mock()
+        mock_container = mock.MagicMock()
+        with mock.patch.object(self.driver._stats_collector, 'get_stats',
+                               return_value={'cpu_percent': 50.0,
+                                             'mem_usage': 104857600,
+                                             'mem_limit': 1048576000,
+                                             'io_read': 1024,
+                                             'io_write': 500,
+                                             'net_rx': 2000,
+                                             'net_tx': 3000}):
+            stats_info = self.driver.stats(self.context, mock_container)
+        self.assertFalse(self.mock_docker.stats.called)
+        self.assertEqual(50.0, stats_info['CPU %'])
+        self.assertEqual(100, stats_info['MEM USAGE(MiB)'])
+        self.assertEqual(1000, stats_info['MEM LIMIT(MiB)'])
+        self.assertEqual(10, stats_info['MEM %'])
+        self.assertEqual('1024/500', stats_info['BLOCK I/O(B)'])
+        self.assertEqual('2000/3000', stats_info['NET I/O(B)'])
+
     @mock.patch('zun.network.kuryr_network.KuryrNetwork'
                 '.disconnect_container_from_network')
     def test_network_detach(self, mock_detach):
@@ -0,0 +1,186 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+
+import mock
+
+from zun.container.docker import stats as docker_stats
+from zun.container.docker import utils as docker_utils
+from zun.tests import base
+
+CONTAINER_ID = 'fake-container-id'
+
+NET_DEV = """Inter-|   Receive                            |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes ...
+    lo:     100       1    0    0    0     0          0         0  100 1 0 0 0 0 0 0
+  eth0:    2000      20    0    0    0     0          0         0  3000 30 0 0 0 0 0 0
+"""  # noqa
+
+
+class TestCgroupStatsCollector(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestCgroupStatsCollector, self).setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.cgroup_root = os.path.join(self.root, 'cgroup')
+        self.proc_root = os.path.join(self.root, 'proc')
+        self._write(os.path.join(self.proc_root, 'meminfo'),
+                    'MemTotal:        1024000 kB\nMemFree:  512 kB\n')
+        self._write(os.path.join(self.proc_root, '42', 'net', 'dev'),
+                    NET_DEV)
+
+        dfc_patcher = mock.patch.object(docker_utils, 'docker_client')
+        docker_client = dfc_patcher.start()
+        self.addCleanup(dfc_patcher.stop)
+        self.mock_docker = mock.MagicMock()
+        docker_client.return_value.__enter__.return_value = self.mock_docker
+        self.mock_docker.info.return_value = {'CgroupDriver': 'cgroupfs'}
+
+        self.collector = docker_stats.CgroupStatsCollector(
+            cgroup_root=self.cgroup_root, proc_root=self.proc_root,
+            max_samples=2)
+
+    def _write(self, path, content):
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def _write_cgroup_v1(self, cpu_usage):
+        def path(controller, name):
+            return os.path.join(self.cgroup_root, controller, 'docker',
+                                CONTAINER_ID, name)
+
+        self._write(path('cpuacct', 'cpuacct.usage'), str(cpu_usage))
+        self._write(path('cpuacct', 'cgroup.procs'), '42\n43\n')
+        self._write(path('memory', 'memory.usage_in_bytes'), '104857600')
+        self._write(path('memory', 'memory.limit_in_bytes'),
+                    '9223372036854771712')
+        self._write(path('blkio', 'blkio.throttle.io_service_bytes'),
+                    '8:0 Read 1000\n8:0 Write 500\n8:0 Sync 10\n'
+                    '8:16 Read 24\nTotal 1524\n')
+
+    def _write_cgroup_v2(self, cpu_usage):
+        self._write(os.path.join(self.cgroup_root, 'cgroup.controllers'),
+                    'cpu io memory')
+
+        def path(name):
+            return os.path.join(self.cgroup_root, 'system.slice',
+                                'docker-%s.scope' % CONTAINER_ID, name)
+
+        self._write(path('cpu.stat'),
+                    'usage_usec %d\nuser_usec 10\n' % (cpu_usage / 1000))
+        self._write(path('cgroup.procs'), '42\n')
+        self._write(path('memory.current'), '104857600')
+        self._write(path('memory.max'), '209715200')
+        self._write(path('io.stat'),
+                    '8:0 rbytes=1000 wbytes=500 rios=1 wios=1\n'
+                    '8:16 rbytes=24 wbytes=0 rios=1 wios=0\n')
+
+    def test_read_sample_cgroup_v1(self):
+        self._write_cgroup_v1(cpu_usage=5000)
+        sample = self.collector.read_sample(CONTAINER_ID)
+        self.assertEqual(5000, sample.cpu_usage)
+        self.assertEqual(104857600, sample.mem_usage)
+        # no memory limit, the memory of the host is reported
+        self.assertEqual(1024000 * 1024, sample.mem_limit)
+        self.assertEqual(1024, sample.io_read)
+        self.assertEqual(500, sample.io_write)
+        self.assertEqual(2000, sample.net_rx)
+        self.assertEqual(3000, sample.net_tx)
+
+    def test_read_sample_cgroup_v2(self):
+        self.mock_docker.info.return_value = {'CgroupDriver': 'systemd'}
+        self._write_cgroup_v2(cpu_usage=5000000)
+        sample = self.collector.read_sample(CONTAINER_ID)
+        self.assertEqual(5000000, sample.cpu_usage)
+        self.assertEqual(104857600, sample.mem_usage)
+        self.assertEqual(209715200, sample.mem_limit)
+        self.assertEqual(1024, sample.io_read)
+        self.assertEqual(500, sample.io_write)
+        self.assertEqual(2000, sample.net_rx)
+        self.assertEqual(3000, sample.net_tx)
+
+    @mock.patch('time.time')
+    def test_collect_and_get_stats(self, mock_time):
+        self.mock_docker.containers.return_value = [{'Id': CONTAINER_ID}]
+        self._write_cgroup_v1(cpu_usage=0)
+        mock_time.return_value = 100.0
+        self.collector.collect()
+
+        # half a CPU was used in the last 2 seconds
+        self._write_cgroup_v1(cpu_usage=1000000000)
+        mock_time.return_value = 102.0
+        stats = self.collector.get_stats(CONTAINER_ID)
+        self.assertEqual(50.0, stats['cpu_percent'])
+        self.assertEqual(104857600, stats['mem_usage'])
+        self.assertEqual(1024, stats['io_read'])
+        self.assertEqual(3000, stats['net_tx'])
+
+    @mock.patch('time.time')
+    def test_docker_cpu_percent_agrees_with_collector(self, mock_time):
+        self.mock_docker.containers.return_value = [{'Id': CONTAINER_ID}]
+        self._write_cgroup_v1(cpu_usage=1000000000)
+        mock_time.return_value = 100.0
+        self.collector.collect()
+        # one and a half CPU were used in the last 2 seconds
+        self._write_cgroup_v1(cpu_usage=4000000000)
+        mock_time.return_value = 102.0
+        stats = self.collector.get_stats(CONTAINER_ID)
+
+        # the same usage as seen by docker on a host with 4 CPUs
+        docker_stats_info = {
+            'cpu_stats': {'cpu_usage': {'total_usage': 4000000000},
+                          'system_cpu_usage': 108000000000,
+                          'online_cpus': 4},
+            'precpu_stats': {'cpu_usage': {'total_usage': 1000000000},
+                             'system_cpu_usage': 100000000000}}
+        self.assertEqual(150.0, stats['cpu_percent'])
+        self.assertEqual(stats['cpu_percent'],
+                         docker_stats.docker_cpu_percent(docker_stats_info))
+
+    def test_docker_cpu_percent_without_previous_stats(self):
+        docker_stats_info = {
+            'cpu_stats': {'cpu_usage': {'total_usage': 4000000000,
+                                        'percpu_usage': [1, 2]},
+                          'system_cpu_usage': 108000000000},
+            'precpu_stats': {'cpu_usage': {'total_usage': 0}}}
+        self.assertEqual(0.0,
+                         docker_stats.docker_cpu_percent(docker_stats_info))
+
+    def test_collect_drops_removed_containers(self):
+        self._write_cgroup_v1(cpu_usage=0)
+        self.mock_docker.containers.return_value = [{'Id': CONTAINER_ID}]
+        self.collector.collect()
+        self.collector.collect()
+        self.collector.collect()
+        self.assertEqual(2, len(self.collector._samples[CONTAINER_ID]))
+
+        self.mock_docker.containers.return_value = []
+        self.collector.collect()
+        self.assertEqual({}, self.collector._samples)
+
+    def test_get_stats_not_sampled(self):
+        self._write_cgroup_v1(cpu_usage=0)
+        self.assertIsNone(self.collector.get_stats(CONTAINER_ID))
+
+    def test_get_stats_cgroup_missing(self):
+        self.mock_docker.containers.return_value = [{'Id': CONTAINER_ID}]
+        self._write_cgroup_v1(cpu_usage=0)
+        self.collector.collect()
+        shutil.rmtree(os.path.join(self.cgroup_root, 'cpuacct'))
+        self.assertIsNone(self.collector.get_stats(CONTAINER_ID))
@@ -10,10 +10,13 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from docker import errors
 import mock
-
 from oslo_serialization import jsonutils
+import requests
+import six
 
+from zun.common import exception
 from zun.container.docker import utils as docker_utils
 from zun.tests.unit.container import base
 
@@ -74,3 +77,133 @@ class TestDockerHTTPClient(base.DriverTestCase):
         self.client.read_tar_image(fake_image)
         self.assertEqual('fake_config', fake_image['repo'])
         self.assertEqual('', fake_image['tag'])
+
+
+class TestDockerClientPool(base.DriverTestCase):
+
+    def setUp(self):
+        super(TestDockerClientPool, self).setUp()
+        self.pool = docker_utils.DockerClientPool()
+        self.addCleanup(self._reset_pool)
+        self._reset_pool()
+
+    def _reset_pool(self):
+        self.pool.current_size = 0
+        self.pool.free_items.clear()
+        self.pool._borrowed.clear()
+
+    def _in_use(self):
+        return self.pool.current_size - len(self.pool.free_items)
+
+    def test_pool_is_shared(self):
+        self.assertIs(self.pool, docker_utils.DockerClientPool())
+
+    @mock.patch.object(docker_utils, '_create_client')
+    def test_docker_client_reuses_client(self, mock_create):
+        with docker_utils.docker_client() as client:
+            self.assertEqual(1, self._in_use())
+        with docker_utils.docker_client() as client_2:
+            pass
+        self.assertIs(client, client_2)
+        mock_create.assert_called_once_with()
+        self.assertEqual(0, self._in_use())
+
+    @mock.patch.object(docker_utils, '_create_client')
+    def test_docker_client_nested(self, mock_create):
+        self.addCleanup(setattr, self.pool, 'max_size', self.pool.max_size)
+        self.pool.max_size = 1
+        with docker_utils.docker_client() as client:
+            with docker_utils.docker_client() as client_2:
+                self.assertIs(client, client_2)
+            self.assertEqual(1, self._in_use())
+        mock_create.assert_called_once_with()
+        self.assertEqual(0, self._in_use())
+
+    @mock.patch.object(docker_utils, '_create_client')
+    def test_docker_client_not_pooled(self, mock_create):
+        with docker_utils.docker_client(pooled=False) as client:
+            pass
+        client.close.assert_called_once_with()
+        self.assertEqual(0, self.pool.current_size)
+
+    @mock.patch.object(docker_utils, '_create_client')
+    def test_docker_client_connection_error(self, mock_create):
+        def use_client():
+            with docker_utils.docker_client():
+                raise requests.exceptions.ConnectionError()
+
+        self.assertRaises(requests.exceptions.ConnectionError, use_client)
+        mock_create.return_value.close.assert_called_once_with()
+        self.assertEqual(0, self._in_use())
+
+
+class TestArchiveStream(base.DriverTestCase):
+
+    def setUp(self):
+        super(TestArchiveStream, self).setUp()
+        self.config(archive_chunk_size=4, group='docker')
+
+    @mock.patch.object(docker_utils, '_create_client')
+    def test_get_archive_stream(self, mock_create):
+        client = mock_create.return_value
+        client.get_archive.return_value = (iter([b'tar1', b'tar2']),
+                                           {'name': 'fake'})
+        chunks, stat = docker_utils.get_archive_stream(
+            'tcp://fake-host:2375', 'fake-id', '/fake')
+        self.assertEqual({'name': 'fake'}, stat)
+        mock_create.assert_called_once_with('tcp://fake-host:2375')
+        client.get_archive.assert_called_once_with('fake-id', '/fake',
+                                                   chunk_size=4)
+        self.assertFalse(client.close.called)
+        self.assertEqual([b'tar1', b'tar2'], list(chunks))
+        client.close.assert_called_once_with()
+
+    @mock.patch.object(docker_utils, '_create_client')
+    def test_get_archive_stream_not_found(self, mock_create):
+        client = mock_create.return_value
+        client.get_archive.side_effect = errors.APIError('404 Not Found')
+        self.assertRaises(exception.Invalid,
+                          docker_utils.get_archive_stream,
+                          'tcp://fake-host:2375', 'fake-id', '/fake')
+        client.close.assert_called_once_with()
+
+    @mock.patch.object(docker_utils, '_create_client')
+    def test_get_image_stream(self, mock_create):
+        client = mock_create.return_value
+        client.get_image.return_value = iter([b'img1', b'img2'])
+        chunks = docker_utils.get_image_stream('fake-image')
+        mock_create.assert_called_once_with()
+        client.get_image.assert_called_once_with('fake-image')
+        self.assertFalse(client.close.called)
+        self.assertEqual([b'img1', b'img2'], list(chunks))
+        client.close.assert_called_once_with()
+
+    @mock.patch.object(docker_utils, '_create_client')
+    def test_get_image_stream_error(self, mock_create):
+        client = mock_create.return_value
+        client.get_image.side_effect = errors.APIError('500 Server Error')
+        self.assertRaises(exception.DockerError,
+                          docker_utils.get_image_stream, 'fake-image')
+        client.close.assert_called_once_with()
+
+    @mock.patch.object(docker_utils, '_create_client')
+    def test_put_archive_stream(self, mock_create):
+        client = mock_create.return_value
+        received = []
+        client.put_archive.side_effect = (
+            lambda container_id, path, data: received.extend(data))
+        docker_utils.put_archive_stream(
+            'tcp://fake-host:2375', 'fake-id', '/fake',
+            six.BytesIO(b'0123456789'))
+        self.assertEqual([b'0123', b'4567', b'89'], received)
+        client.close.assert_called_once_with()
+
+    @mock.patch.object(docker_utils, '_create_client')
+    def test_put_archive_stream_error(self, mock_create):
+        client = mock_create.return_value
+        client.put_archive.side_effect = errors.APIError('500 Server Error')
+        self.assertRaises(exception.DockerError,
+                          docker_utils.put_archive_stream,
+                          'tcp://fake-host:2375', 'fake-id', '/fake',
+                          six.BytesIO(b'0123456789'))
+        client.close.assert_called_once_with()
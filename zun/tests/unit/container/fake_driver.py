@@ -102,6 +102,10 @@ class FakeDriver(driver.BaseDriver, driver.ContainerDriver,
     def get_websocket_url(self, context, container):
         pass
 
+    @check_container_id
+    def get_archive_url(self, context, container):
+        pass
+
     @check_container_id
     def resize(self, context, container, height, weight):
         pass
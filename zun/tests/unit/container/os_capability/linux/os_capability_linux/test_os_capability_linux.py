@@ -41,6 +41,18 @@ LSCPU_NO_ONLINE = """# The following is the parsable format, which can be fed to
 1,2
 1,3"""
 
+LSCPU_CORE = """# The following is the parsable format, which can be fed to other
+# programs. Each different item in every column has an unique ID
+# starting from zero.
+# Core,CPU
+0,0
+1,1
+2,2
+3,3
+0,4
+1,5
+2,6"""
+
 
 class TestOSCapability(base.BaseTestCase):
     @mock.patch('zun.common.utils.execute')
@@ -64,6 +76,18 @@ class TestOSCapability(base.BaseTestCase):
         output = os_capability_linux.LinuxHost().get_cpu_numa_info()
         self.assertEqual(expected_output, output)
 
+    @mock.patch('zun.common.utils.execute')
+    def test_get_cpu_siblings(self, mock_output):
+        mock_output.return_value = LSCPU_CORE
+        output = os_capability_linux.LinuxHost().get_cpu_siblings()
+        self.assertEqual([{0, 4}, {1, 5}, {2, 6}], output)
+
+    @mock.patch('zun.common.utils.execute')
+    def test_get_cpu_siblings_exception(self, mock_output):
+        mock_output.side_effect = exception.CommandError()
+        output = os_capability_linux.LinuxHost().get_cpu_siblings()
+        self.assertEqual([], output)
+
     def test_get_host_mem(self):
         data = ('MemTotal:        3882464 kB\nMemFree:         3514608 kB\n'
                 'MemAvailable:    3556372 kB\n')
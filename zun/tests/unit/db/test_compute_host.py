@@ -12,6 +12,8 @@
 
 """Tests for manipulating compute nodes via the DB API"""
 
+import datetime
+
 from oslo_utils import uuidutils
 import six
 
@@ -116,6 +118,25 @@ class DbComputeNodeTestCase(base.DbTestCase):
             filters={'hostname': node1.hostname})
         self.assertEqual([node1.uuid], [r.uuid for r in res])
 
+    def test_list_compute_nodes_updated_since(self):
+        since = datetime.datetime(2020, 1, 1, 12, 0, 0)
+        before = since - datetime.timedelta(minutes=1)
+        after = since + datetime.timedelta(minutes=1)
+        utils.create_test_compute_node(
+            hostname='node-old', uuid=uuidutils.generate_uuid(),
+            created_at=before, updated_at=before, context=self.context)
+        node_updated = utils.create_test_compute_node(
+            hostname='node-updated', uuid=uuidutils.generate_uuid(),
+            created_at=before, updated_at=after, context=self.context)
+        node_created = utils.create_test_compute_node(
+            hostname='node-created', uuid=uuidutils.generate_uuid(),
+            created_at=after, context=self.context)
+
+        res = dbapi.list_compute_nodes(
+            self.context, filters={'updated_since': since})
+        self.assertEqual(sorted([node_updated.uuid, node_created.uuid]),
+                         sorted([r.uuid for r in res]))
+
     def test_destroy_compute_node(self):
         node = utils.create_test_compute_node(context=self.context)
         dbapi.destroy_compute_node(self.context, node.uuid)
@@ -19,6 +19,7 @@ from zun.common import consts
 from zun.common import exception
 import zun.conf
 from zun.db import api as dbapi
+from zun.db.sqlalchemy import api as sqla_api
 from zun.tests.unit.db import base
 from zun.tests.unit.db import utils
 
@@ -220,6 +221,39 @@ class DbContainerTestCase(base.DbTestCase):
                                      {'image': new_image})
         self.assertEqual(new_image, res.image)
 
+    def test_update_container_memory(self):
+        container = utils.create_test_container(context=self.context)
+        self.assertEqual(512, container.memory_mb)
+
+        res = dbapi.update_container(self.context, container.container_type,
+                                     container.id, {'memory': '1024'})
+        self.assertEqual('1024', res.memory)
+        self.assertEqual(1024, res.memory_mb)
+
+    def test_container_name_index(self):
+        engine = sqla_api.get_engine()
+        names = [row[0] for row in engine.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND "
+            "tbl_name = 'container'")]
+        self.assertIn('container_lower_name_idx', names)
+        self.assertNotIn('container_name_idx', names)
+
+    def test_count_usage(self):
+        for i in range(3):
+            utils.create_test_container(
+                uuid=uuidutils.generate_uuid(), name='container%d' % i,
+                context=self.context, memory=str(256 * (i + 1)))
+        utils.create_test_container(
+            uuid=uuidutils.generate_uuid(), name='other', memory='4096',
+            project_id='other_project', context=self.context)
+
+        usage = dbapi.count_usage(self.context, consts.TYPE_CONTAINER,
+                                  self.context.project_id, 'memory')
+        self.assertEqual(1536, usage[0])
+        usage = dbapi.count_usage(self.context, consts.TYPE_CONTAINER,
+                                  self.context.project_id, 'containers')
+        self.assertEqual(3, usage[0])
+
     def test_update_container_with_the_same_name(self):
         CONF.set_override("unique_container_name_scope", "project",
                           group="compute")
@@ -248,6 +282,44 @@ class DbContainerTestCase(base.DbTestCase):
                           consts.TYPE_CONTAINER,
                           container_uuid, {'image': new_image})
 
+    def test_bulk_update_containers(self):
+        container1 = utils.create_test_container(
+            name='container-one', uuid=uuidutils.generate_uuid(),
+            context=self.context)
+        container2 = utils.create_test_container(
+            name='container-two', uuid=uuidutils.generate_uuid(),
+            context=self.context)
+        container3 = utils.create_test_container(
+            name='container-three', uuid=uuidutils.generate_uuid(),
+            context=self.context)
+
+        count = dbapi.bulk_update_containers(
+            self.context, consts.TYPE_CONTAINER,
+            {container1.uuid: {'status': 'Stopped'},
+             container2.uuid: {'status': 'Stopped', 'host': 'new-host'},
+             container3.uuid: {},
+             uuidutils.generate_uuid(): {'status': 'Stopped'}})
+        self.assertEqual(2, count)
+
+        res1 = dbapi.get_container_by_uuid(
+            self.context, consts.TYPE_CONTAINER, container1.uuid)
+        res2 = dbapi.get_container_by_uuid(
+            self.context, consts.TYPE_CONTAINER, container2.uuid)
+        res3 = dbapi.get_container_by_uuid(
+            self.context, consts.TYPE_CONTAINER, container3.uuid)
+        self.assertEqual('Stopped', res1.status)
+        self.assertEqual(container1.host, res1.host)
+        self.assertEqual('Stopped', res2.status)
+        self.assertEqual('new-host', res2.host)
+        self.assertEqual(container3.status, res3.status)
+
+    def test_bulk_update_containers_uuid(self):
+        container = utils.create_test_container(context=self.context)
+        self.assertRaises(exception.InvalidParameterValue,
+                          dbapi.bulk_update_containers, self.context,
+                          container.container_type,
+                          {container.uuid: {'uuid': ''}})
+
     def test_update_container_uuid(self):
         container = utils.create_test_container(context=self.context)
         self.assertRaises(exception.InvalidParameterValue,
@@ -12,10 +12,15 @@
 
 """Tests for manipulating Quota via the DB API"""
 
+from oslo_utils import uuidutils
+
+from zun.common import consts
 from zun.common import context
 from zun.common import exception
 import zun.conf
 from zun.db import api as dbapi
+from zun.db.sqlalchemy import api as sa_api
+from zun.db.sqlalchemy import models
 from zun.tests.unit.db import base
 from zun.tests.unit.db import utils
 
@@ -85,3 +90,106 @@ class DBQuotaTestCase(base.DbTestCase):
         updated_quota = dbapi.quota_get(self.ctx, quota.project_id,
                                         quota.resource)
         self.assertEqual(updated_quota.hard_limit, 200)
+
+
+class DBQuotaUsageTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super(DBQuotaUsageTestCase, self).setUp()
+        self.ctx = context.get_admin_context()
+        self.project_id = 'fake_project'
+
+    def _create_container(self, **kwargs):
+        kwargs.setdefault('uuid', uuidutils.generate_uuid())
+        kwargs.setdefault('name', 'container-%s' % kwargs['uuid'])
+        return utils.create_test_container(context=self.ctx, **kwargs)
+
+    def _get_usages(self):
+        usages = dbapi.quota_usage_get_all_by_project(self.ctx,
+                                                      self.project_id)
+        return {resource: usage['in_use'] for resource, usage in
+                usages.items() if resource != 'project_id'}
+
+    def test_get_usages_counts_existing_containers(self):
+        self._create_container(cpu=0.5, memory='512', disk=10)
+        self._create_container(cpu=1.25, memory='1024', disk=20)
+        self._create_container(container_type=consts.TYPE_CAPSULE)
+        self.assertEqual({'containers': 2, 'cpu': 1.75, 'memory': 1536,
+                          'disk': 30}, self._get_usages())
+
+    def test_usages_follow_containers(self):
+        # The usages are set up by the first reservation
+        dbapi.quota_usage_reserve(self.ctx, self.project_id, {}, {})
+        container = self._create_container(cpu=0.1, memory='512', disk=10)
+        self._create_container(cpu=0.2, memory='256', disk=5)
+        self.assertEqual({'containers': 2, 'cpu': 0.3, 'memory': 768,
+                          'disk': 15}, self._get_usages())
+
+        dbapi.update_container(self.ctx, consts.TYPE_CONTAINER,
+                               container.id, {'cpu': 2.0, 'memory': '1024',
+                                              'status': 'Stopped'})
+        self.assertEqual({'containers': 2, 'cpu': 2.2, 'memory': 1280,
+                          'disk': 15}, self._get_usages())
+
+        dbapi.destroy_container(self.ctx, consts.TYPE_CONTAINER,
+                                container.id)
+        self.assertEqual({'containers': 1, 'cpu': 0.2, 'memory': 256,
+                          'disk': 5}, self._get_usages())
+
+    def test_reserve_and_release(self):
+        self._create_container(cpu=1.0, memory='512', disk=10)
+        limits = {'containers': 2, 'cpu': 2, 'memory': 1024, 'disk': 100}
+        deltas = {'containers': 1, 'cpu': 0.5, 'memory': 512, 'disk': 0}
+        dbapi.quota_usage_reserve(self.ctx, self.project_id, deltas, limits)
+        usages = dbapi.quota_usage_get_all_by_project(self.ctx,
+                                                      self.project_id)
+        self.assertEqual({'in_use': 1, 'reserved': 1}, usages['containers'])
+        self.assertEqual({'in_use': 1.0, 'reserved': 0.5}, usages['cpu'])
+
+        # The reservations count towards the limits
+        exc = self.assertRaises(exception.OverQuota,
+                                dbapi.quota_usage_reserve, self.ctx,
+                                self.project_id, deltas, limits)
+        self.assertEqual(['containers', 'memory'], exc.kwargs['overs'])
+        self.assertEqual({'containers': 0, 'memory': 0},
+                         exc.kwargs['headroom'])
+
+        dbapi.quota_usage_release(self.ctx, self.project_id, deltas)
+        dbapi.quota_usage_reserve(self.ctx, self.project_id, deltas, limits)
+
+    def test_reserve_ignores_unlimited_and_negative_deltas(self):
+        limits = {'containers': -1, 'cpu': 1}
+        dbapi.quota_usage_reserve(self.ctx, self.project_id,
+                                  {'containers': 100, 'cpu': -2}, limits)
+        usages = dbapi.quota_usage_get_all_by_project(self.ctx,
+                                                      self.project_id)
+        self.assertEqual(100, usages['containers']['reserved'])
+        self.assertEqual(0, usages['cpu']['reserved'])
+
+    def test_get_usages_does_not_set_up_usages(self):
+        self._create_container(cpu=1.0, memory='512', disk=10)
+        self.assertEqual({'containers': 1, 'cpu': 1.0, 'memory': 512,
+                          'disk': 10}, self._get_usages())
+        session = sa_api.get_session()
+        self.assertEqual(0, session.query(models.QuotaUsage).count())
+
+    def test_sync(self):
+        self._create_container(cpu=1.0, memory='512', disk=10)
+        dbapi.quota_usage_reserve(self.ctx, self.project_id,
+                                  {'containers': 1}, {})
+        # The usages drift if the containers are changed behind the API
+        session = sa_api.get_session()
+        with session.begin():
+            session.query(models.Container).update({'memory_mb': 1024})
+
+        synced = dbapi.quota_usage_sync(self.ctx)
+        self.assertEqual({self.project_id: {
+            'memory': {'in_use': 1024, 'previous_in_use': 512}}}, synced)
+        self.assertEqual({'containers': 1, 'cpu': 1.0, 'memory': 1024,
+                          'disk': 10}, self._get_usages())
+        # The reservations of the requests in progress are kept
+        usages = dbapi.quota_usage_get_all_by_project(self.ctx,
+                                                      self.project_id)
+        self.assertEqual({'in_use': 1, 'reserved': 1}, usages['containers'])
+        self.assertEqual({}, dbapi.quota_usage_sync(self.ctx,
+                                                    self.project_id))
@@ -12,6 +12,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
+
 from zun.common import exception
 from zun.tests.unit.db import base
 from zun.tests.unit.db import utils
@@ -117,3 +119,18 @@ class DbZunServiceTestCase(base.DbTestCase):
 
         res = self.dbapi.list_zun_services_by_binary(binary='none')
         self.assertEqual(0, len(res))
+
+    def test_list_zun_services_by_binary_updated_since(self):
+        since = datetime.datetime(2020, 1, 1, 12, 0, 0)
+        before = since - datetime.timedelta(minutes=1)
+        after = since + datetime.timedelta(minutes=1)
+        utils.create_test_zun_service(host='host-old', binary='FakeBin',
+                                      created_at=before, updated_at=before)
+        utils.create_test_zun_service(host='host-updated', binary='FakeBin',
+                                      created_at=before, updated_at=after)
+        utils.create_test_zun_service(host='host-created', binary='FakeBin',
+                                      created_at=after)
+        res = self.dbapi.list_zun_services_by_binary(
+            binary='FakeBin', filters={'updated_since': since})
+        self.assertEqual(['host-created', 'host-updated'],
+                         sorted(r.host for r in res))
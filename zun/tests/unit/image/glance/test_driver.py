@@ -20,6 +20,7 @@ import tempfile
 from zun.common import exception
 import zun.conf
 from zun.image.glance import driver
+from zun.image.glance import utils
 from zun.tests import base
 
 CONF = zun.conf.CONF
@@ -166,3 +167,52 @@ class TestDriver(base.BaseTestCase):
         ret = self.driver.delete_committed_image(None, 'id')
         self.assertEqual(1, len(ret))
         self.assertTrue(mock_delete_image.called)
+
+    @mock.patch('zun.image.glance.utils.upload_image_data')
+    def test_upload_image_data_streamed(self, mock_upload_image_data):
+        uploaded = []
+
+        def upload(context, img_id, data):
+            # glanceclient reads the data in chunks
+            while True:
+                chunk = data.read(3)
+                if not chunk:
+                    break
+                uploaded.append(chunk)
+            return 'fake-image'
+
+        mock_upload_image_data.side_effect = upload
+        data = (chunk for chunk in [b'abcd', b'', b'efg', b'hi'])
+        ret = self.driver.upload_image_data(None, 'id', data)
+        self.assertEqual('fake-image', ret)
+        self.assertEqual([b'abc', b'def', b'ghi'], uploaded)
+
+    @mock.patch('zun.image.glance.utils.upload_image_data')
+    def test_upload_image_data_failed(self, mock_upload_image_data):
+        mock_upload_image_data.side_effect = Exception('boom')
+        self.assertRaises(exception.ZunException,
+                          self.driver.upload_image_data,
+                          None, 'id', (chunk for chunk in [b'abcd']))
+
+
+class TestChunkedReader(base.BaseTestCase):
+
+    def test_read(self):
+        reader = utils.ChunkedReader([b'abcd', b'efg', b'hi'])
+        self.assertEqual(b'ab', reader.read(2))
+        self.assertEqual(b'cdefg', reader.read(5))
+        self.assertEqual(b'hi', reader.read(5))
+        self.assertEqual(b'', reader.read(5))
+        self.assertEqual(9, reader.bytes_read)
+
+    def test_read_all(self):
+        reader = utils.ChunkedReader([b'abcd', b'efg'])
+        self.assertEqual(b'a', reader.read(1))
+        self.assertEqual(b'bcdefg', reader.read())
+        self.assertEqual(b'', reader.read())
+
+    def test_read_is_lazy(self):
+        chunks = iter([b'abcd', b'efg'])
+        reader = utils.ChunkedReader(chunks)
+        self.assertEqual(b'abc', reader.read(3))
+        self.assertEqual(b'efg', next(chunks))
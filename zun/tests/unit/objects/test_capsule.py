@@ -65,7 +65,8 @@ class TestCapsuleObject(base.DbTestCase):
                                                   consts.TYPE_CAPSULE,
                                                   filters=filt,
                                                   limit=None, marker=None,
-                                                  sort_key=None, sort_dir=None)
+                                                  sort_key=None, sort_dir=None,
+                                                  columns=None)
 
     def test_create(self):
         with mock.patch.object(self.dbapi, 'create_container',
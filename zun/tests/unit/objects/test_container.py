@@ -97,7 +97,7 @@ class TestContainerObject(base.DbTestCase):
                                                         'test_host')
             mock_get_list.assert_called_once_with(
                 self.context, consts.TYPE_CONTAINER, {'host': 'test_host'},
-                None, None, None, None)
+                None, None, None, None, columns=None)
             self.assertThat(containers, HasLength(1))
             self.assertIsInstance(containers[0], objects.Container)
             self.assertEqual(self.context, containers[0]._context)
@@ -117,7 +117,21 @@ class TestContainerObject(base.DbTestCase):
                                                   consts.TYPE_CONTAINER,
                                                   filters=filt,
                                                   limit=None, marker=None,
-                                                  sort_key=None, sort_dir=None)
+                                                  sort_key=None, sort_dir=None,
+                                                  columns=None)
+
+    def test_list_with_fields(self):
+        with mock.patch.object(self.dbapi, 'list_containers',
+                               autospec=True) as mock_get_list:
+            mock_get_list.return_value = [self.fake_container]
+            containers = objects.Container.list(self.context,
+                                                fields=['name', 'status'])
+            mock_get_list.assert_called_once_with(
+                self.context, consts.TYPE_CONTAINER, filters=None,
+                limit=None, marker=None, sort_key=None, sort_dir=None,
+                columns=['id', 'name', 'status', 'uuid'])
+            self.assertEqual({'id', 'name', 'status', 'uuid'},
+                             set(containers[0].as_dict()))
 
     def test_create(self):
         with mock.patch.object(self.dbapi, 'create_container',
@@ -186,6 +200,31 @@ class TestContainerObject(base.DbTestCase):
                      'memory': '512m'})
                 self.assertEqual(self.context, container._context)
 
+    def test_bulk_save(self):
+        container = objects.Container(self.context,
+                                      uuid=self.fake_container['uuid'])
+        container.obj_reset_changes()
+        container.status = 'Stopped'
+        capsule = objects.Capsule(self.context, uuid='fake-capsule-uuid')
+        capsule.obj_reset_changes()
+        capsule.host = 'new-host'
+        unchanged = objects.Container(self.context, uuid='fake-uuid')
+        unchanged.obj_reset_changes()
+        with mock.patch.object(self.dbapi, 'bulk_update_containers',
+                               autospec=True) as mock_bulk_update:
+            objects.Container.bulk_save(self.context,
+                                        [container, capsule, unchanged])
+
+            mock_bulk_update.assert_has_calls([
+                mock.call(self.context, consts.TYPE_CONTAINER,
+                          {container.uuid: {'status': 'Stopped'}}),
+                mock.call(self.context, consts.TYPE_CAPSULE,
+                          {'fake-capsule-uuid': {'host': 'new-host'}})],
+                any_order=True)
+            self.assertEqual(2, mock_bulk_update.call_count)
+            self.assertEqual(set(), container.obj_what_changed())
+            self.assertEqual(set(), capsule.obj_what_changed())
+
     def test_refresh(self):
         uuid = self.fake_container['uuid']
         container_type = self.fake_container['container_type']
@@ -233,3 +272,32 @@ class TestContainerObject(base.DbTestCase):
             container = objects.Container.get_by_uuid(self.context, uuid)
             container.obj_load_attr('exec_instances')
             self.assertEqual(exec_insts, container.exec_instances)
+
+    def test_list_with_expected_attrs(self):
+        registry = utils.create_test_registry(context=self.context)
+        containers = []
+        for i in range(2):
+            containers.append(utils.create_test_container(
+                context=self.context, uuid=uuidutils.generate_uuid(),
+                name='container%d' % i, registry_id=registry.id))
+        utils.create_test_exec_instance(
+            context=self.context, container_id=containers[0].id,
+            exec_id='fake-exec-id')
+        with mock.patch.object(self.dbapi, 'get_registry_by_id',
+                               autospec=True) as mock_get_registry, \
+                mock.patch.object(objects.ExecInstance,
+                                  'list_by_container_id') as mock_list_exec:
+            result = objects.Container.list(
+                self.context, sort_key='id',
+                expected_attrs=['registry', 'exec_instances',
+                                'pci_devices'])
+            self.assertThat(result, HasLength(2))
+            for container in result:
+                self.assertEqual(registry.uuid, container.registry.uuid)
+                self.assertEqual([], container.pci_devices)
+                self.assertEqual(set(), container.obj_what_changed())
+            self.assertEqual(['fake-exec-id'],
+                             [e.exec_id for e in result[0].exec_instances])
+            self.assertEqual([], result[1].exec_instances)
+            self.assertFalse(mock_get_registry.called)
+            self.assertFalse(mock_list_exec.called)
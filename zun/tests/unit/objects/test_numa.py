@@ -42,3 +42,18 @@ class TestNUMA(base.BaseTestCase):
                           numacell.unpin_cpus, set([1, 4]))
         numacell.unpin_cpus(set([1, 2, 3]))
         self.assertEqual(set([1, 2, 3, 4]), numacell.free_cpus)
+
+    def test_obj_make_compatible(self):
+        obj = objects.NUMATopology(nodes=[
+            objects.NUMANode(id=0, cpuset=set([0, 1]), pinned_cpus=set(),
+                             mem_total=1024, mem_available=1024,
+                             siblings=[set([0, 1])])])
+        primitive = obj.obj_to_primitive(target_version='1.0')
+        node = primitive['zun_object.data']['nodes'][0]
+        self.assertEqual('1.0', node['zun_object.version'])
+        self.assertNotIn('siblings', node['zun_object.data'])
+
+        primitive = obj.obj_to_primitive()
+        node = primitive['zun_object.data']['nodes'][0]
+        self.assertEqual('1.1', node['zun_object.version'])
+        self.assertIn('siblings', node['zun_object.data'])
@@ -344,32 +344,32 @@ class TestObject(test_base.TestCase, _TestObject):
 # For more information on object version testing, read
 # https://docs.openstack.org/zun/latest/
 object_data = {
-    'Capsule': '1.4-66281771e65f95e6e79c604b59b7e3a3',
-    'CapsuleContainer': '1.4-ab82355ff19b201307c59a5b17ecc32d',
-    'CapsuleInitContainer': '1.4-ab82355ff19b201307c59a5b17ecc32d',
-    'Container': '1.43-bdd6b22fc8d6d1bb8518ed807e8e7b90',
+    'Capsule': '1.8-7770d5b87a074f6b8b1f0359231fb971',
+    'CapsuleContainer': '1.8-212d30c6c8a7828f4af2348914a55b88',
+    'CapsuleInitContainer': '1.8-212d30c6c8a7828f4af2348914a55b88',
+    'Container': '1.47-b6f4de1c149793bc9c204abab9545d67',
     'Cpuset': '1.0-06c4e6335683c18b87e2e54080f8c341',
     'Volume': '1.0-034768f2f5c5e89acb5ee45c6d3f3403',
     'VolumeMapping': '1.5-57febc66526185a75a744637e7a387c7',
     'Image': '1.2-80504fdd797e9dd86128a91680e876ad',
     'MyObj': '1.0-34c4b1aadefd177b13f9a2f894cc23cd',
-    'NUMANode': '1.0-6da86e2dd7f28253e2b9ac60c002ea8f',
-    'NUMATopology': '1.0-b54086eda7e4b2e6145ecb6ee2c925ab',
+    'NUMANode': '1.1-f23d5a75b5f70b0173ed9e544365f69e',
+    'NUMATopology': '1.1-b54086eda7e4b2e6145ecb6ee2c925ab',
     'ResourceClass': '1.1-d661c7675b3cd5b8c3618b68ba64324e',
     'ResourceProvider': '1.0-92b427359d5a4cf9ec6c72cbe630ee24',
-    'ZunService': '1.2-deff2a74a9ce23baa231ae12f39a6189',
-    'PciDevice': '1.1-6e3f0851ad1cf12583e6af4df1883979',
+    'ZunService': '1.3-3a00f265dedb82943a6638eb96664fef',
+    'PciDevice': '1.2-3c4ae0c247073b836fcaf9fa52147de4',
     'ComputeNode': '1.14-5cf09346721129068d1f72482309276f',
     'PciDevicePool': '1.0-3f5ddc3ff7bfa14da7f6c7e9904cc000',
     'PciDevicePoolList': '1.0-15ecf022a68ddbb8c2a6739cfc9f8f5e',
-    'Quota': '1.3-fcaaaf4b6e983207edba27a1cf8e51ab',
+    'Quota': '1.4-d01913faf3d01005ac9e5bb92bff800f',
     'QuotaClass': '1.2-4739583a70891fbc145031228fb8001e',
     'ContainerPCIRequest': '1.0-b060f9f9f734bedde79a71a4d3112ee0',
     'ContainerPCIRequests': '1.0-7b8f7f044661fe4e24e6949c035af2c4',
     'ContainerAction': '1.2-4ae05fe3d1576c211c2425e4db190ef2',
     'ContainerActionEvent': '1.0-2974d0a6f5d4821fd4e223a88c10181a',
     'ZunNetwork': '1.1-26e8d37a54e5fc905ede657744a221d9',
-    'ExecInstance': '1.0-59464e7b96db847c0abb1e96d3cec30a',
+    'ExecInstance': '1.1-92aa0a1a2991a1e94ee6552c3654e863',
     'Registry': '1.0-36c2053fbc30e0021630e657dd1699c9',
     'RequestGroup': '1.0-5e08d68d0a63b729778340d608ec4eae',
 }
@@ -91,6 +91,37 @@ class PciDeviceStatsTestCase(base.TestCase):
                           self.pci_stats.remove_device,
                           self.fake_dev_2)
 
+    def test_remove_and_add_device(self):
+        self.pci_stats.remove_device(self.fake_dev_2)
+        self.pci_stats.add_device(self.fake_dev_2)
+        self.assertEqual(3, len(self.pci_stats.pools))
+        self.pci_stats.remove_device(self.fake_dev_2)
+        self.assertEqual(2, len(self.pci_stats.pools))
+
+    def test_support_requests(self):
+        pools = [dict(pool, devices=list(pool['devices']))
+                 for pool in self.pci_stats.pools]
+        requests = [objects.ContainerPCIRequest(count=2,
+                                                spec=[{'vendor_id': 'v1'}]),
+                    objects.ContainerPCIRequest(count=1,
+                                                spec=[{'vendor_id': 'v2'}])]
+        self.assertTrue(self.pci_stats.support_requests(requests))
+        self.assertFalse(self.pci_stats.support_requests(
+            [objects.ContainerPCIRequest(count=3,
+                                         spec=[{'vendor_id': 'v1'}])]))
+        self.assertEqual(pools, self.pci_stats.pools)
+
+    @mock.patch.dict(stats._matchers, clear=True)
+    def test_filter_pools_for_spec_matches_once(self):
+        spec = [{'vendor_id': 'v1'}]
+        with mock.patch.object(stats.utils, 'pci_device_prop_match',
+                               return_value=True) as mock_match:
+            for i in range(2):
+                pools = stats.PciDeviceStats(
+                    self.pci_stats.to_device_pools_obj()).pools
+                self.pci_stats._filter_pools_for_spec(pools, spec)
+        self.assertEqual(3, mock_match.call_count)
+
     def test_pci_stats_equivalent(self):
         pci_stats2 = stats.PciDeviceStats()
         for dev in [self.fake_dev_1,
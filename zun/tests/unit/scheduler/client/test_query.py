@@ -15,6 +15,7 @@ import mock
 
 from oslo_config import cfg
 
+from zun.common import exception
 from zun import objects
 from zun.scheduler.client import query as scheduler_client
 from zun.scheduler import filter_scheduler
@@ -43,6 +44,13 @@ class SchedulerClientTestCase(base.TestCase):
         driver = self.client_cls().driver
         self.assertIsInstance(driver, filter_scheduler.FilterScheduler)
 
+    @mock.patch('zun.scheduler.client.report.SchedulerReportClient')
+    def test_init_shares_placement_client(self, mock_report_client):
+        client = self.client_cls()
+        mock_report_client.assert_called_once_with()
+        self.assertIs(client.placement_client,
+                      client.driver.placement_client)
+
     def test_init_using_custom_schedulerdriver(self):
         CONF.set_override('driver', 'fake_scheduler', group='scheduler')
         driver = self.client_cls().driver
@@ -74,3 +82,54 @@ class SchedulerClientTestCase(base.TestCase):
         mock_select_destinations.assert_called_once_with(
             'ctxt', containers, extra_spec, alloc_reqs_by_rp_uuid,
             mock_provider_summaries, mock.sentinel.alloc_request_version)
+
+    def _select_destinations_with_failed_claims(self, containers,
+                                                mock_select_destinations):
+        mock_alloc_req = {
+            "allocations": {
+                mock.sentinel.rp_uuid: [mock.sentinel.alloc_req]
+            }
+        }
+        self.mock_placement_client.get_allocation_candidates.return_value = (
+            [mock_alloc_req], {mock.sentinel.rp_uuid: {}},
+            mock.sentinel.alloc_request_version
+        )
+        mock_select_destinations.side_effect = [
+            exception.AllocationClaimFailed(), mock.sentinel.dests]
+        return self.client.select_destinations('ctxt', containers, {})
+
+    @mock.patch('zun.scheduler.filter_scheduler.FilterScheduler'
+                '.select_destinations')
+    def test_select_destinations_retry_claim(self, mock_select_destinations):
+        containers = [objects.Container(self.context,
+                                        **utils.get_test_container())]
+        dests = self._select_destinations_with_failed_claims(
+            containers, mock_select_destinations)
+        self.assertEqual(mock.sentinel.dests, dests)
+        self.assertEqual(
+            2,
+            self.mock_placement_client.get_allocation_candidates.call_count)
+        self.assertEqual(2, mock_select_destinations.call_count)
+
+    @mock.patch('zun.scheduler.filter_scheduler.FilterScheduler'
+                '.select_destinations')
+    def test_select_destinations_no_retry_claim(self,
+                                                mock_select_destinations):
+        self.config(allocation_candidates_retries=0, group='scheduler')
+        containers = [objects.Container(self.context,
+                                        **utils.get_test_container())]
+        self.assertRaises(exception.AllocationClaimFailed,
+                          self._select_destinations_with_failed_claims,
+                          containers, mock_select_destinations)
+        self.assertEqual(1, mock_select_destinations.call_count)
+
+    @mock.patch('zun.scheduler.filter_scheduler.FilterScheduler'
+                '.select_destinations')
+    def test_select_destinations_no_retry_claim_several_containers(
+            self, mock_select_destinations):
+        containers = [objects.Container(self.context,
+                                        **utils.get_test_container())] * 2
+        self.assertRaises(exception.AllocationClaimFailed,
+                          self._select_destinations_with_failed_claims,
+                          containers, mock_select_destinations)
+        self.assertEqual(1, mock_select_destinations.call_count)
@@ -1046,6 +1046,149 @@ class TestPutAllocations(SchedulerReportClientTestCase):
             logger=mock.ANY,
             headers={'X-Openstack-Request-Id': self.context.global_id})
 
+    def _claim_resources_batch(self):
+        claims = [
+            (uuids.consumer1,
+             {'allocations': {uuids.cn1: {'resources': {'VCPU': 1}}}}),
+            (uuids.consumer2,
+             {'allocations': {uuids.cn2: {'resources': {'VCPU': 1}}}}),
+        ]
+        expected_payload = {
+            consumer_uuid: {
+                'allocations': alloc_req['allocations'],
+                'project_id': uuids.project_id,
+                'user_id': uuids.user_id,
+                'consumer_generation': None}
+            for consumer_uuid, alloc_req in claims}
+        expected_call = mock.call(
+            '/allocations', microversion='1.28', json=expected_payload,
+            endpoint_filter=mock.ANY,
+            logger=mock.ANY,
+            headers={'X-Openstack-Request-Id': self.context.global_id})
+        return claims, expected_call
+
+    def test_claim_resources_batch_success(self):
+        self.ks_adap_mock.post.return_value = fake_requests.FakeResponse(204)
+        claims, expected_call = self._claim_resources_batch()
+
+        res = self.client.claim_resources_batch(
+            self.context, claims, uuids.project_id, uuids.user_id)
+
+        self.assertTrue(res)
+        self.assertEqual([expected_call],
+                         self.ks_adap_mock.post.call_args_list)
+
+    def test_claim_resources_batch_retry_success(self):
+        self.ks_adap_mock.post.side_effect = [
+            fake_requests.FakeResponse(
+                409,
+                jsonutils.dumps(
+                    {'errors': [
+                        {'code': 'placement.concurrent_update',
+                         'detail': ''}]})),
+            fake_requests.FakeResponse(204)]
+        claims, expected_call = self._claim_resources_batch()
+
+        res = self.client.claim_resources_batch(
+            self.context, claims, uuids.project_id, uuids.user_id)
+
+        self.assertTrue(res)
+        self.assertEqual([expected_call] * 2,
+                         self.ks_adap_mock.post.call_args_list)
+
+    @mock.patch.object(report.LOG, 'warning')
+    def test_claim_resources_batch_failure(self, mock_log):
+        self.ks_adap_mock.post.return_value = fake_requests.FakeResponse(
+            409,
+            jsonutils.dumps(
+                {'errors': [
+                    {'code': 'something else',
+                     'detail': 'not cool'}]}))
+        claims, expected_call = self._claim_resources_batch()
+
+        res = self.client.claim_resources_batch(
+            self.context, claims, uuids.project_id, uuids.user_id)
+
+        self.assertFalse(res)
+        self.assertTrue(mock_log.called)
+        self.assertEqual([expected_call],
+                         self.ks_adap_mock.post.call_args_list)
+
+    def test_claim_resources_batch_allocation_request_version(self):
+        self.ks_adap_mock.post.return_value = fake_requests.FakeResponse(204)
+        claims, _ = self._claim_resources_batch()
+
+        res = self.client.claim_resources_batch(
+            self.context, claims, uuids.project_id, uuids.user_id,
+            allocation_request_version='1.13')
+
+        self.assertTrue(res)
+        payload = self.ks_adap_mock.post.call_args[1]['json']
+        self.assertEqual('1.13',
+                         self.ks_adap_mock.post.call_args[1]['microversion'])
+        # the consumer generation is only known from 1.28
+        self.assertNotIn('consumer_generation', payload[uuids.consumer1])
+
+    def test_claim_resources_batch_old_allocation_request_version(self):
+        claims, _ = self._claim_resources_batch()
+
+        res = self.client.claim_resources_batch(
+            self.context, claims, uuids.project_id, uuids.user_id,
+            allocation_request_version='1.10')
+
+        self.assertFalse(res)
+        self.assertFalse(self.ks_adap_mock.post.called)
+
+    def test_claim_resources_batch_consumer_generation_failure(self):
+        self.ks_adap_mock.post.return_value = fake_requests.FakeResponse(
+            409,
+            jsonutils.dumps(
+                {'errors': [
+                    {'code': 'placement.concurrent_update',
+                     'detail': 'consumer generation conflict'}]}))
+        claims, expected_call = self._claim_resources_batch()
+
+        self.assertRaises(exception.AllocationUpdateFailed,
+                          self.client.claim_resources_batch, self.context,
+                          claims, uuids.project_id, uuids.user_id)
+
+    def test_claim_resources_new_consumer(self):
+        self.ks_adap_mock.put.return_value = fake_requests.FakeResponse(204)
+        alloc_req = {'allocations': {uuids.cn1: {'resources': {'VCPU': 1}}}}
+
+        res = self.client.claim_resources_new_consumer(
+            self.context, uuids.consumer, alloc_req, uuids.project_id,
+            uuids.user_id)
+
+        self.assertTrue(res)
+        # the current allocations of the consumer are not read
+        self.assertFalse(self.ks_adap_mock.get.called)
+        self.ks_adap_mock.put.assert_called_once_with(
+            '/allocations/%s' % uuids.consumer, microversion='1.28',
+            json={'allocations': alloc_req['allocations'],
+                  'project_id': uuids.project_id,
+                  'user_id': uuids.user_id,
+                  'consumer_generation': None},
+            endpoint_filter=mock.ANY,
+            logger=mock.ANY,
+            headers={'X-Openstack-Request-Id': self.context.global_id})
+
+    def test_claim_resources_new_consumer_exists(self):
+        self.ks_adap_mock.put.return_value = fake_requests.FakeResponse(
+            409,
+            jsonutils.dumps(
+                {'errors': [
+                    {'code': 'placement.concurrent_update',
+                     'detail': 'consumer generation conflict'}]}))
+        alloc_req = {'allocations': {uuids.cn1: {'resources': {'VCPU': 1}}}}
+
+        self.assertRaises(exception.AllocationUpdateFailed,
+                          self.client.claim_resources_new_consumer,
+                          self.context, uuids.consumer, alloc_req,
+                          uuids.project_id, uuids.user_id)
+        self.assertFalse(self.ks_adap_mock.get.called)
+        self.assertEqual(1, self.ks_adap_mock.put.call_count)
+
     def test_remove_provider_from_inst_alloc_no_shared(self):
         """Tests that the method which manipulates an existing doubled-up
         allocation for a move operation to remove the source host results in
@@ -13,6 +13,7 @@
 from zun.common import context
 from zun import objects
 from zun.scheduler.filters import cpu_filter
+from zun.scheduler import host_table
 from zun.tests import base
 from zun.tests.unit.scheduler import fakes
 
@@ -43,3 +44,15 @@ class TestCPUFilter(base.TestCase):
         extra_spec = {}
         self.assertFalse(self.filt_cls.host_passes(host, container,
                                                    extra_spec))
+
+    def test_cpu_filter_mask(self):
+        self.filt_cls = cpu_filter.CPUFilter()
+        container = objects.Container(self.context)
+        container.cpu = 4.0
+        host1 = fakes.FakeHostState('host1', {'cpus': 8, 'cpu_used': 2.0})
+        host2 = fakes.FakeHostState('host2', {'cpus': 8, 'cpu_used': 6.0})
+        table = host_table.HostStateTable([host1, host2])
+        mask = self.filt_cls.filter_mask(table, container, {})
+        self.assertEqual([True, False], list(mask))
+        table.apply_limits([host1])
+        self.assertEqual(8, host1.limits['cpu'])
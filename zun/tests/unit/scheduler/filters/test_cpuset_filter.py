@@ -86,3 +86,28 @@ class TestCpuSetFilter(base.TestCase):
         extra_spec = {}
         self.assertFalse(self.filt_cls.host_passes(host,
                                                    container, extra_spec))
+
+    def test_cpuset_filter_best_fit_dedicated(self):
+        self.filt_cls = cpuset_filter.CpuSetFilter()
+        container = objects.Container(self.context)
+        container.cpu_policy = 'dedicated'
+        container.cpu = 2.0
+        container.memory = '1024'
+        host = fakes.FakeHostState('testhost')
+        host.numa_topology = objects.NUMATopology(nodes=[
+            objects.NUMANode(id=0, cpuset=set([1, 2, 3, 4]),
+                             pinned_cpus=set([]), mem_total=32739,
+                             mem_available=32739, siblings=[set([1, 3])]),
+            objects.NUMANode(id=1, cpuset=set([5, 6, 7, 8]),
+                             pinned_cpus=set([5]), mem_total=32739,
+                             mem_available=32739, siblings=[set([6, 8])])]
+        )
+        host.enable_cpu_pinning = True
+        extra_spec = {}
+        self.assertTrue(self.filt_cls.host_passes(host, container, extra_spec))
+        self.assertEqual({'node': 1,
+                          'cpuset_cpu': set([5, 6, 7, 8]),
+                          'cpuset_cpu_pinned': set([5]),
+                          'cpuset_cpu_siblings': [set([6, 8])],
+                          'cpuset_mem': 32739},
+                         host.limits['cpuset'])
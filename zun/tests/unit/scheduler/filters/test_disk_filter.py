@@ -13,6 +13,7 @@
 from zun.common import context
 from zun import objects
 from zun.scheduler.filters import disk_filter
+from zun.scheduler import host_table
 from zun.tests import base
 from zun.tests.unit.scheduler import fakes
 
@@ -68,3 +69,22 @@ class TestDiskFilter(base.TestCase):
         extra_spec = {}
         self.assertFalse(self.filt_cls.host_passes(host, container,
                                                    extra_spec))
+
+    def test_disk_filter_mask(self):
+        self.filt_cls = disk_filter.DiskFilter()
+        container = objects.Container(self.context)
+        container.disk = 20
+        host1 = fakes.FakeHostState('host1', {'disk_total': 80,
+                                              'disk_used': 40,
+                                              'disk_quota_supported': True})
+        host2 = fakes.FakeHostState('host2', {'disk_total': 80,
+                                              'disk_used': 70,
+                                              'disk_quota_supported': True})
+        host3 = fakes.FakeHostState('host3', {'disk_total': 80,
+                                              'disk_used': 0,
+                                              'disk_quota_supported': False})
+        table = host_table.HostStateTable([host1, host2, host3])
+        mask = self.filt_cls.filter_mask(table, container, {})
+        self.assertEqual([True, False, False], list(mask))
+        table.apply_limits([host1])
+        self.assertEqual(80, host1.limits['disk'])
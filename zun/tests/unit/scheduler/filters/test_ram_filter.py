@@ -13,6 +13,7 @@
 from zun.common import context
 from zun import objects
 from zun.scheduler.filters import ram_filter
+from zun.scheduler import host_table
 from zun.tests import base
 from zun.tests.unit.scheduler import fakes
 
@@ -43,3 +44,17 @@ class TestRamFilter(base.TestCase):
         extra_spec = {}
         self.assertFalse(self.filt_cls.host_passes(host, container,
                                                    extra_spec))
+
+    def test_ram_filter_mask(self):
+        self.filt_cls = ram_filter.RamFilter()
+        container = objects.Container(self.context)
+        container.memory = '4096'
+        host1 = fakes.FakeHostState('host1', {'mem_total': 1024 * 128,
+                                              'mem_used': 1024})
+        host2 = fakes.FakeHostState('host2', {'mem_total': 1024 * 128,
+                                              'mem_used': 1024 * 127})
+        table = host_table.HostStateTable([host1, host2])
+        mask = self.filt_cls.filter_mask(table, container, {})
+        self.assertEqual([True, False], list(mask))
+        table.apply_limits([host1])
+        self.assertEqual(1024 * 128, host1.limits['memory'])
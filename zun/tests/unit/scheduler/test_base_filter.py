@@ -17,6 +17,7 @@ import inspect
 import mock
 
 from zun.scheduler import base_filters
+from zun.scheduler import filters
 from zun.tests import base
 
 
@@ -39,3 +40,80 @@ class BaseFilterTestCase(base.TestCase):
         base_filter.run_filter_once_per_request = False
         result = base_filter.run_filter_for_index(2)
         self.assertTrue(result)
+
+
+class FakeCheapFilter(filters.BaseHostFilter):
+    def host_passes(self, host_state, container, extra_spec):
+        return host_state != 'obj1'
+
+
+class FakeExpensiveFilter(filters.BaseHostFilter):
+    cost = 5
+
+    def host_passes(self, host_state, container, extra_spec):
+        return host_state != 'obj2'
+
+
+class BaseFilterHandlerTestCase(base.TestCase):
+    """Test case for base filter handler class."""
+
+    def setUp(self):
+        super(BaseFilterHandlerTestCase, self).setUp()
+        self.handler = filters.HostFilterHandler()
+        self.container = mock.Mock(uuid='fake-uuid')
+
+    def test_filter_stats(self):
+        result = self.handler.get_filtered_objects(
+            [FakeExpensiveFilter(), FakeCheapFilter()],
+            ['obj1', 'obj2', 'obj3'], self.container, {})
+        self.assertEqual(['obj3'], result)
+
+        stats = self.handler.filter_stats()
+        self.assertEqual(['FakeCheapFilter', 'FakeExpensiveFilter'],
+                         sorted(stats))
+        self.assertEqual(1, stats['FakeExpensiveFilter']['runs'])
+        self.assertEqual(3, stats['FakeExpensiveFilter']['objects_in'])
+        self.assertEqual(1, stats['FakeExpensiveFilter']['eliminated'])
+        self.assertEqual(2, stats['FakeCheapFilter']['objects_in'])
+        self.assertEqual(1, stats['FakeCheapFilter']['eliminated'])
+        self.assertGreaterEqual(stats['FakeCheapFilter']['total_time'], 0.0)
+
+    def test_order_filters(self):
+        cheap_filter = FakeCheapFilter()
+        expensive_filter = FakeExpensiveFilter()
+        self.assertEqual(
+            [cheap_filter, expensive_filter],
+            self.handler.order_filters([expensive_filter, cheap_filter]))
+
+    def test_order_filters_by_elimination_rate(self):
+        cheap_filter = FakeCheapFilter()
+        expensive_filter = FakeExpensiveFilter()
+        # the cheap filter never eliminates a host, the expensive one
+        # eliminates most of them
+        self.handler.get_filtered_objects(
+            [cheap_filter, expensive_filter],
+            ['obj2', 'obj2', 'obj2', 'obj3'], self.container, {})
+        self.assertEqual(
+            [expensive_filter, cheap_filter],
+            self.handler.order_filters([cheap_filter, expensive_filter]))
+
+    def test_filter_stats_not_recorded(self):
+        result = self.handler.get_filtered_objects(
+            [FakeCheapFilter()], ['obj1'], self.container, {},
+            record_stats=False)
+        self.assertEqual([], result)
+        self.assertEqual({}, self.handler.filter_stats())
+
+    def test_elimination_rate_decays(self):
+        stats = base_filters.FilterStats()
+        self.assertEqual(base_filters.DEFAULT_ELIMINATION_RATE,
+                         stats.elimination_rate)
+        for _ in range(20):
+            stats.record(10, 10, 0.0)
+        self.assertEqual(0.0, stats.elimination_rate)
+        for _ in range(5):
+            stats.record(10, 0, 0.0)
+        # the recent runs weigh more than the older ones
+        self.assertGreater(stats.elimination_rate, 0.4)
+        self.assertEqual(0.2, stats.to_dict()['eliminated'] /
+                         float(stats.to_dict()['objects_in']))
@@ -0,0 +1,82 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""
+Tests for base weights
+"""
+
+from zun.scheduler import base_weights
+from zun.scheduler import weights
+from zun.tests import base
+from zun.tests.unit.scheduler import fakes
+
+
+class _FakeWeigher(weights.BaseHostWeigher):
+
+    def __init__(self, multiplier=1.0):
+        self.multiplier = multiplier
+
+    def weight_multiplier(self):
+        return self.multiplier
+
+    def _weigh_object(self, host_state, container, extra_spec):
+        return host_state.mem_total - host_state.mem_used
+
+
+class BaseWeightsTestCase(base.TestCase):
+    """Test case for base weights."""
+
+    def test_normalize(self):
+        self.assertEqual((), base_weights.normalize([]))
+        self.assertEqual([0.0, 0.5, 1.0],
+                         list(base_weights.normalize([1, 2, 3])))
+        self.assertEqual([0, 0], list(base_weights.normalize([2, 2])))
+        self.assertEqual([0.25, 0.5],
+                         list(base_weights.normalize([1, 2], minval=0,
+                                                     maxval=4)))
+
+    def _get_hosts(self):
+        hosts = []
+        for name, mem_used in (('host1', 3), ('host2', 1), ('host3', 2)):
+            hosts.append(fakes.FakeHostState(
+                name, {'mem_total': 4, 'mem_used': mem_used}))
+        return hosts
+
+    def test_get_weighed_objects(self):
+        handler = weights.HostWeightHandler()
+        weighed_hosts = handler.get_weighed_objects(
+            [_FakeWeigher()], self._get_hosts(), None, {})
+        self.assertEqual(['host2', 'host3', 'host1'],
+                         [h.obj.hostname for h in weighed_hosts])
+        self.assertEqual([1.0, 0.5, 0.0], [h.weight for h in weighed_hosts])
+
+    def test_get_weighed_objects_multipliers(self):
+        handler = weights.HostWeightHandler()
+        weighed_hosts = handler.get_weighed_objects(
+            [_FakeWeigher(2.0), _FakeWeigher(-3.0)], self._get_hosts(),
+            None, {})
+        self.assertEqual(['host1', 'host3', 'host2'],
+                         [h.obj.hostname for h in weighed_hosts])
+        self.assertEqual([0.0, -0.5, -1.0],
+                         [h.weight for h in weighed_hosts])
+
+    def test_get_weighed_objects_single_host(self):
+        handler = weights.HostWeightHandler()
+        hosts = self._get_hosts()[:1]
+        weighed_hosts = handler.get_weighed_objects(
+            [_FakeWeigher()], hosts, None, {})
+        self.assertEqual(1, len(weighed_hosts))
+        self.assertEqual(0.0, weighed_hosts[0].weight)
+
+    def test_all_weighers(self):
+        names = sorted(cls.__name__ for cls in weights.all_weighers())
+        self.assertEqual(['CPUWeigher', 'DiskWeigher', 'NUMAWeigher',
+                          'NumContainersWeigher', 'RAMWeigher'], names)
@@ -19,6 +19,7 @@ from zun.common import context
 from zun.common import exception
 from zun import objects
 from zun.scheduler import filter_scheduler
+from zun.scheduler import filters
 from zun.tests import base
 from zun.tests.unit.db import utils
 from zun.tests.unit.scheduler.fakes import FakeService
@@ -96,6 +97,7 @@ class FilterSchedulerTestCase(base.TestCase):
         node1.disk_quota_supported = True
         node1.runtimes = ['runc']
         node1.enable_cpu_pinning = False
+        node1.total_containers = 0
         node2 = objects.ComputeNode(self.context)
         node2.rp_uuid = mock.sentinel.node2_rp_uuid
         node2.updated_at = timeutils.utcnow()
@@ -114,6 +116,7 @@ class FilterSchedulerTestCase(base.TestCase):
         node2.disk_quota_supported = True
         node2.runtimes = ['runc']
         node2.enable_cpu_pinning = False
+        node2.total_containers = 0
         node3 = objects.ComputeNode(self.context)
         node3.rp_uuid = mock.sentinel.node3_rp_uuid
         node3.updated_at = timeutils.utcnow()
@@ -132,6 +135,7 @@ class FilterSchedulerTestCase(base.TestCase):
         node3.disk_quota_supported = True
         node3.runtimes = ['runc']
         node3.enable_cpu_pinning = False
+        node3.total_containers = 0
         node4 = objects.ComputeNode(self.context)
         node4.rp_uuid = mock.sentinel.node4_rp_uuid
         node4.updated_at = timeutils.utcnow()
@@ -150,6 +154,7 @@ class FilterSchedulerTestCase(base.TestCase):
         node4.disk_quota_supported = True
         node4.runtimes = ['runc']
         node4.enable_cpu_pinning = False
+        node4.total_containers = 0
         nodes = [node1, node2, node3, node4]
         mock_compute_list.return_value = nodes
 
@@ -201,3 +206,409 @@ class FilterSchedulerTestCase(base.TestCase):
                           containers, extra_spec, mock_alloc_reqs_by_rp_uuid,
                           mock_provider_summaries,
                           mock.sentinel.alloc_request_version)
+
+    def test_get_filters(self):
+        self.config(enabled_filters=['PciPassthroughFilter', 'CpuSetFilter',
+                                     'RuntimeFilter'],
+                    group='scheduler')
+        driver = self.driver_cls()
+        self.assertEqual(
+            ['PciPassthroughFilter', 'CpuSetFilter', 'RuntimeFilter'],
+            [f.__class__.__name__ for f in driver._get_filters()])
+
+        self.config(order_filters_by_cost=True, group='scheduler')
+        self.assertEqual(
+            ['RuntimeFilter', 'CpuSetFilter', 'PciPassthroughFilter'],
+            [f.__class__.__name__ for f in driver._get_filters()])
+
+    def test_vectorized_filtering(self):
+        self.config(vectorized_filtering=True, group='scheduler')
+        driver = self.driver_cls()
+        self.assertIsInstance(driver.filter_handler,
+                              filters.VectorizedHostFilterHandler)
+
+    @mock.patch('zun.scheduler.host_table.np', None)
+    def test_vectorized_filtering_without_numpy(self):
+        self.config(vectorized_filtering=True, group='scheduler')
+        driver = self.driver_cls()
+        self.assertNotIsInstance(driver.filter_handler,
+                                 filters.VectorizedHostFilterHandler)
+
+    def _get_compute_node(self, hostname, mem_used):
+        node = objects.ComputeNode(self.context)
+        node.rp_uuid = getattr(mock.sentinel, hostname + '_rp_uuid')
+        node.updated_at = timeutils.utcnow()
+        node.cpus = 48
+        node.cpu_used = 0.0
+        node.mem_total = 1024 * 128
+        node.mem_used = mem_used
+        node.mem_free = node.mem_total - mem_used
+        node.mem_available = node.mem_total - mem_used
+        node.disk_total = 80
+        node.disk_used = 20
+        node.hostname = hostname
+        node.numa_topology = None
+        node.labels = {}
+        node.pci_device_pools = None
+        node.disk_quota_supported = True
+        node.runtimes = ['runc']
+        node.enable_cpu_pinning = False
+        node.total_containers = 0
+        return node
+
+    @mock.patch.object(servicegroup.ServiceGroup, 'service_is_up')
+    @mock.patch.object(objects.ComputeNode, 'list')
+    @mock.patch.object(objects.ZunService, 'list_by_binary')
+    def test_select_destinations_weighed(self, mock_list_by_binary,
+                                         mock_compute_list,
+                                         mock_service_is_up):
+        mock_service_is_up.return_value = True
+        mock_list_by_binary.return_value = [FakeService('service1', 'host1'),
+                                            FakeService('service2', 'host2')]
+        nodes = [self._get_compute_node('host1', 1024 * 64),
+                 self._get_compute_node('host2', 1024)]
+        mock_compute_list.return_value = nodes
+        test_container = utils.get_test_container()
+        containers = [objects.Container(self.context, **test_container)]
+        alloc_reqs_by_rp_uuid = {
+            node.rp_uuid: [getattr(mock.sentinel, node.hostname + '_req')]
+            for node in nodes}
+        provider_summaries = {node.rp_uuid: {} for node in nodes}
+
+        dests = self.driver.select_destinations(
+            self.context, containers, {}, alloc_reqs_by_rp_uuid,
+            provider_summaries, mock.sentinel.alloc_request_version)
+
+        # host2 has more free memory, so it is preferred by default
+        self.assertEqual('host2', dests[0]['host'])
+        self.mock_placement_client.claim_resources.assert_called_once_with(
+            mock.ANY, containers[0].uuid, mock.sentinel.host2_req,
+            containers[0].project_id, containers[0].user_id,
+            allocation_request_version=mock.sentinel.alloc_request_version,
+            consumer_generation=None)
+
+    @mock.patch('random.choice')
+    @mock.patch.object(servicegroup.ServiceGroup, 'service_is_up')
+    @mock.patch.object(objects.ComputeNode, 'list')
+    @mock.patch.object(objects.ZunService, 'list_by_binary')
+    def test_select_destinations_host_subset(self, mock_list_by_binary,
+                                             mock_compute_list,
+                                             mock_service_is_up,
+                                             mock_random_choice):
+        self.config(host_subset_size=2, group='scheduler')
+        mock_service_is_up.return_value = True
+        mock_list_by_binary.return_value = [FakeService('service1', 'host1'),
+                                            FakeService('service2', 'host2'),
+                                            FakeService('service3', 'host3')]
+        nodes = [self._get_compute_node('host1', 1024 * 64),
+                 self._get_compute_node('host2', 1024),
+                 self._get_compute_node('host3', 1024 * 96)]
+        mock_compute_list.return_value = nodes
+        mock_random_choice.side_effect = lambda hosts: hosts[-1]
+        test_container = utils.get_test_container()
+        containers = [objects.Container(self.context, **test_container)]
+        alloc_reqs_by_rp_uuid = {
+            node.rp_uuid: [getattr(mock.sentinel, node.hostname + '_req')]
+            for node in nodes}
+        provider_summaries = {node.rp_uuid: {} for node in nodes}
+
+        dests = self.driver.select_destinations(
+            self.context, containers, {}, alloc_reqs_by_rp_uuid,
+            provider_summaries, mock.sentinel.alloc_request_version)
+
+        # The host is chosen among the 2 best weighed hosts only
+        subset = mock_random_choice.call_args[0][0]
+        self.assertEqual(['host2', 'host1'], [h.hostname for h in subset])
+        self.assertEqual('host1', dests[0]['host'])
+        self.mock_placement_client.claim_resources.assert_called_once_with(
+            mock.ANY, containers[0].uuid, mock.sentinel.host1_req,
+            containers[0].project_id, containers[0].user_id,
+            allocation_request_version=mock.sentinel.alloc_request_version,
+            consumer_generation=None)
+
+    def _select_destinations_batch(self, mock_list_by_binary,
+                                   mock_compute_list, mock_service_is_up,
+                                   count=3, alloc_reqs_by_host=None):
+        mock_service_is_up.return_value = True
+        mock_list_by_binary.return_value = [FakeService('service1', 'host1'),
+                                            FakeService('service2', 'host2')]
+        nodes = [self._get_compute_node('host1', 1024 * 64),
+                 self._get_compute_node('host2', 1024)]
+        mock_compute_list.return_value = nodes
+        containers = []
+        for i in range(count):
+            test_container = utils.get_test_container(
+                uuid=getattr(mock.sentinel, 'container%d' % i),
+                memory=str(1024 * 48))
+            containers.append(
+                objects.Container(self.context, **test_container))
+        alloc_reqs_by_host = alloc_reqs_by_host or {}
+        alloc_reqs_by_rp_uuid = {
+            node.rp_uuid: alloc_reqs_by_host.get(
+                node.hostname,
+                [getattr(mock.sentinel, node.hostname + '_req')])
+            for node in nodes}
+        provider_summaries = {node.rp_uuid: {} for node in nodes}
+
+        dests = self.driver.select_destinations(
+            self.context, containers, {}, alloc_reqs_by_rp_uuid,
+            provider_summaries, mock.sentinel.alloc_request_version)
+        return containers, dests
+
+    @mock.patch.object(servicegroup.ServiceGroup, 'service_is_up')
+    @mock.patch.object(objects.ComputeNode, 'list')
+    @mock.patch.object(objects.ZunService, 'list_by_binary')
+    def test_select_destinations_batch(self, mock_list_by_binary,
+                                       mock_compute_list, mock_service_is_up):
+        self.mock_placement_client.claim_resources_batch.return_value = True
+
+        containers, dests = self._select_destinations_batch(
+            mock_list_by_binary, mock_compute_list, mock_service_is_up)
+
+        # the resources of a container are consumed before the next pick,
+        # so the containers are spread over the hosts
+        self.assertEqual(['host2', 'host1', 'host2'],
+                         [dest['host'] for dest in dests])
+        # each container has its own limits
+        self.assertIsNot(dests[0]['limits'], dests[2]['limits'])
+        self.mock_placement_client.claim_resources_batch\
+            .assert_called_once_with(
+                mock.ANY,
+                [(containers[0].uuid, mock.sentinel.host2_req),
+                 (containers[1].uuid, mock.sentinel.host1_req),
+                 (containers[2].uuid, mock.sentinel.host2_req)],
+                containers[0].project_id, containers[0].user_id,
+                allocation_request_version=mock.sentinel.alloc_request_version)
+        self.assertFalse(self.mock_placement_client.claim_resources.called)
+        host_states = {
+            host_state.hostname: host_state
+            for host_state in
+            self.driver.host_state_cache._host_states.values()}
+        self.assertEqual(1024 * 97, host_states['host2'].mem_used)
+        self.assertEqual(1024 * 112, host_states['host1'].mem_used)
+
+    @mock.patch.object(servicegroup.ServiceGroup, 'service_is_up')
+    @mock.patch.object(objects.ComputeNode, 'list')
+    @mock.patch.object(objects.ZunService, 'list_by_binary')
+    def test_select_destinations_batch_next_allocation_request(
+            self, mock_list_by_binary, mock_compute_list,
+            mock_service_is_up):
+        self.mock_placement_client.claim_resources_batch.side_effect = [
+            False, True]
+
+        containers, dests = self._select_destinations_batch(
+            mock_list_by_binary, mock_compute_list, mock_service_is_up,
+            alloc_reqs_by_host={'host2': [mock.sentinel.host2_req,
+                                          mock.sentinel.host2_req_2]})
+
+        self.assertEqual(['host2', 'host1', 'host2'],
+                         [dest['host'] for dest in dests])
+        # host1 has no other allocation request, it keeps its only one
+        self.mock_placement_client.claim_resources_batch.assert_called_with(
+            mock.ANY,
+            [(containers[0].uuid, mock.sentinel.host2_req_2),
+             (containers[1].uuid, mock.sentinel.host1_req),
+             (containers[2].uuid, mock.sentinel.host2_req_2)],
+            containers[0].project_id, containers[0].user_id,
+            allocation_request_version=mock.sentinel.alloc_request_version)
+        self.assertEqual(
+            2, self.mock_placement_client.claim_resources_batch.call_count)
+        self.assertFalse(self.mock_placement_client.claim_resources.called)
+
+    @mock.patch.object(servicegroup.ServiceGroup, 'service_is_up')
+    @mock.patch.object(objects.ComputeNode, 'list')
+    @mock.patch.object(objects.ZunService, 'list_by_binary')
+    def test_select_destinations_batch_claim_failed(
+            self, mock_list_by_binary, mock_compute_list,
+            mock_service_is_up):
+        self.mock_placement_client.claim_resources_batch.return_value = False
+
+        containers, dests = self._select_destinations_batch(
+            mock_list_by_binary, mock_compute_list, mock_service_is_up)
+
+        # the containers are claimed one by one instead
+        self.assertEqual(['host2', 'host1', 'host2'],
+                         [dest['host'] for dest in dests])
+        self.assertEqual(
+            3, self.mock_placement_client.claim_resources.call_count)
+
+    @mock.patch.object(servicegroup.ServiceGroup, 'service_is_up')
+    @mock.patch.object(objects.ComputeNode, 'list')
+    @mock.patch.object(objects.ZunService, 'list_by_binary')
+    def test_select_destinations_batch_fallback_failed(
+            self, mock_list_by_binary, mock_compute_list,
+            mock_service_is_up):
+        self.mock_placement_client.claim_resources_batch.return_value = False
+        # the third container can't be claimed on any of the hosts
+        self.mock_placement_client.claim_resources.side_effect = [
+            True, True, False, False]
+
+        self.assertRaises(exception.AllocationClaimFailed,
+                          self._select_destinations_batch,
+                          mock_list_by_binary, mock_compute_list,
+                          mock_service_is_up)
+        self.assertEqual(
+            [mock.call(mock.ANY, str(mock.sentinel.container0)),
+             mock.call(mock.ANY, str(mock.sentinel.container1))],
+            self.mock_placement_client.delete_allocation_for_container
+            .call_args_list)
+
+    @mock.patch.object(servicegroup.ServiceGroup, 'service_is_up')
+    @mock.patch.object(objects.ComputeNode, 'list')
+    @mock.patch.object(objects.ZunService, 'list_by_binary')
+    def test_select_destinations_batch_not_enough_hosts(
+            self, mock_list_by_binary, mock_compute_list,
+            mock_service_is_up):
+        self.mock_placement_client.claim_resources_batch.return_value = True
+        self.assertRaises(exception.NoValidHost,
+                          self._select_destinations_batch,
+                          mock_list_by_binary, mock_compute_list,
+                          mock_service_is_up, count=4)
+        self.assertFalse(
+            self.mock_placement_client.claim_resources_batch.called)
+
+    @mock.patch.object(servicegroup.ServiceGroup, 'service_is_up')
+    @mock.patch.object(objects.ComputeNode, 'list')
+    @mock.patch.object(objects.ZunService, 'list_by_binary')
+    def test_select_destinations_interleaved_limits(
+            self, mock_list_by_binary, mock_compute_list,
+            mock_service_is_up):
+        self.config(enabled_filters=['CpuSetFilter'], group='scheduler')
+        driver = self.driver_cls()
+        mock_service_is_up.return_value = True
+        mock_list_by_binary.return_value = [FakeService('service1', 'host1')]
+        node = self._get_compute_node('host1', 1024)
+        node.enable_cpu_pinning = True
+        # 2 free CPUs on the NUMA node 0 and 4 on the NUMA node 1
+        node.numa_topology = objects.NUMATopology(nodes=[
+            objects.NUMANode(id=0, cpuset=set(range(8)),
+                             pinned_cpus=set(range(6)), mem_total=65536,
+                             mem_available=65536),
+            objects.NUMANode(id=1, cpuset=set(range(8, 16)),
+                             pinned_cpus=set(range(8, 12)), mem_total=65536,
+                             mem_available=65536)])
+        mock_compute_list.return_value = [node]
+        alloc_reqs_by_rp_uuid = {node.rp_uuid: [mock.sentinel.host1_req]}
+        provider_summaries = {node.rp_uuid: {}}
+
+        def _get_container(cpu):
+            return objects.Container(self.context, **utils.get_test_container(
+                uuid=getattr(mock.sentinel, 'container%d' % cpu), cpu=cpu,
+                memory='1024', cpu_policy='dedicated'))
+
+        small, big = _get_container(2), _get_container(4)
+        big_dests = []
+
+        def _claim_resources(ctx, consumer_uuid, *args, **kwargs):
+            if consumer_uuid == small.uuid:
+                # another request is scheduled while this one is claiming
+                big_dests.extend(driver.select_destinations(
+                    self.context, [big], {}, alloc_reqs_by_rp_uuid,
+                    provider_summaries))
+            return True
+
+        self.mock_placement_client.claim_resources.side_effect = \
+            _claim_resources
+        small_dests = driver.select_destinations(
+            self.context, [small], {}, alloc_reqs_by_rp_uuid,
+            provider_summaries)
+
+        self.assertEqual(0, small_dests[0]['limits']['cpuset']['node'])
+        self.assertEqual(1, big_dests[0]['limits']['cpuset']['node'])
+        for host_state in driver.host_state_cache._host_states.values():
+            self.assertEqual({}, host_state.limits)
+
+    def _get_hosts(self, count):
+        hosts = []
+        for i in range(count):
+            host = mock.Mock(uuid='rp%d' % i)
+            host.hostname = 'host%d' % i
+            hosts.append(host)
+        alloc_reqs_by_rp_uuid = {
+            host.uuid: [host.uuid + '_req1', host.uuid + '_req2']
+            for host in hosts}
+        return hosts, alloc_reqs_by_rp_uuid
+
+    @mock.patch('zun.scheduler.utils.claim_resources')
+    def test_claim_walks_allocation_requests(self, mock_claim_resources):
+        hosts, alloc_reqs_by_rp_uuid = self._get_hosts(2)
+        mock_claim_resources.side_effect = [False, False, False, True]
+        container = mock.Mock(uuid='fake-uuid')
+
+        host = self.driver._claim(self.context, container, hosts,
+                                  alloc_reqs_by_rp_uuid)
+
+        self.assertIs(hosts[1], host)
+        self.assertEqual(
+            ['rp0_req1', 'rp0_req2', 'rp1_req1', 'rp1_req2'],
+            [c[0][3] for c in mock_claim_resources.call_args_list])
+        stats = self.driver.stats()['claims']
+        self.assertEqual(4, stats['attempts'])
+        self.assertEqual(3, stats['failures'])
+        self.assertEqual(0.75, stats['failure_rate'])
+
+    @mock.patch('zun.scheduler.utils.claim_resources')
+    def test_claim_failed(self, mock_claim_resources):
+        hosts, alloc_reqs_by_rp_uuid = self._get_hosts(2)
+        mock_claim_resources.return_value = False
+        container = mock.Mock(uuid='fake-uuid')
+
+        self.assertIsNone(self.driver._claim(self.context, container, hosts,
+                                             alloc_reqs_by_rp_uuid))
+        self.assertEqual(4, mock_claim_resources.call_count)
+
+    @mock.patch('zun.scheduler.utils.claim_resources')
+    def test_claim_race(self, mock_claim_resources):
+        self.config(claim_race_hosts=2, group='scheduler')
+        hosts, alloc_reqs_by_rp_uuid = self._get_hosts(3)
+
+        def claim_resources(ctx, client, container, alloc_req, **kwargs):
+            if alloc_req == 'rp1_req1':
+                return True
+            if alloc_req == 'rp0_req2':
+                # the consumer was created by the claim against host1
+                raise exception.AllocationUpdateFailed(
+                    consumer_uuid=container.uuid, error='conflict')
+            return False
+
+        mock_claim_resources.side_effect = claim_resources
+        container = mock.Mock(uuid='fake-uuid')
+
+        host = self.driver._claim(self.context, container, hosts,
+                                  alloc_reqs_by_rp_uuid)
+
+        self.assertIs(hosts[1], host)
+        # host2 is not tried since the race was won
+        self.assertEqual(
+            set(['rp0_req1', 'rp0_req2', 'rp1_req1']),
+            set(c[0][3] for c in mock_claim_resources.call_args_list))
+        # the racing claims don't merge into the allocations of the winner
+        for call in mock_claim_resources.call_args_list:
+            self.assertTrue(call[1]['new_consumer'])
+
+    @mock.patch('zun.scheduler.utils.claim_resources')
+    def test_claim_race_lost(self, mock_claim_resources):
+        self.config(claim_race_hosts=2, group='scheduler')
+        hosts, alloc_reqs_by_rp_uuid = self._get_hosts(3)
+        mock_claim_resources.side_effect = (
+            lambda ctx, client, container, alloc_req, **kwargs:
+            alloc_req == 'rp2_req2')
+        container = mock.Mock(uuid='fake-uuid')
+
+        host = self.driver._claim(self.context, container, hosts,
+                                  alloc_reqs_by_rp_uuid)
+
+        self.assertIs(hosts[2], host)
+        self.assertEqual(6, mock_claim_resources.call_count)
+
+    @mock.patch('zun.scheduler.utils.claim_resources')
+    def test_claim_race_consumer_conflict(self, mock_claim_resources):
+        self.config(claim_race_hosts=2, group='scheduler')
+        hosts, alloc_reqs_by_rp_uuid = self._get_hosts(2)
+        mock_claim_resources.side_effect = exception.AllocationUpdateFailed(
+            consumer_uuid='fake-uuid', error='conflict')
+        container = mock.Mock(uuid='fake-uuid')
+
+        self.assertRaises(exception.AllocationUpdateFailed,
+                          self.driver._claim, self.context, container, hosts,
+                          alloc_reqs_by_rp_uuid)
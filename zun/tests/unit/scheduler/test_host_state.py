@@ -0,0 +1,179 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+import mock
+from oslo_utils import timeutils
+
+from zun.common import context
+from zun import objects
+from zun.pci import stats as pci_stats
+from zun.scheduler import host_state
+from zun.tests import base
+from zun.tests.unit.scheduler.fakes import FakeService
+
+
+def _fake_node(hostname, mem_total=1024, updated_at=None):
+    return mock.Mock(hostname=hostname, rp_uuid=hostname + '-rp',
+                     mem_available=mem_total, mem_total=mem_total,
+                     mem_free=mem_total, mem_used=0, cpus=4, cpu_used=0,
+                     disk_total=80, disk_used=0, numa_topology=None,
+                     labels={}, pci_device_pools=None,
+                     disk_quota_supported=False, runtimes=['runc'],
+                     enable_cpu_pinning=False, total_containers=0,
+                     updated_at=updated_at)
+
+
+class HostStateTestCase(base.TestCase):
+
+    def test_copy(self):
+        cached = host_state.HostState('host1')
+        cached.limits = {'memory': 1024}
+        cached.numa_topology = objects.NUMATopology(nodes=[
+            objects.NUMANode(id=0, cpuset=set([0, 1]), pinned_cpus=set(),
+                             mem_total=1024, mem_available=1024,
+                             siblings=[])])
+        cached.pci_stats = pci_stats.PciDeviceStats()
+
+        host = cached.copy()
+        host.limits['memory'] = 512
+        host.numa_topology.nodes[0].pin_cpus(set([0]))
+        host.pci_stats.pools.append({'count': 1})
+
+        self.assertEqual({'memory': 1024}, cached.limits)
+        self.assertEqual(set(), cached.numa_topology.nodes[0].pinned_cpus)
+        self.assertEqual([], cached.pci_stats.pools)
+
+
+@mock.patch.object(objects.ZunService, 'list_by_binary')
+@mock.patch.object(objects.ComputeNode, 'list')
+class HostStateCacheTestCase(base.TestCase):
+
+    def setUp(self):
+        super(HostStateCacheTestCase, self).setUp()
+        self.context = context.get_admin_context()
+        self.now = datetime.datetime(2020, 1, 1, 12, 0, 0)
+        timeutils.set_time_override(self.now)
+        self.addCleanup(timeutils.clear_time_override)
+        self.config(host_state_cache_ttl=1.0,
+                    host_state_cache_full_refresh_interval=300,
+                    group='scheduler')
+        self.cache = host_state.HostStateCache()
+
+    def _hostnames(self, host_states):
+        return sorted(h.hostname for h in host_states)
+
+    def test_get_host_states(self, mock_node_list, mock_service_list):
+        mock_node_list.return_value = [_fake_node('host1'),
+                                       _fake_node('host2'),
+                                       _fake_node('host3')]
+        mock_service_list.return_value = [FakeService('service1', 'host1'),
+                                          FakeService('service2', 'host2')]
+
+        host_states = self.cache.get_host_states(self.context)
+
+        self.assertEqual(['host1', 'host2'], self._hostnames(host_states))
+        mock_node_list.assert_called_once_with(self.context, filters=None)
+        mock_service_list.assert_called_once_with(
+            self.context, 'zun-compute', filters=None)
+        self.assertEqual(1, self.cache.stats()['full_refreshes'])
+
+    def test_get_host_states_filtered_by_compute_uuids(self, mock_node_list,
+                                                       mock_service_list):
+        mock_node_list.return_value = [_fake_node('host1'),
+                                       _fake_node('host2')]
+        mock_service_list.return_value = [FakeService('service1', 'host1'),
+                                          FakeService('service2', 'host2')]
+
+        host_states = self.cache.get_host_states(self.context,
+                                                 ['host2-rp'])
+        self.assertEqual(['host2'], self._hostnames(host_states))
+        host_states = self.cache.get_host_states(self.context, [])
+        self.assertEqual([], host_states)
+
+    def test_get_host_states_cache_hit(self, mock_node_list,
+                                       mock_service_list):
+        mock_node_list.return_value = [_fake_node('host1')]
+        mock_service_list.return_value = [FakeService('service1', 'host1')]
+
+        first = self.cache.get_host_states(self.context)
+        timeutils.advance_time_seconds(0.5)
+        second = self.cache.get_host_states(self.context)
+
+        self.assertIs(first[0], second[0])
+        self.assertEqual(1, mock_node_list.call_count)
+        self.assertEqual(1, mock_service_list.call_count)
+        stats = self.cache.stats()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(0, stats['incremental_refreshes'])
+
+    def test_get_host_states_incremental_refresh(self, mock_node_list,
+                                                 mock_service_list):
+        mock_node_list.return_value = [_fake_node('host1')]
+        mock_service_list.return_value = [FakeService('service1', 'host1')]
+        first = self.cache.get_host_states(self.context)
+
+        timeutils.advance_time_seconds(10)
+        updated_at = timeutils.utcnow()
+        mock_node_list.return_value = [
+            _fake_node('host1', mem_total=2048, updated_at=updated_at),
+            _fake_node('host2', updated_at=updated_at)]
+        mock_service_list.return_value = [FakeService('service2', 'host2')]
+        host_states = self.cache.get_host_states(self.context)
+
+        since = self.now - datetime.timedelta(
+            seconds=host_state.CLOCK_SKEW_MARGIN)
+        mock_node_list.assert_called_with(
+            self.context, filters={'updated_since': since})
+        mock_service_list.assert_called_with(
+            self.context, 'zun-compute', filters={'updated_since': since})
+        self.assertEqual(['host1', 'host2'], self._hostnames(host_states))
+        host1 = [h for h in host_states if h.hostname == 'host1'][0]
+        self.assertIs(first[0], host1)
+        self.assertEqual(2048, host1.mem_total)
+        stats = self.cache.stats()
+        self.assertEqual(1, stats['full_refreshes'])
+        self.assertEqual(1, stats['incremental_refreshes'])
+        self.assertEqual(3, stats['nodes_refreshed'])
+
+    def test_get_host_states_keeps_consumed_resources(self, mock_node_list,
+                                                      mock_service_list):
+        mock_node_list.return_value = [
+            _fake_node('host1', updated_at=self.now)]
+        mock_service_list.return_value = [FakeService('service1', 'host1')]
+        host1 = self.cache.get_host_states(self.context)[0]
+        host1.consume_from_request(mock.Mock(disk=0, memory='512', cpu=1))
+
+        timeutils.advance_time_seconds(10)
+        self.cache.get_host_states(self.context)
+
+        self.assertEqual(512, host1.mem_used)
+
+    def test_get_host_states_full_refresh(self, mock_node_list,
+                                          mock_service_list):
+        mock_node_list.return_value = [_fake_node('host1'),
+                                       _fake_node('host2')]
+        mock_service_list.return_value = [FakeService('service1', 'host1'),
+                                          FakeService('service2', 'host2')]
+        self.cache.get_host_states(self.context)
+
+        timeutils.advance_time_seconds(300)
+        mock_node_list.return_value = [_fake_node('host1')]
+        mock_service_list.return_value = [FakeService('service1', 'host1')]
+        host_states = self.cache.get_host_states(self.context)
+
+        mock_node_list.assert_called_with(self.context, filters=None)
+        self.assertEqual(['host1'], self._hostnames(host_states))
+        stats = self.cache.stats()
+        self.assertEqual(2, stats['full_refreshes'])
+        self.assertEqual(1, stats['hosts'])
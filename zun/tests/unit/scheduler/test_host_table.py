@@ -0,0 +1,122 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Tests for the vectorized host filtering
+"""
+
+import mock
+
+from zun.common import context
+from zun import objects
+from zun.scheduler import filters
+from zun.scheduler.filters import cpu_filter
+from zun.scheduler.filters import disk_filter
+from zun.scheduler.filters import ram_filter
+from zun.scheduler.filters import runtime_filter
+from zun.scheduler import host_table
+from zun.tests import base
+from zun.tests.unit.scheduler import fakes
+from zun.tests import uuidsentinel
+
+
+def _fake_hosts(count):
+    hosts = []
+    for i in range(count):
+        hosts.append(fakes.FakeHostState(
+            'host%d' % i,
+            {'mem_total': 4096, 'mem_used': (i * 512) % 4096,
+             'cpus': 8, 'cpu_used': float(i % 8),
+             'disk_total': 80, 'disk_used': (i * 10) % 80,
+             'disk_quota_supported': i % 5 != 0,
+             'runtimes': ['runc'] if i % 3 else ['runc', 'kata']}))
+    return hosts
+
+
+class HostStateTableTestCase(base.TestCase):
+
+    def test_column(self):
+        hosts = _fake_hosts(3)
+        table = host_table.HostStateTable(hosts)
+        self.assertEqual([0.0, 1.0, 2.0], list(table.column('cpu_used')))
+        self.assertIs(table.column('cpu_used'), table.column('cpu_used'))
+        self.assertEqual([False, True, True],
+                         list(table.column('disk_quota_supported',
+                                           dtype=bool)))
+
+    def test_select_and_mask_of(self):
+        hosts = _fake_hosts(4)
+        table = host_table.HostStateTable(hosts)
+        mask = table.all()
+        mask[1] = False
+        self.assertEqual([hosts[0], hosts[2], hosts[3]], table.select(mask))
+        self.assertEqual([False, False, True, False],
+                         list(table.mask_of(mask, [hosts[1], hosts[2]])))
+
+
+class VectorizedHostFilterHandlerTestCase(base.TestCase):
+
+    def setUp(self):
+        super(VectorizedHostFilterHandlerTestCase, self).setUp()
+        self.context = context.RequestContext('fake_user', 'fake_project')
+        self.handler = filters.VectorizedHostFilterHandler()
+        self.filters = [ram_filter.RamFilter(),
+                        runtime_filter.RuntimeFilter(),
+                        cpu_filter.CPUFilter(),
+                        disk_filter.DiskFilter()]
+
+    def _get_container(self):
+        container = objects.Container(self.context)
+        container.uuid = uuidsentinel.container
+        container.memory = '1024'
+        container.cpu = 2.0
+        container.disk = 20
+        container.runtime = 'kata'
+        return container
+
+    def test_get_filtered_objects(self):
+        container = self._get_container()
+        expected = filters.HostFilterHandler().get_filtered_objects(
+            self.filters, _fake_hosts(50), container, {})
+        hosts = _fake_hosts(50)
+        result = self.handler.get_filtered_objects(
+            self.filters, hosts, container, {})
+
+        self.assertTrue(result)
+        self.assertEqual([h.hostname for h in expected],
+                         [h.hostname for h in result])
+        for host in result:
+            self.assertEqual({'memory': 4096, 'cpu': 8, 'disk': 80},
+                             host.limits)
+
+    def test_get_filtered_objects_no_host(self):
+        container = self._get_container()
+        container.memory = '8192'
+        result = self.handler.get_filtered_objects(
+            self.filters, _fake_hosts(10), container, {})
+        self.assertEqual([], result)
+
+    def test_get_filtered_objects_skips_filters_for_index(self):
+        container = self._get_container()
+        container.memory = '8192'
+        hosts = _fake_hosts(3)
+        result = self.handler.get_filtered_objects(
+            [ram_filter.RamFilter()], hosts, container, {}, index=1)
+        self.assertEqual(hosts, result)
+
+    def test_get_filtered_objects_stop_filtering(self):
+        stop_filter = mock.Mock(spec=filters.BaseHostFilter)
+        stop_filter.filter_mask.return_value = None
+        stop_filter.filter_all.return_value = None
+        result = self.handler.get_filtered_objects(
+            [stop_filter], _fake_hosts(3), self._get_container(), {})
+        self.assertIsNone(result)
@@ -0,0 +1,85 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""
+Tests For Scheduler NUMA weights.
+"""
+
+from zun.common import context
+from zun import objects
+from zun.scheduler import weights
+from zun.scheduler.weights import numa
+from zun.tests import base
+from zun.tests.unit.scheduler import fakes
+
+
+class NUMAWeigherTestCase(base.TestCase):
+
+    def setUp(self):
+        super(NUMAWeigherTestCase, self).setUp()
+        self.context = context.RequestContext('fake_user', 'fake_project')
+        self.weight_handler = weights.HostWeightHandler()
+        self.weighers = [numa.NUMAWeigher()]
+
+    def _get_weighed_hosts(self, hosts, container):
+        return self.weight_handler.get_weighed_objects(
+            self.weighers, hosts, container, {})
+
+    def _get_host(self, host, free_cpus_by_node, enable_cpu_pinning=True):
+        nodes = []
+        for i, free_cpus in enumerate(free_cpus_by_node):
+            nodes.append({'id': i,
+                          'cpuset': list(range(8)),
+                          'pinned_cpus': list(range(8 - free_cpus)),
+                          'mem_total': 1024 * 64,
+                          'mem_available': 1024 * 64})
+        numa_topology = objects.numa.NUMATopology._from_dict(
+            {'nodes': nodes})
+        return fakes.FakeHostState(
+            host, {'numa_topology': numa_topology,
+                   'enable_cpu_pinning': enable_cpu_pinning})
+
+    def _get_container(self, cpu_policy='dedicated', cpu=2):
+        container = objects.Container(self.context)
+        container.cpu_policy = cpu_policy
+        container.cpu = cpu
+        container.memory = '512'
+        return container
+
+    def test_default_of_packing(self):
+        hosts = [self._get_host('host1', [8, 6]),
+                 self._get_host('host2', [3, 8]),
+                 self._get_host('host3', [1, 8])]
+        weighed_hosts = self._get_weighed_hosts(hosts, self._get_container())
+        self.assertEqual(['host2', 'host1', 'host3'],
+                         [h.obj.hostname for h in weighed_hosts])
+        self.assertEqual(1.0, weighed_hosts[0].weight)
+
+    def test_multiplier_spreading(self):
+        self.config(numa_weight_multiplier=-1.0, group='scheduler')
+        hosts = [self._get_host('host1', [8, 6]),
+                 self._get_host('host2', [3, 8])]
+        weighed_hosts = self._get_weighed_hosts(hosts, self._get_container())
+        self.assertEqual('host1', weighed_hosts[0].obj.hostname)
+
+    def test_host_without_fit_ranks_last(self):
+        hosts = [self._get_host('host1', [8, 8], enable_cpu_pinning=False),
+                 self._get_host('host2', [4, 8])]
+        weighed_hosts = self._get_weighed_hosts(hosts, self._get_container())
+        self.assertEqual(['host2', 'host1'],
+                         [h.obj.hostname for h in weighed_hosts])
+
+    def test_shared_policy_is_not_weighed(self):
+        hosts = [self._get_host('host1', [8, 6]),
+                 self._get_host('host2', [3, 8])]
+        weighed_hosts = self._get_weighed_hosts(
+            hosts, self._get_container(cpu_policy='shared'))
+        self.assertEqual([0.0, 0.0], [h.weight for h in weighed_hosts])
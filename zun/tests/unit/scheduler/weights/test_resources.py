@@ -0,0 +1,85 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""
+Tests For Scheduler RAM, CPU, disk and number of containers weights.
+"""
+
+from zun.scheduler import weights
+from zun.scheduler.weights import cpu
+from zun.scheduler.weights import disk
+from zun.scheduler.weights import num_containers
+from zun.scheduler.weights import ram
+from zun.tests import base
+from zun.tests.unit.scheduler import fakes
+
+
+def _used_hosts(total_field, used_field):
+    return [(host, {total_field: 100, used_field: used})
+            for host, used in (('host1', 80), ('host2', 50), ('host3', 0),
+                               ('host4', 90))]
+
+
+# The weigher, its multiplier option, the values of the hosts, the weight of
+# the best host with the default multiplier, and the best host with a
+# positive and a negative multiplier.
+WEIGHERS = [
+    (ram.RAMWeigher, 'ram_weight_multiplier',
+     _used_hosts('mem_total', 'mem_used'), 1.0, 'host3', 'host4'),
+    (cpu.CPUWeigher, 'cpu_weight_multiplier',
+     _used_hosts('cpus', 'cpu_used'), 1.0, 'host3', 'host4'),
+    (disk.DiskWeigher, 'disk_weight_multiplier',
+     _used_hosts('disk_total', 'disk_used'), 1.0, 'host3', 'host4'),
+    (num_containers.NumContainersWeigher, 'container_weight_multiplier',
+     [('host1', {'num_containers': 10}),
+      ('host2', {'num_containers': 2}),
+      ('host3', {'num_containers': 40})], 0.0, 'host3', 'host2'),
+]
+
+
+class ResourceWeigherTestCase(base.TestCase):
+
+    def setUp(self):
+        super(ResourceWeigherTestCase, self).setUp()
+        self.weight_handler = weights.HostWeightHandler()
+
+    def _get_weighed_host(self, weigher_cls, host_values):
+        hosts = [fakes.FakeHostState(host, values)
+                 for host, values in host_values]
+        return self.weight_handler.get_weighed_objects(
+            [weigher_cls()], hosts, None, {})[0]
+
+    def test_default_multiplier(self):
+        for weigher_cls, _, host_values, weight, best, _ in WEIGHERS:
+            weighed_host = self._get_weighed_host(weigher_cls, host_values)
+            self.assertEqual(weight, weighed_host.weight, weigher_cls)
+            if weight:
+                self.assertEqual(best, weighed_host.obj.hostname,
+                                 weigher_cls)
+
+    def test_multiplier_positive(self):
+        for weigher_cls, option, host_values, _, best, _ in WEIGHERS:
+            self.config(**{option: 1.0, 'group': 'scheduler'})
+            weighed_host = self._get_weighed_host(weigher_cls, host_values)
+            self.assertEqual(1.0, weighed_host.weight, weigher_cls)
+            self.assertEqual(best, weighed_host.obj.hostname, weigher_cls)
+
+    def test_multiplier_negative(self):
+        for weigher_cls, option, host_values, _, _, best in WEIGHERS:
+            self.config(**{option: -1.0, 'group': 'scheduler'})
+            weighed_host = self._get_weighed_host(weigher_cls, host_values)
+            self.assertEqual(best, weighed_host.obj.hostname, weigher_cls)
+
+    def test_multiplier_none(self):
+        for weigher_cls, option, host_values, _, _, _ in WEIGHERS:
+            self.config(**{option: 0.0, 'group': 'scheduler'})
+            weighed_host = self._get_weighed_host(weigher_cls, host_values)
+            self.assertEqual(0.0, weighed_host.weight, weigher_cls)
@@ -197,10 +197,13 @@ class ZunProxyRequestHandlerBase(object):
 
         ctx = context.get_admin_context(all_projects=True)
 
+        expected_attrs = ['exec_instances'] if exec_id else None
         if uuidutils.is_uuid_like(uuid):
-            container = objects.Container.get_by_uuid(ctx, uuid)
+            container = objects.Container.get_by_uuid(
+                ctx, uuid, expected_attrs=expected_attrs)
         else:
-            container = objects.Container.get_by_name(ctx, uuid)
+            container = objects.Container.get_by_name(
+                ctx, uuid, expected_attrs=expected_attrs)
 
         if exec_id:
             self._new_exec_client(container, token, uuid, exec_id)